@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+⏱️ Micro-benchmarks du parsing et des modèles sur des pages HTML figées
+
+Mesure, sans aucun accès réseau :
+
+- le parsing d'une page produit, d'une page de listing et de la navigation
+  de la page d'accueil, pour chaque backend de parsing installé ;
+- la construction d'un :class:`Book` (conversion des prix en ``Decimal``) ;
+- ``Book.to_dict`` ;
+- la construction et ``to_dict`` de la variante compacte :class:`CompactBook` ;
+- le remplissage d'un :class:`BookBatch` en colonnes ;
+- ``FileHandler.save_books_to_csv`` pour 1k, 10k et 100k lignes.
+
+Chaque cas est rapporté en opérations par seconde, en débit normalisé et
+en pic mémoire. Le débit normalisé divise le débit par celui d'une boucle
+d'étalonnage en pur Python qui n'appelle aucun code du projet : il absorbe
+les écarts de vitesse entre machines (fréquence, charge) sans masquer un
+ralentissement commun à tous les cas, par exemple dans ``extract_book``.
+
+Il est comparé à ``baseline.json``, versionné avec le code : une régression
+au-delà de la tolérance fait échouer le run (code de sortie 1), tout comme
+l'absence de référence. Seuls les cas mesurés au moins ``MIN_GATE_TIME``
+secondes peuvent échouer ; en dessous (``--min-time`` plus court), les
+écarts sont affichés à titre indicatif. Un cas suspect est remesuré avant
+d'être déclaré en régression.
+
+Usage ::
+
+    python benchmarks/run_benchmarks.py                    # compare à la référence
+    python benchmarks/run_benchmarks.py --quick            # sans le cas 100k lignes
+    python benchmarks/run_benchmarks.py --update-baseline  # enregistre la référence
+"""
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Ajoute le répertoire src au PYTHONPATH pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import typer
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+from bookstore_scraper.config import ScraperConfig
+from bookstore_scraper.models.batch import BookBatch
+from bookstore_scraper.models.book import Book, CompactBook
+from bookstore_scraper.parsers import PARSER_BACKENDS
+from bookstore_scraper.scraper import BookStoreScraper
+from bookstore_scraper.utils import file_handler
+from bookstore_scraper.utils.file_handler import FileHandler
+
+console = Console()
+
+FIXTURES = Path(__file__).parent / "fixtures"
+BASELINE = Path(__file__).parent / "baseline.json"
+BASE_URL = "http://books.toscrape.com/"
+BOOK_URL = BASE_URL + "catalogue/a-light-in-the-attic_1000/index.html"
+
+# Boucle d'étalonnage mesurée à chaque run, à laquelle les débits sont rapportés
+CALIBRATION_CASE = "calibration"
+# Durée d'échantillonnage minimale (s) pour qu'un écart fasse échouer le run
+MIN_GATE_TIME = 0.5
+# Nouvelles mesures d'un cas suspect avant de conclure à une régression
+CONFIRM_RUNS = 2
+# Mesures par cas pour --update-baseline (la médiane est enregistrée)
+BASELINE_RUNS = 3
+
+# Taille des lots des benchmarks de modèle (une opération = un livre)
+MODEL_BATCH = 1000
+CSV_SIZES = (1_000, 10_000, 100_000)
+
+
+@dataclass
+class Benchmark:
+    """Un cas mesuré : ``run`` effectue ``ops`` opérations."""
+
+    name: str
+    run: Callable[[], object]
+    ops: int = 1
+
+
+@dataclass
+class Result:
+    name: str
+    ops_per_sec: float
+    peak_kib: float
+    sample_time: float = 0.0  # Durée totale des échantillons chronométrés (s)
+    normalized: float = 1.0  # Débit rapporté à celui de la boucle d'étalonnage
+
+
+def measure(bench: Benchmark, min_time: float = 1.0, repeat: int = 5) -> Result:
+    """Meilleur débit sur ``repeat`` échantillons, puis pic mémoire d'un appel isolé.
+
+    Le pic mémoire est mesuré à part : tracemalloc ralentit fortement le code
+    et fausserait les temps.
+    """
+    bench.run()  # Échauffement (imports paresseux, caches)
+
+    start = time.perf_counter()
+    bench.run()
+    single = time.perf_counter() - start
+    number = max(1, int(min_time / repeat / max(single, 1e-9)))
+
+    best = total = 0.0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            bench.run()
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        best = max(best, number * bench.ops / elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    bench.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(bench.name, best, peak / 1024, total)
+
+
+def measure_case(bench: Benchmark, calibration: Benchmark, min_time: float) -> Tuple[Result, Result]:
+    """Mesure ``bench`` précédé d'un étalonnage, et renvoie ``(résultat, étalonnage)``.
+
+    L'étalonnage juste avant le cas suit les variations de vitesse de la
+    machine (fréquence, voisins bruyants) au fil du run.
+    """
+    local = measure(calibration, min_time / 4)
+    result = measure(bench, min_time)
+    result.normalized = result.ops_per_sec / local.ops_per_sec
+    return result, local
+
+
+def is_slower(result: Result, reference: Optional[Dict[str, float]], tolerance: float) -> bool:
+    return bool(reference and "normalized" in reference
+                and result.normalized < reference["normalized"] * (1 - tolerance))
+
+
+def calibration_loop() -> int:
+    """Charge fixe en pur Python (chaînes, dictionnaire, entiers) sans code du projet."""
+    counts = {}
+    total = 0
+    for i in range(2000):
+        key = f"k{i % 97}"
+        counts[key] = counts.get(key, 0) + i
+        total += len(key.upper()) + (i * 31) % 7
+    return total + len(counts)
+
+
+def read_fixture(name: str) -> bytes:
+    return (FIXTURES / name).read_bytes()
+
+
+def available_backends() -> List[str]:
+    """Backends dont la dépendance optionnelle est installée."""
+    backends = []
+    for name in PARSER_BACKENDS:
+        try:
+            BookStoreScraper(BASE_URL, ScraperConfig(parser=name)).close()
+        except ValueError:
+            continue
+        backends.append(name)
+    return backends
+
+
+def check_parity(backends: List[str]) -> List[str]:
+    """Vérifie que tous les backends extraient les mêmes valeurs des fixtures."""
+    detail = read_fixture("book_detail.html")
+    listing = read_fixture("category_listing.html")
+    home = read_fixture("home.html")
+
+    outputs = {}
+    for name in backends:
+        scraper = BookStoreScraper(BASE_URL, ScraperConfig(parser=name))
+        page = scraper.parse_category_page(listing)
+        outputs[name] = (
+            scraper.parse_book_details(detail, BOOK_URL),
+            (page.items, page.has_next, page.page_count, page.result_count),
+            scraper.parser.parse_categories(home),
+        )
+        scraper.close()
+
+    reference_name = backends[0]
+    return [f"{name} ≠ {reference_name}" for name in backends[1:]
+            if outputs[name] != outputs[reference_name]]
+
+
+def parser_benchmarks(backends: List[str]) -> List[Benchmark]:
+    detail = read_fixture("book_detail.html")
+    listing = read_fixture("category_listing.html")
+    home = read_fixture("home.html")
+
+    benchmarks = []
+    for name in backends:
+        scraper = BookStoreScraper(BASE_URL, ScraperConfig(parser=name))
+        benchmarks += [
+            # Partie parsing de get_book_details (sans le téléchargement)
+            Benchmark(f"parse_book[{name}]",
+                      lambda s=scraper: s.parse_book_details(detail, BOOK_URL)),
+            Benchmark(f"parse_listing[{name}]",
+                      lambda s=scraper: s.parse_category_page(listing)),
+            Benchmark(f"parse_categories[{name}]",
+                      lambda s=scraper: s.parser.parse_categories(home)),
+        ]
+    return benchmarks
+
+
+def sample_records(count: int) -> List[tuple]:
+    """Lignes brutes variées, telles que produites par l'extraction (prix en chaînes)."""
+    book = BookStoreScraper(BASE_URL).parse_book_details(read_fixture("book_detail.html"), BOOK_URL)
+    template = list(book.to_record())
+    records = []
+    for i in range(count):
+        record = list(template)
+        record[0] = BASE_URL + f"catalogue/book_{i}/index.html"
+        record[1] = f"{i:016x}"
+        record[2] = f"{book.title} #{i}"
+        record[3] = record[4] = f"£{10 + i % 5000 / 100:.2f}"
+        records.append(tuple(record))
+    return records
+
+
+def model_benchmarks() -> List[Benchmark]:
+    records = sample_records(MODEL_BATCH)
+    books = [Book(*record) for record in records]
+    compact_books = [CompactBook.from_record(record) for record in records]
+
+    def construct():
+        for record in records:
+            Book(*record)
+
+    def to_dict():
+        for book in books:
+            book.to_dict()
+
+    def construct_compact():
+        for record in records:
+            CompactBook.from_record(record)
+
+    def compact_to_dict():
+        for book in compact_books:
+            book.to_dict()
+
+    return [
+        Benchmark("book_post_init", construct, MODEL_BATCH),
+        Benchmark("book_to_dict", to_dict, MODEL_BATCH),
+        Benchmark("compact_book_from_record", construct_compact, MODEL_BATCH),
+        Benchmark("compact_book_to_dict", compact_to_dict, MODEL_BATCH),
+        Benchmark("book_batch_from_records", lambda: BookBatch.from_records(records), MODEL_BATCH),
+    ]
+
+
+def csv_benchmarks(tmp_dir: Path, sizes) -> List[Benchmark]:
+    benchmarks = []
+    for size in sizes:
+        rows = [Book(*record).to_dict() for record in sample_records(size)]
+        csv_path = tmp_dir / f"books_{size}.csv"
+        benchmarks.append(Benchmark(f"save_books_to_csv[{size // 1000}k]",
+                                    lambda r=rows, p=csv_path: FileHandler.save_books_to_csv(r, p),
+                                    size))
+    return benchmarks
+
+
+def compare(results: List[Result], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> int:
+    """Affiche les résultats face à la référence et renvoie le nombre de régressions.
+
+    La vitesse est jugée sur le débit normalisé par la boucle d'étalonnage, la
+    mémoire sur le pic absolu. Un cas échantillonné moins de
+    :data:`MIN_GATE_TIME` secondes n'est pas compté comme régression.
+    ``results`` contient déjà, pour un cas suspect, la meilleure de ses
+    mesures de confirmation.
+    """
+    table = Table(title="⏱️ Micro-benchmarks (débit normalisé par la boucle d'étalonnage)")
+    table.add_column("Cas", style="cyan", no_wrap=True)
+    table.add_column("ops/s", justify="right")
+    table.add_column("Normalisé", justify="right")
+    table.add_column("Réf. normalisé", justify="right", style="dim")
+    table.add_column("Pic mémoire", justify="right")
+    table.add_column("Réf. mémoire", justify="right", style="dim")
+    table.add_column("Statut")
+
+    regressions = 0
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None or "normalized" not in reference:
+            table.add_row(escape(result.name), f"{result.ops_per_sec:,.0f}", f"{result.normalized:,.4g}", "-",
+                          f"{result.peak_kib:,.0f} Kio", "-", "[blue]nouveau[/blue]")
+            continue
+
+        slower = is_slower(result, reference, tolerance)
+        # Marge absolue : les petits pics mémoire varient de quelques Kio d'un run à l'autre
+        heavier = result.peak_kib > reference["peak_kib"] * (1 + tolerance) + 64
+        if not (slower or heavier):
+            status = "[green]✅[/green]"
+        elif result.sample_time < MIN_GATE_TIME:
+            # Mesure trop courte pour trancher : signalée sans faire échouer le run
+            status = "[yellow]⚠️ indicatif[/yellow]"
+        else:
+            regressions += 1
+            status = "[red]❌ régression[/red]"
+
+        table.add_row(escape(result.name), f"{result.ops_per_sec:,.0f}", f"{result.normalized:,.4g}",
+                      f"{reference['normalized']:,.4g}",
+                      f"{result.peak_kib:,.0f} Kio", f"{reference['peak_kib']:,.0f} Kio", status)
+
+    console.print(table)
+    return regressions
+
+
+def main(
+    quick: bool = typer.Option(False, "--quick", help="Ignore le cas CSV de 100k lignes"),
+    update_baseline: bool = typer.Option(False, "--update-baseline",
+                                         help="Enregistre les résultats comme nouvelle référence"),
+    tolerance: float = typer.Option(0.3, "--tolerance", min=0,
+                                    help="Écart toléré avant de signaler une régression (0.3 = 30 %)"),
+    only: Optional[str] = typer.Option(None, "--only", help="Ne lance que les cas contenant ce texte"),
+    min_time: float = typer.Option(1.0, "--min-time", min=0.01,
+                                   help="Durée de mesure minimale par cas (s)")
+):
+    """⏱️ Lance les micro-benchmarks et les compare à la référence."""
+    backends = available_backends()
+    mismatches = check_parity(backends)
+    if mismatches:
+        console.print(f"[red]❌ Les backends n'extraient pas les mêmes valeurs: {', '.join(mismatches)}[/red]")
+        raise typer.Exit(1)
+    console.print(f"✅ [green]Parité des backends vérifiée: {', '.join(backends)}[/green]")
+
+    # save_books_to_csv affiche un message à chaque appel
+    file_handler.console.quiet = True
+    sizes = CSV_SIZES[:-1] if quick else CSV_SIZES
+
+    baseline = json.loads(BASELINE.read_text(encoding='utf-8')) if BASELINE.exists() else {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmarks = parser_benchmarks(backends) + model_benchmarks() + csv_benchmarks(Path(tmp), sizes)
+        if only:
+            benchmarks = [bench for bench in benchmarks if only in bench.name]
+
+        results = []
+        calibrations = []
+        calibration = Benchmark(CALIBRATION_CASE, calibration_loop)
+        with console.status("⏱️ Mesure en cours...") as status:
+            for bench in benchmarks:
+                status.update(f"⏱️ {escape(bench.name)}")
+                if update_baseline:
+                    # Médiane de plusieurs mesures : une référence ni chanceuse ni pessimiste
+                    samples = [measure_case(bench, calibration, min_time) for _ in range(BASELINE_RUNS)]
+                    samples.sort(key=lambda sample: sample[0].normalized)
+                    result, local = samples[len(samples) // 2]
+                    calibrations += [local for _, local in samples]
+                else:
+                    result, local = measure_case(bench, calibration, min_time)
+                    calibrations.append(local)
+                    # Un cas suspect est remesuré : seul un ralentissement qui se
+                    # répète fait échouer le run
+                    for _ in range(CONFIRM_RUNS):
+                        if not is_slower(result, baseline.get(bench.name), tolerance):
+                            break
+                        status.update(f"⏱️ {escape(bench.name)} (confirmation)")
+                        retry, local = measure_case(bench, calibration, min_time)
+                        calibrations.append(local)
+                        result = max(result, retry, key=lambda r: r.normalized)
+                results.append(result)
+
+        if calibrations:
+            results.insert(0, max(calibrations, key=lambda r: r.ops_per_sec))
+
+    if update_baseline:
+        baseline.update({result.name: {"ops_per_sec": round(result.ops_per_sec, 1),
+                                       "normalized": round(result.normalized, 6),
+                                       "peak_kib": round(result.peak_kib, 1)}
+                         for result in results})
+        BASELINE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding='utf-8')
+        compare(results, {}, tolerance)
+        console.print(f"💾 [green]Référence enregistrée dans {BASELINE} (à versionner)[/green]")
+        return
+
+    if not baseline:
+        compare(results, {}, tolerance)
+        console.print(f"[red]❌ Aucune référence dans {BASELINE}: lancez --update-baseline et versionnez-la[/red]")
+        raise typer.Exit(1)
+
+    regressions = compare(results, baseline, tolerance)
+    if min_time < MIN_GATE_TIME:
+        console.print(f"[yellow]⚠️ --min-time < {MIN_GATE_TIME} s : les écarts de vitesse sont "
+                      f"indicatifs et ne font pas échouer le run[/yellow]")
+    if regressions:
+        console.print(f"[red]❌ {regressions} régression(s) au-delà de {tolerance:.0%}[/red]")
+        raise typer.Exit(1)
+    console.print("✅ [green]Aucune régression[/green]")
+
+
+if __name__ == "__main__":
+    typer.run(main)
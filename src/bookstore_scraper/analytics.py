@@ -0,0 +1,232 @@
+"""
+📊 Analyse vectorisée des prix et des stocks sur les CSV produits (commande analyze)
+
+Les CSV sont chargés en colonnes (pyarrow si installé, sinon ``csv.reader``
+colonne par colonne) puis toutes les statistiques sont calculées avec NumPy,
+sans boucle Python par livre : l'analyse reste rapide sur des millions de
+lignes issues de snapshots accumulés.
+"""
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List
+
+from .models.batch import MISSING_PRICE, BookBatch
+from .models.book import (AVAILABILITY_PATTERN, IN_STOCK, RATING_VALUES, UNKNOWN_STOCK,
+                          availability_code)
+
+# Colonnes lues dans les CSV de livres
+ANALYZED_COLUMNS = ["price_including_tax", "price_excluding_tax", "number_available",
+                    "category", "review_rating"]
+
+# Notes possibles : 0 (inconnue) puis 1 à 5 étoiles
+RATING_LEVELS = 6
+
+
+def require_numpy():
+    """Importe NumPy, dépendance optionnelle de l'analyse."""
+    try:
+        import numpy
+    except ImportError:
+        raise ValueError("L'analyse nécessite le paquet 'numpy' (pip install numpy)")
+    return numpy
+
+
+def find_book_csvs(output: Path) -> List[Path]:
+    """CSV de livres du dossier de sortie et de ses sous-dossiers (snapshots compris).
+
+    Les fichiers de delta (``--incremental``) et les CSV inachevés sont ignorés.
+    """
+    return sorted(path for path in Path(output).rglob("*.csv")
+                  if not path.name.endswith(".delta.csv"))
+
+
+@dataclass
+class BookColumns:
+    """Jeu de livres en colonnes typées.
+
+    ``category_codes`` indexe ``categories`` ; une note inconnue vaut 0, un
+    prix HT inconnu (livre lu sur le listing) vaut ``nan`` et un stock
+    inconnu (``"In stock"`` du listing) vaut :data:`UNKNOWN_STOCK`.
+    """
+
+    categories: List[str]
+    category_codes: "numpy.ndarray"
+    price_including_tax: "numpy.ndarray"
+    price_excluding_tax: "numpy.ndarray"
+    stock: "numpy.ndarray"
+    rating: "numpy.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.category_codes)
+
+    @classmethod
+    def from_batch(cls, batch: BookBatch) -> "BookColumns":
+        """Colonnes d'un :class:`BookBatch`, lues sans copie (prix en centimes → livres)."""
+        np = require_numpy()
+        return cls(
+            categories=list(batch.categories),
+            category_codes=np.frombuffer(batch.category_code, dtype=np.int32).astype(np.intp),
+            price_including_tax=np.frombuffer(batch.price_including_tax, dtype=np.int64) / 100,
+            price_excluding_tax=np.where(
+                np.frombuffer(batch.price_excluding_tax, dtype=np.int64) == MISSING_PRICE,
+                np.nan, np.frombuffer(batch.price_excluding_tax, dtype=np.int64) / 100),
+            stock=np.frombuffer(batch.available, dtype=np.int64),
+            # Note "Unknown" (-1) → inconnue (0)
+            rating=np.maximum(np.frombuffer(batch.rating, dtype=np.int8), 0),
+        )
+
+
+@dataclass
+class CategoryStats:
+    """Statistiques par catégorie, une case par entrée de ``categories``."""
+
+    categories: List[str]
+    books: "numpy.ndarray"
+    min_price: "numpy.ndarray"
+    median_price: "numpy.ndarray"
+    max_price: "numpy.ndarray"
+    mean_tax: "numpy.ndarray"
+    max_tax: "numpy.ndarray"
+    stock: "numpy.ndarray"
+    # Livres en stock sans nombre d'exemplaires connu (hors de ``stock``)
+    unknown_stock: "numpy.ndarray"
+    mean_rating: "numpy.ndarray"
+    # Nombre de livres par note (colonnes 0 = inconnue, 1 à 5 étoiles)
+    ratings: "numpy.ndarray"
+
+
+def load_columns(paths: Iterable[Path]) -> BookColumns:
+    """Charge les colonnes utiles de tous les CSV en un seul lot."""
+    np = require_numpy()
+    paths = list(paths)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return _load_with_csv(np, paths)
+    return _load_with_pyarrow(np, paths)
+
+
+def _load_with_pyarrow(np, paths: List[Path]) -> BookColumns:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pacsv
+
+    options = pacsv.ConvertOptions(
+        include_columns=ANALYZED_COLUMNS,
+        column_types={"price_including_tax": pa.float64(), "price_excluding_tax": pa.float64(),
+                      "number_available": pa.string(), "category": pa.string(),
+                      "review_rating": pa.string()},
+    )
+    tables = [pacsv.read_csv(path, convert_options=options) for path in paths]
+    if not tables:
+        return _empty(np)
+    table = pa.concat_tables(tables)
+
+    available = pc.extract_regex(table["number_available"], AVAILABILITY_PATTERN.pattern)
+    stock = pc.fill_null(pc.cast(pc.struct_field(available, "available"), pa.int64()), 0)
+    in_stock = pc.equal(pc.utf8_trim_whitespace(table["number_available"]), IN_STOCK)
+    stock = pc.if_else(in_stock, pa.scalar(UNKNOWN_STOCK, pa.int64()), stock)
+    # index_in renvoie la position dans ["One", ..., "Five"], nulle si inconnue
+    position = pc.index_in(table["review_rating"], value_set=pa.array(list(RATING_VALUES)))
+    rating = pc.fill_null(pc.add(position, 1), 0)
+    category = pc.dictionary_encode(table["category"]).combine_chunks()
+
+    return BookColumns(
+        categories=category.dictionary.to_pylist(),
+        category_codes=category.indices.to_numpy(zero_copy_only=False).astype(np.intp),
+        price_including_tax=table["price_including_tax"].to_numpy(),
+        price_excluding_tax=table["price_excluding_tax"].to_numpy(),
+        stock=stock.to_numpy(),
+        rating=rating.to_numpy().astype(np.int8),
+    )
+
+
+def _load_with_csv(np, paths: List[Path]) -> BookColumns:
+    columns = {name: [] for name in ANALYZED_COLUMNS}
+    for path in paths:
+        with open(path, newline='', encoding='utf-8') as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, None)
+            if header is None:
+                continue
+            positions = [(columns[name], header.index(name)) for name in ANALYZED_COLUMNS]
+            for row in reader:
+                for values, position in positions:
+                    values.append(row[position])
+    if not columns["category"]:
+        return _empty(np)
+
+    availability = np.array(columns["number_available"])
+    # Les libellés de disponibilité sont peu nombreux : un regex par valeur distincte
+    labels, label_codes = np.unique(availability, return_inverse=True)
+    label_stock = np.array([availability_code(label) for label in labels], dtype=np.int64)
+    ratings, rating_codes = np.unique(np.array(columns["review_rating"]), return_inverse=True)
+    rating_values = np.array([RATING_VALUES.get(rating, 0) for rating in ratings], dtype=np.int8)
+    categories, category_codes = np.unique(np.array(columns["category"]), return_inverse=True)
+
+    return BookColumns(
+        categories=categories.tolist(),
+        category_codes=category_codes.reshape(-1),
+        price_including_tax=np.array(columns["price_including_tax"]).astype(np.float64),
+        price_excluding_tax=_prices(np, columns["price_excluding_tax"]),
+        stock=label_stock[label_codes.reshape(-1)],
+        rating=rating_values[rating_codes.reshape(-1)],
+    )
+
+
+def _prices(np, values: List[str]):
+    """Prix lus dans le CSV, ``nan`` pour les prix vides."""
+    prices = np.array(values)
+    return np.where(prices == "", "nan", prices).astype(np.float64)
+
+
+def _empty(np) -> BookColumns:
+    return BookColumns([], np.empty(0, np.intp), np.empty(0), np.empty(0),
+                       np.empty(0, np.int64), np.empty(0, np.int8))
+
+
+def category_stats(data: BookColumns) -> CategoryStats:
+    """Calcule les statistiques par catégorie sans boucle sur les livres."""
+    np = require_numpy()
+    groups = len(data.categories)
+    codes = data.category_codes
+    books = np.bincount(codes, minlength=groups)
+
+    # Prix triés par catégorie puis par prix : min, médiane et max se lisent par position
+    order = np.lexsort((data.price_including_tax, codes))
+    prices = data.price_including_tax[order]
+    starts = np.cumsum(books) - books
+    last = starts + books - 1
+    median = (prices[starts + (books - 1) // 2] + prices[starts + books // 2]) / 2
+
+    # Taxe calculée sur les seuls livres dont le prix HT est connu
+    taxed = ~np.isnan(data.price_excluding_tax)
+    tax = (data.price_including_tax - data.price_excluding_tax)[taxed]
+    max_tax = np.full(groups, np.nan)
+    np.fmax.at(max_tax, codes[taxed], tax)
+
+    # Stock additionné sur les seuls livres dont le nombre d'exemplaires est connu
+    counted = data.stock != UNKNOWN_STOCK
+
+    rated = data.rating > 0
+    rated_books = np.bincount(codes[rated], minlength=groups)
+    rating_sums = np.bincount(codes[rated], weights=data.rating[rated], minlength=groups)
+    ratings = np.bincount(codes * RATING_LEVELS + data.rating,
+                          minlength=groups * RATING_LEVELS).reshape(groups, RATING_LEVELS)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return CategoryStats(
+            categories=data.categories,
+            books=books,
+            min_price=prices[starts],
+            median_price=median,
+            max_price=prices[last],
+            mean_tax=(np.bincount(codes[taxed], weights=tax, minlength=groups)
+                      / np.bincount(codes[taxed], minlength=groups)),
+            max_tax=max_tax,
+            stock=np.bincount(codes[counted], weights=data.stock[counted], minlength=groups).astype(np.int64),
+            unknown_stock=np.bincount(codes[~counted], minlength=groups),
+            mean_rating=rating_sums / rated_books,
+            ratings=ratings,
+        )
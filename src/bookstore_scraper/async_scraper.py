@@ -0,0 +1,387 @@
+"""
+⚡ Moteur de scraping asynchrone (aiohttp) avec parallélisme borné
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from rich.console import Console
+from yarl import URL
+
+from .config import ScraperConfig
+from .models.book import Book, Category
+from .models.listing import ListingItem, ListingPage
+from .metrics import ERROR_STATUS, run_metrics
+from .parsers import BOOK_PAGE, parse_book_record
+from .resilience import HEDGE_MIN_SAMPLES, RETRY_STATUSES, DeadlineExceeded
+from .scraper import BookStoreScraper
+from .throttle import AdaptiveThrottle, LatencyWindow, parse_retry_after
+
+console = Console()
+
+
+class ResponseStatusError(aiohttp.ClientResponseError):
+    """Statut d'erreur HTTP, avec le corps de la réponse (enregistré dans l'archive)."""
+
+    def __init__(self, *args, body: bytes = b"", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.body = body
+
+
+class AsyncBookStoreScraper(BookStoreScraper):
+    """Scraper qui récupère les pages détail en parallèle avec aiohttp.
+
+    Le parsing est partagé avec :class:`BookStoreScraper`, seuls les accès
+    réseau des pages détail changent : au plus ``config.concurrency``
+    requêtes sont en vol en même temps.
+
+    Avec ``config.adaptive``, ce nombre devient un point de départ : un
+    limiteur AIMD par hôte l'ajuste entre 1 et ``config.max_concurrency``
+    selon la latence observée et les réponses 429/503.
+
+    Avec ``config.hedge``, une requête qui dépasse le p95 observé pour son
+    hôte est doublée : la première réponse arrivée l'emporte.
+    """
+
+    def __init__(self, base_url: str = "http://books.toscrape.com/",
+                 config: Optional[ScraperConfig] = None):
+        super().__init__(base_url, config)
+        self.concurrency = max(1, self.config.concurrency)
+        self.throttle: Optional[AdaptiveThrottle] = None
+        if self.config.adaptive:
+            maximum = max(self.concurrency, self.config.max_concurrency)
+            self.throttle = AdaptiveThrottle(self.concurrency, maximum)
+            # Assez de workers pour la limite maximale : le limiteur décide du nombre actif
+            self.concurrency = maximum
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        # Latences observées par hôte, seuil de déclenchement des requêtes couvertes
+        self._latencies: Dict[str, LatencyWindow] = {}
+        self.hedged = 0  # Requêtes doublées
+        self.hedge_wins = 0  # Doublons arrivés avant la requête d'origine
+        self.listing_errors = 0  # Pages de listing en échec (parcours de catégorie incomplet)
+
+    @property
+    def parse_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Pool de processus de parsing, créé au premier usage si ``config.parse_workers`` > 0."""
+        if self._parse_pool is None and self.config.parse_workers > 0:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.config.parse_workers)
+        return self._parse_pool
+
+    async def parse_book_details_async(self, content: bytes, book_url: str) -> Optional[Book]:
+        """Parse une page produit, dans le pool de processus s'il est configuré.
+
+        Seuls les octets de la page partent vers le worker, qui renvoie un tuple
+        compact transformé ici en :class:`Book`.
+        """
+        pool = self.parse_pool
+        if pool is None:
+            return self.parse_book_details(content, book_url)
+
+        loop = asyncio.get_running_loop()
+        # Durée vue depuis la boucle : parsing dans le worker et transfert compris
+        with run_metrics.time_parse(BOOK_PAGE):
+            record = await loop.run_in_executor(pool, parse_book_record, self.config.parser,
+                                                content, book_url, self.base_url)
+        return Book(*record) if record else None
+
+    def close(self):
+        """Arrête le pool de parsing puis ferme les ressources du scraper."""
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        super().close()
+
+    def client_session(self) -> aiohttp.ClientSession:
+        """Crée une session aiohttp dimensionnée pour le parallélisme demandé."""
+        limit = max(self.concurrency, self.config.page_concurrency) + self.config.image_concurrency
+        connector = aiohttp.TCPConnector(limit=limit)
+        timeout = aiohttp.ClientTimeout(sock_connect=self.config.connect_timeout,
+                                        sock_read=self.config.read_timeout)
+        return aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout)
+
+    async def _get_async(self, session: aiohttp.ClientSession, url: str,
+                         headers: Optional[Mapping[str, str]] = None
+                         ) -> Tuple[int, Mapping[str, str], bytes]:
+        """Effectue une requête GET et renvoie ``(statut, en-têtes, corps)``.
+
+        Les erreurs réseau, timeouts et statuts transitoires (429, 5xx) sont
+        retentés ``config.retries`` fois avec une attente exponentielle à jitter
+        (ou le ``Retry-After`` du serveur).
+        Lève :class:`ResponseStatusError` pour les statuts d'erreur et
+        :class:`DeadlineExceeded` quand le budget global est épuisé.
+        """
+        attempt = 0
+        while True:
+            self._check_deadline(url)
+            try:
+                response, content = await self._hedged(session, url, headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Requête coupée par le budget global : l'URL est notée comme non atteinte
+                self._check_deadline(url)
+                if attempt >= self.retry_policy.retries:
+                    raise
+                attempt += 1
+                await asyncio.sleep(self._retry_delay(attempt))
+                continue
+
+            status = response.status
+            if status in RETRY_STATUSES and attempt < self.retry_policy.retries:
+                attempt += 1
+                await asyncio.sleep(self._retry_delay(
+                    attempt, parse_retry_after(response.headers.get("Retry-After"))))
+                continue
+
+            if status >= 400:
+                raise ResponseStatusError(
+                    response.request_info, response.history, status=status,
+                    message=response.reason or "", headers=response.headers, body=content)
+            return status, response.headers, content
+
+    def _latency_window(self, url: str) -> LatencyWindow:
+        host = urlparse(url).netloc
+        window = self._latencies.get(host)
+        if window is None:
+            window = self._latencies[host] = LatencyWindow()
+        return window
+
+    async def _hedged(self, session: aiohttp.ClientSession, url: str,
+                      headers: Optional[Mapping[str, str]]) -> Tuple[aiohttp.ClientResponse, bytes]:
+        """Lance la requête et, si elle dépasse le p95 de son hôte, un doublon.
+
+        Les GET étant idempotents, la première réponse arrivée est retenue et
+        l'autre requête est annulée.
+        """
+        window = self._latency_window(url)
+        if not self.config.hedge or len(window) < HEDGE_MIN_SAMPLES:
+            return await self._attempt(session, url, headers)
+
+        primary = asyncio.ensure_future(self._attempt(session, url, headers))
+        backup = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=window.p95)
+            if done:
+                return primary.result()
+
+            self.hedged += 1
+            backup = asyncio.ensure_future(self._attempt(session, url, headers))
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Les deux requêtes ont échoué
+            return primary.result()
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _attempt(self, session: aiohttp.ClientSession, url: str,
+                       headers: Optional[Mapping[str, str]]) -> Tuple[aiohttp.ClientResponse, bytes]:
+        """Une tentative réseau, via le limiteur adaptatif de l'hôte s'il est activé."""
+        limiter = self.throttle.limiter(url) if self.throttle else None
+        if limiter:
+            await limiter.acquire()
+        start = time.monotonic()
+        try:
+            async with session.get(url, headers=headers, timeout=self._client_timeout()) as response:
+                content = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            run_metrics.record_request(url, ERROR_STATUS, time.monotonic() - start)
+            raise
+        finally:
+            if limiter:
+                limiter.release()
+
+        latency = time.monotonic() - start
+        run_metrics.record_request(url, response.status, latency, len(content))
+        if limiter:
+            limiter.record(latency, response.status,
+                           parse_retry_after(response.headers.get("Retry-After")))
+        if response.status < 400:
+            self._latency_window(url).add(latency)
+        return response, content
+
+    def _client_timeout(self) -> aiohttp.ClientTimeout:
+        """Timeouts d'une requête, la durée totale étant bornée par le budget restant."""
+        total = self.deadline.clamp(self.deadline.seconds) if self.deadline else None
+        return aiohttp.ClientTimeout(total=total, sock_connect=self.config.connect_timeout,
+                                     sock_read=self.config.read_timeout)
+
+    async def fetch_async(self, session: aiohttp.ClientSession, url: str) -> bytes:
+        """Télécharge le contenu brut d'une page, ou le relit depuis l'archive en mode rejeu.
+
+        En mode enregistrement, chaque réponse est ajoutée à l'archive.
+        Lève :class:`aiohttp.ClientResponseError` pour les statuts d'erreur.
+        """
+        if self.archive and self.archive.replaying:
+            return self._replay(url)
+
+        try:
+            status, headers, content = await self._fetch_http_async(session, url)
+        except aiohttp.ClientResponseError as e:
+            if self.archive:
+                self.archive.record(url, e.status, e.headers or {}, getattr(e, "body", b""))
+            raise
+        if self.archive:
+            self.archive.record(url, status, headers, content)
+        return content
+
+    def _replay(self, url: str) -> bytes:
+        """Corps archivé d'une page ; lève une erreur 404 si elle n'a pas été enregistrée."""
+        archived = self.archive.lookup(url)
+        if archived is not None and archived.status < 400:
+            return archived.body
+
+        request_info = aiohttp.RequestInfo(URL(url), "GET", CIMultiDictProxy(CIMultiDict()), URL(url))
+        if archived is None:
+            raise aiohttp.ClientResponseError(request_info, (), status=404,
+                                              message="Absent de l'archive")
+        raise aiohttp.ClientResponseError(request_info, (), status=archived.status,
+                                          headers=CIMultiDictProxy(CIMultiDict(archived.headers)))
+
+    async def _fetch_http_async(self, session: aiohttp.ClientSession,
+                                url: str) -> Tuple[int, Mapping[str, str], bytes]:
+        """Télécharge une page, en passant par le cache HTTP s'il est activé.
+
+        Renvoie ``(statut, en-têtes, corps)`` ; une page servie par le cache a
+        le statut 200 et aucun en-tête, comme dans :meth:`BookStoreScraper._fetch_http`.
+        """
+        if not self.cache:
+            return await self._get_async(session, url)
+
+        entry = self.cache.lookup(url)
+        if entry and self.cache.is_fresh(entry):
+            content = self.cache.load(url, entry)
+            if content is not None:
+                return 200, {}, content
+
+        status, headers, content = await self._get_async(session, url,
+                                                         self.cache.conditional_headers(entry))
+        # 304 : la copie en cache est toujours valide
+        if status == 304 and entry:
+            cached = self.cache.load(url, entry, revalidated=True)
+            if cached is not None:
+                return 200, {}, cached
+            # Corps perdu entre-temps : téléchargement complet
+            status, headers, content = await self._get_async(session, url)
+
+        self.cache.record_miss()
+        self.cache.store(url, headers, content)
+        return status, headers, content
+
+    async def _fetch_listing_async(self, session: aiohttp.ClientSession,
+                                   page_url: str) -> Optional[ListingPage]:
+        """Télécharge et analyse une page de listing (``None`` si elle n'existe pas)."""
+        try:
+            content = await self.fetch_async(session, page_url)
+        except aiohttp.ClientResponseError as e:
+            # Si la page n'existe pas, on s'arrête
+            if e.status == 404:
+                return None
+            raise
+        return self.parse_category_page(content)
+
+    async def iter_books_from_category_async(self, session: aiohttp.ClientSession,
+                                             category: Category) -> AsyncIterator[List[ListingItem]]:
+        """Parcourt les pages de listing d'une catégorie et produit leurs livres page par page.
+
+        Les livres de la page 1 sont disponibles avant le téléchargement des suivantes,
+        ce qui permet de commencer les pages détail au plus tôt. Quand le pager
+        annonce le nombre de pages, les pages 2..N sont demandées en parallèle
+        et produites dans leur ordre d'arrivée.
+        """
+        page = 1
+        page_count = None
+        has_next = True
+
+        while has_next and page_count is None:
+            try:
+                listing = await self._fetch_listing_async(
+                    session, self.category_page_url(category, page))
+            except DeadlineExceeded:
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                console.print(f"[red]❌ Erreur page {page} de {category.nom}: {e}[/red]")
+                self.listing_errors += 1
+                return
+
+            if not listing or not listing.items:
+                return
+
+            yield listing.items
+
+            has_next = listing.has_next
+            if page == 1:
+                page_count = listing.page_count
+            page += 1
+
+        if page_count is None:
+            return
+
+        semaphore = asyncio.Semaphore(self.config.page_concurrency)
+
+        async def fetch_page(page: int) -> List[ListingItem]:
+            try:
+                async with semaphore:
+                    listing = await self._fetch_listing_async(
+                        session, self.category_page_url(category, page))
+            except DeadlineExceeded:
+                return []
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                console.print(f"[red]❌ Erreur page {page} de {category.nom}: {e}[/red]")
+                self.listing_errors += 1
+                return []
+            return listing.items if listing else []
+
+        for next_page in asyncio.as_completed([fetch_page(p) for p in range(2, page_count + 1)]):
+            items = await next_page
+            if items:
+                yield items
+
+    async def get_book_details_async(self, session: aiohttp.ClientSession,
+                                     semaphore: asyncio.Semaphore,
+                                     book_url: str) -> Optional[Book]:
+        """Version asynchrone de :meth:`BookStoreScraper.get_book_details`."""
+        try:
+            async with semaphore:
+                content = await self.fetch_async(session, book_url)
+        except DeadlineExceeded:
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            console.print(f"[red]❌ Erreur lors du scraping de {book_url}: {e}[/red]")
+            return None
+
+        return await self.parse_book_details_async(content, book_url)
+
+    async def get_books_details_async(self, book_urls: List[str],
+                                      on_book: Optional[Callable[[Optional[Book]], None]] = None
+                                      ) -> List[Book]:
+        """Récupère les détails de plusieurs livres en parallèle.
+
+        Les livres sont renvoyés dans l'ordre des URLs fournies.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_one(book_url: str) -> Optional[Book]:
+            book = await self.get_book_details_async(session, semaphore, book_url)
+            if on_book:
+                on_book(book)
+            return book
+
+        async with self.client_session() as session:
+            results = await asyncio.gather(*(fetch_one(url) for url in book_urls))
+
+        return [book for book in results if book]
+
+    def get_books_details(self, book_urls: List[str],
+                          on_book: Optional[Callable[[Optional[Book]], None]] = None) -> List[Book]:
+        """Point d'entrée synchrone : lance la boucle asyncio le temps du lot."""
+        return asyncio.run(self.get_books_details_async(book_urls, on_book))
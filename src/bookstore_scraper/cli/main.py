@@ -1,8 +1,11 @@
 """
 🎨 Interface CLI moderne avec Typer et Rich
 """
+import multiprocessing
+import time
+from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 from rich.console import Console
@@ -12,8 +15,25 @@ from rich.prompt import Prompt, Confirm
 from rich.table import Table
 from rich.text import Text
 
+from ..analytics import category_stats, find_book_csvs, load_columns, require_numpy
+from ..async_scraper import AsyncBookStoreScraper
+from ..config import ScraperConfig
+from ..frontier import LOCAL_JOURNAL, SHARED_JOURNAL, UrlFrontier, merge_results, run_worker, seed_frontier
+from ..incremental import IncrementalPipeline
+from ..listing_only import ListingOnlyPipeline
+from ..metrics import RunMetrics, run_metrics
+from ..models.book import Category, format_price
+from ..parsers import get_parser
+from ..pipeline import ScrapePipeline
+from ..profiling import StageProfiler, short_path
 from ..scraper import BookStoreScraper
-from ..utils.file_handler import FileHandler, save_image
+from ..utils.book_index import BookIndex
+from ..utils.catalog import CatalogMap
+from ..utils.file_handler import COLUMNAR_FORMATS, FileHandler, require_pyarrow, save_image
+from ..utils.image_store import ImageStore
+from ..utils.journal import ProgressJournal
+from ..utils.manifest import RECHECK_DAYS, CrawlManifest
+from ..utils.sqlite_store import SQLiteBookStore
 
 # Configuration de l'application Typer
 app = typer.Typer(
@@ -25,6 +45,442 @@ app = typer.Typer(
 
 console = Console()
 
+# Réglages globaux du moteur, renseignés par les options de l'application
+settings = ScraperConfig()
+
+
+class ParserChoice(str, Enum):
+    """Backends de parsing HTML proposés par l'option --parser."""
+    
+    html_parser = "html.parser"
+    lxml = "lxml"
+    strainer = "strainer"
+    selectolax = "selectolax"
+
+
+class ExportFormat(str, Enum):
+    """Formats de sortie proposés par l'option --format."""
+    
+    csv = "csv"
+    parquet = "parquet"
+    arrow = "arrow"
+
+
+# Moteurs créés pendant la commande, fermés à la fin du run
+_scrapers = []
+
+
+@app.callback()
+def configure(
+    ctx: typer.Context,
+    concurrency: int = typer.Option(1, "--concurrency", "-c", min=1,
+                                    help="Nombre de pages livres récupérées en parallèle"),
+    adaptive: bool = typer.Option(False, "--adaptive",
+                                  help="Ajuste le parallélisme selon la latence et les 429/503 du serveur"),
+    max_concurrency: int = typer.Option(32, "--max-concurrency", min=1,
+                                        help="Parallélisme maximum en mode --adaptive"),
+    connect_timeout: float = typer.Option(10.0, "--connect-timeout", min=0.1,
+                                          help="Timeout d'établissement de connexion (s)"),
+    read_timeout: float = typer.Option(30.0, "--read-timeout", min=0.1,
+                                       help="Timeout de lecture d'une réponse (s)"),
+    retries: int = typer.Option(2, "--retries", min=0,
+                                help="Nouvelles tentatives sur erreur réseau, 429 ou 5xx (attente exponentielle)"),
+    hedge: bool = typer.Option(False, "--hedge",
+                               help="Double les requêtes plus lentes que le p95 observé"),
+    deadline: Optional[float] = typer.Option(None, "--deadline", min=1,
+                                             help="Budget de temps global (s) : le run s'arrête avec des résultats partiels"),
+    cache_dir: Optional[Path] = typer.Option(None, "--cache-dir",
+                                             help="Active le cache HTTP persistant dans ce dossier"),
+    cache_size: int = typer.Option(100, "--cache-size", min=1,
+                                   help="Taille maximale du cache HTTP (Mo)"),
+    cache_max_age: float = typer.Option(0, "--cache-max-age", min=0,
+                                        help="Durée (s) pendant laquelle le cache est servi sans revalidation"),
+    parser: ParserChoice = typer.Option(ParserChoice.html_parser.value, "--parser",
+                                        help="Backend de parsing HTML (lxml, strainer et selectolax sont plus rapides)"),
+    parse_workers: int = typer.Option(0, "--parse-workers", min=0,
+                                      help="Processus dédiés au parsing HTML (0 = dans le processus principal)"),
+    catalog_ttl: float = typer.Option(0, "--catalog-ttl", min=0,
+                                      help="Validité (s) de la carte du catalogue : catégories et livres des listings "
+                                           "(0 = désactivée ; les livres ajoutés entre-temps sont ignorés)"),
+    refresh_catalog: bool = typer.Option(False, "--refresh-catalog",
+                                         help="Reconstruit la carte du catalogue au lieu de la réutiliser"),
+    record: Optional[Path] = typer.Option(None, "--record",
+                                          help="Enregistre chaque page téléchargée dans cette archive WARC (.warc.gz)"),
+    replay: Optional[Path] = typer.Option(None, "--replay", exists=True, dir_okay=False,
+                                          help="Rejoue une archive WARC enregistrée, sans accès réseau"),
+    metrics_file: Optional[Path] = typer.Option(None, "--metrics-file",
+                                                help="Écrit les métriques du run dans ce fichier (.prom/.txt : texte Prometheus, sinon JSON)"),
+    profile: Optional[Path] = typer.Option(None, "--profile",
+                                           help="Profile le run (cProfile + tracemalloc) par étape et écrit les fichiers .prof dans ce dossier"),
+    profile_top: int = typer.Option(20, "--profile-top", min=1,
+                                    help="Nombre de fonctions et d'allocations affichées par --profile")
+):
+    """🔍 Scraper moderne pour analyser les prix de livres sur books.toscrape.com"""
+    settings.concurrency = concurrency
+    settings.adaptive = adaptive
+    settings.max_concurrency = max_concurrency
+    settings.connect_timeout = connect_timeout
+    settings.read_timeout = read_timeout
+    settings.retries = retries
+    settings.hedge = hedge
+    settings.deadline = deadline
+    settings.cache_dir = cache_dir
+    settings.cache_max_mb = cache_size
+    settings.cache_max_age = cache_max_age
+    
+    try:
+        get_parser(parser.value)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--parser")
+    settings.parser = parser.value
+    settings.parse_workers = parse_workers
+    settings.catalog_ttl = catalog_ttl
+    settings.refresh_catalog = refresh_catalog
+    
+    if record and replay:
+        raise typer.BadParameter("--record et --replay sont incompatibles", param_hint="--replay")
+    settings.record_archive = record
+    settings.replay_archive = replay
+    
+    run_metrics.reset()
+    # Appelés dans l'ordre inverse : les scrapers sont fermés avant le bilan,
+    # le profil est arrêté en dernier pour couvrir aussi la fermeture et le bilan
+    if profile:
+        profiler = StageProfiler(profile, top=profile_top)
+        ctx.call_on_close(lambda: finish_profile(profiler))
+        profiler.start()
+    ctx.call_on_close(lambda: finish_metrics(metrics_file))
+    ctx.call_on_close(close_scrapers)
+
+
+def create_scraper() -> BookStoreScraper:
+    """Instancie le moteur synchrone avec les réglages globaux."""
+    scraper = BookStoreScraper(config=settings)
+    _scrapers.append(scraper)
+    return scraper
+
+
+def create_async_scraper() -> AsyncBookStoreScraper:
+    """Instancie le moteur asynchrone utilisé par le pipeline en flux."""
+    scraper = AsyncBookStoreScraper(config=settings)
+    _scrapers.append(scraper)
+    return scraper
+
+
+def close_scrapers():
+    """Ferme les moteurs du run et affiche le bilan du cache HTTP et du parallélisme adaptatif."""
+    while _scrapers:
+        scraper = _scrapers.pop()
+        scraper.close()
+        if scraper.cache:
+            display_cache_stats(scraper.cache)
+        if getattr(scraper, "throttle", None) and scraper.throttle.hosts:
+            display_throttle_stats(scraper.throttle)
+        if getattr(scraper, "hedged", 0):
+            console.print(f"🏁 [cyan]Requêtes couvertes: {scraper.hedged} doublons, "
+                          f"{scraper.hedge_wins} plus rapides que l'original[/cyan]")
+        if scraper.unreached:
+            display_unreached(scraper.unreached)
+        if scraper.archive:
+            display_archive_stats(scraper.archive)
+
+
+def finish_metrics(metrics_file: Optional[Path]):
+    """Affiche le bilan des métriques du run et l'écrit dans ``metrics_file`` s'il est demandé."""
+    if run_metrics.request_count or run_metrics.rows_written:
+        display_metrics(run_metrics)
+    if metrics_file:
+        run_metrics.export(metrics_file)
+        console.print(f"📈 [cyan]Métriques écrites dans {metrics_file}[/cyan]")
+
+
+def display_metrics(metrics: RunMetrics):
+    """Affiche les requêtes par hôte et statut, le parsing, l'écriture et les images."""
+    table = Table(title="📈 Métriques du run")
+    table.add_column("Étape", style="cyan")
+    table.add_column("Détail")
+    table.add_column("Nombre", justify="right")
+    table.add_column("p50", justify="right", style="green")
+    table.add_column("p95", justify="right", style="yellow")
+    table.add_column("Volume", justify="right", style="magenta")
+    
+    for host, status, stats in metrics.hosts():
+        latency = stats.latency
+        table.add_row("🌐 Requêtes", f"{host} ({status})", str(latency.count),
+                      f"{latency.quantile(0.5) * 1000:.0f} ms", f"{latency.quantile(0.95) * 1000:.0f} ms",
+                      f"{stats.bytes / 1024:.0f} Ko")
+    for page_type, histogram in sorted(metrics.parse.items()):
+        table.add_row("🧩 Parsing", page_type, str(histogram.count),
+                      f"{histogram.quantile(0.5) * 1000:.1f} ms", f"{histogram.quantile(0.95) * 1000:.1f} ms",
+                      f"{histogram.sum:.2f} s")
+    if metrics.rows_written:
+        table.add_row("📝 CSV", "lignes écrites", str(metrics.rows_written), "", "",
+                      f"{metrics.write_seconds:.2f} s")
+    if metrics.images:
+        table.add_row("🖼️ Images", "téléchargées", str(metrics.images), "", "",
+                      f"{metrics.image_bytes / 1024:.0f} Ko")
+    console.print(table)
+    
+    elapsed = metrics.elapsed
+    if elapsed and metrics.request_count:
+        console.print(f"⏱️ [cyan]{metrics.request_count} requêtes en {elapsed:.1f} s : "
+                      f"{metrics.request_count / elapsed:.1f} req/s, "
+                      f"{metrics.bytes_received / 1024 / elapsed:.0f} Ko/s[/cyan]")
+
+
+def finish_profile(profiler: StageProfiler):
+    """Arrête le profilage et affiche le temps et la mémoire par étape, puis les points chauds."""
+    profiler.stop()
+    
+    total_seconds = sum(profiler.stage_seconds.values())
+    table = Table(title="🔬 Profil par étape")
+    table.add_column("Étape", style="cyan")
+    table.add_column("Temps", justify="right", style="green")
+    table.add_column("Part", justify="right")
+    table.add_column("Mémoire", justify="right", style="magenta")
+    for stage, seconds in profiler.stage_seconds.items():
+        size = profiler.stage_bytes.get(stage, 0)
+        if not seconds and not size:
+            continue
+        share = seconds / total_seconds * 100 if total_seconds else 0.0
+        table.add_row(stage, f"{seconds:.2f} s", f"{share:.0f} %", f"{size / 1024:.0f} Ko")
+    console.print(table)
+    console.print(f"🧠 [cyan]Pic de mémoire tracée: {profiler.peak_bytes / 1024:.0f} Ko[/cyan]")
+    
+    table = Table(title=f"🔥 {profiler.top} fonctions au plus fort temps propre")
+    table.add_column("Fonction", style="cyan", overflow="fold")
+    table.add_column("Appels", justify="right")
+    table.add_column("Temps propre", justify="right", style="green")
+    table.add_column("Temps cumulé", justify="right", style="yellow")
+    table.add_column("Étape", style="magenta")
+    for name, calls, tottime, cumtime, stage in profiler.top_functions():
+        table.add_row(name, str(calls), f"{tottime:.3f} s", f"{cumtime:.3f} s", stage)
+    console.print(table)
+    
+    table = Table(title=f"🧠 {profiler.top} lignes allouant le plus de mémoire")
+    table.add_column("Ligne", style="cyan", overflow="fold")
+    table.add_column("Blocs", justify="right")
+    table.add_column("Taille", justify="right", style="magenta")
+    for statistic in profiler.top_allocations():
+        frame = statistic.traceback[0]
+        table.add_row(f"{short_path(frame.filename)}:{frame.lineno}", str(statistic.count),
+                      f"{statistic.size / 1024:.0f} Ko")
+    console.print(table)
+    console.print(f"🔬 [cyan]Profils écrits dans {profiler.output_dir} "
+                  f"(python -m pstats {profiler.output_dir / 'run.prof'})[/cyan]")
+
+
+def display_cache_stats(cache):
+    """Affiche les compteurs du cache HTTP dans un tableau Rich."""
+    table = Table(title="🗄️ Cache HTTP")
+    table.add_column("Succès", style="green")
+    table.add_column("Revalidés (304)", style="cyan")
+    table.add_column("Téléchargés", style="yellow")
+    table.add_column("Évincés", style="magenta")
+    table.add_column("Taille", style="blue")
+    
+    stats = cache.stats
+    table.add_row(str(stats.hits), str(stats.revalidated), str(stats.misses),
+                  str(stats.evictions), f"{cache.total_bytes / 1024 / 1024:.1f} Mo")
+    console.print(table)
+
+
+def display_throttle_stats(throttle):
+    """Affiche, par hôte, le parallélisme sur lequel le contrôleur adaptatif s'est stabilisé."""
+    table = Table(title="🎚️ Parallélisme adaptatif")
+    table.add_column("Hôte", style="cyan")
+    table.add_column("Stabilisé", style="green")
+    table.add_column("Maximum atteint", style="yellow")
+    table.add_column("Ralentissements", style="magenta")
+    table.add_column("Latence p95", style="blue")
+    
+    for host, limiter in throttle.hosts.items():
+        table.add_row(host, str(limiter.current_limit), str(limiter.peak),
+                      str(limiter.backoffs), f"{limiter.p95 * 1000:.0f} ms")
+    console.print(table)
+
+
+def display_archive_stats(archive):
+    """Affiche le bilan de l'enregistrement ou du rejeu de l'archive WARC."""
+    if archive.replaying:
+        console.print(f"🗃️ [cyan]Archive {archive.path}: {archive.replayed} pages rejouées, "
+                      f"{archive.missing} absentes[/cyan]")
+    else:
+        console.print(f"🗃️ [cyan]Archive {archive.path}: {archive.recorded} pages enregistrées[/cyan]")
+
+
+def display_unreached(urls, limit: int = 20):
+    """Liste les URLs abandonnées à l'expiration du budget --deadline."""
+    console.print(f"⏱️ [yellow]Budget de temps épuisé: {len(urls)} URLs non atteintes "
+                  f"(résultats partiels)[/yellow]")
+    for url in urls[:limit]:
+        console.print(f"   [yellow]• {url}[/yellow]")
+    if len(urls) > limit:
+        console.print(f"   [yellow]... et {len(urls) - limit} autres[/yellow]")
+
+
+def check_export_format(export_format: ExportFormat) -> str:
+    """Vérifie qu'un format en colonnes est utilisable avant de lancer le scraping."""
+    if export_format.value in COLUMNAR_FORMATS:
+        try:
+            require_pyarrow(export_format.value)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--format")
+    return export_format.value
+
+
+def scrape_category_streaming(scraper: AsyncBookStoreScraper, category, output: Path,
+                              progress: Progress, task, incremental: bool = False,
+                              images: Optional[ImageStore] = None,
+                              journal: Optional[ProgressJournal] = None,
+                              export_format: str = "csv",
+                              store: Optional[SQLiteBookStore] = None,
+                              index: Optional[BookIndex] = None,
+                              listing_only: bool = False, fill_details: bool = False,
+                              catalog: Optional[CatalogMap] = None, recheck_days: float = RECHECK_DAYS):
+    """Scrape une catégorie via le pipeline en flux et met à jour la barre ``task``.
+    
+    En mode incrémental, seuls les livres nouveaux ou modifiés sont réécrits ;
+    la page détail d'un livre vérifié il y a plus de ``recheck_days`` jours est
+    retéléchargée même si son listing n'a pas bougé (stock).
+    Si ``images`` est fourni, les couvertures sont téléchargées en parallèle du scraping.
+    Si ``journal`` est fourni, la progression y est enregistrée pour une reprise.
+    Avec un ``export_format`` en colonnes (parquet, arrow), le CSV final est
+    aussi exporté à côté dans ce format. Si ``store`` est fourni, les livres
+    écrits y sont aussi insérés ou mis à jour. Si ``index`` est fourni, le CSV
+    publié y est réindexé (commande query). Avec ``listing_only``, les livres
+    sont construits depuis les pages de listing (pages détail des livres
+    inconnus téléchargées seulement avec ``fill_details``). Si ``catalog`` est
+    fourni, les livres de la catégorie en sont repris quand elle est à jour.
+    Renvoie le chemin du CSV et le nombre de livres écrits.
+    """
+    cat_dir = output / category.safe_name
+    csv_path = cat_dir / f"{category.safe_name}.csv"
+    discovered = 0
+    processed = 0
+    
+    def on_links(count):
+        nonlocal discovered
+        discovered += count
+        progress.update(task, total=discovered)
+    
+    def on_book(book):
+        nonlocal processed
+        processed += 1
+        progress.update(task, advance=1, description=f"📖 Livre {processed}/{discovered}")
+    
+    if incremental:
+        pipeline = IncrementalPipeline(scraper, CrawlManifest.for_csv(csv_path), recheck_days * 86400,
+                                       images=images, journal=journal, store=store)
+    elif listing_only:
+        pipeline = ListingOnlyPipeline(scraper, fill_details, images=images, journal=journal, store=store)
+    else:
+        # Incrémental et --listing-only comparent les prix du listing : il doit être frais
+        pipeline = ScrapePipeline(scraper, images=images, journal=journal, store=store, catalog=catalog)
+    
+    written = pipeline.run(category, csv_path, on_links, on_book, image_dir=cat_dir / "images")
+    
+    if incremental:
+        stats = pipeline.stats
+        console.print(f"🔁 [cyan]{category.nom.title()}: {stats.new} nouveaux, {stats.changed} modifiés, "
+                      f"{stats.unchanged + stats.skipped} inchangés "
+                      f"({stats.skipped} pages détail évitées, {stats.rechecked} revérifiées)[/cyan]")
+    elif listing_only:
+        stats = pipeline.stats
+        console.print(f"📋 [cyan]{category.nom.title()}: {stats.known} complétés depuis le CSV, "
+                      f"{stats.partial} partiels, {stats.fetched} pages détail téléchargées[/cyan]")
+    
+    # Le CSV reste la référence (mode incrémental, reprise) : l'export est refait depuis lui
+    if export_format in COLUMNAR_FORMATS and csv_path.exists():
+        FileHandler.export_csv(csv_path, export_format)
+    if index is not None and csv_path.exists():
+        index.update(csv_path)
+    return csv_path, written
+
+
+def check_listing_options(listing_only: bool, fill_details: bool, incremental: bool,
+                          store_option: Optional[str]):
+    """Vérifie les combinaisons d'options du mode --listing-only."""
+    if fill_details and not listing_only:
+        raise typer.BadParameter("s'utilise avec --listing-only", param_hint="--fill-details")
+    if listing_only and incremental:
+        raise typer.BadParameter("incompatible avec --incremental", param_hint="--listing-only")
+    if listing_only and store_option and not fill_details:
+        # La base est indexée par UPC, absent des livres partiels
+        raise typer.BadParameter("la base nécessite l'UPC des livres : ajoutez --fill-details",
+                                 param_hint="--store")
+
+
+def open_catalog(output: Path, scraper) -> Optional[CatalogMap]:
+    """Carte du catalogue du dossier de sortie.
+
+    Désactivée avec ``--catalog-ttl 0`` et avec une archive WARC, qui doit
+    contenir (ou servir) les pages de listing elles-mêmes.
+    """
+    if not settings.catalog_ttl or settings.record_archive or settings.replay_archive:
+        return None
+    return CatalogMap.for_output(output, scraper.base_url, settings.catalog_ttl, settings.refresh_catalog)
+
+
+def load_categories(scraper, catalog: Optional[CatalogMap]) -> List[Category]:
+    """Catégories de la carte du catalogue si elle est à jour, sinon du site (et enregistrées)."""
+    categories = catalog.categories() if catalog else None
+    if categories is not None:
+        console.print(f"🗺️ [green]{len(categories)} catégories (carte du catalogue)[/green]")
+        return categories
+    categories = scraper.get_all_categories()
+    if catalog and categories:
+        catalog.set_categories(categories)
+        catalog.save()
+    return categories
+
+
+def close_catalog(catalog: Optional[CatalogMap]):
+    """Enregistre la carte du catalogue et affiche les listings évités."""
+    if catalog is None:
+        return
+    catalog.close()
+    if catalog.hits or catalog.updates:
+        console.print(f"🗺️ [cyan]Carte du catalogue: {catalog.hits} catégories sans pages de listing, "
+                      f"{catalog.updates} parcourues et enregistrées[/cyan]")
+
+
+def open_book_store(value: Optional[str]) -> Optional[SQLiteBookStore]:
+    """Ouvre la base de l'option --store, si elle est demandée."""
+    if not value:
+        return None
+    try:
+        return SQLiteBookStore.from_option(value)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--store")
+
+
+def close_book_store(store: Optional[SQLiteBookStore]):
+    """Valide les derniers livres et affiche le contenu de la base."""
+    if store is None:
+        return
+    store.close()
+    console.print(f"🗄️ [cyan]Base {store.path}: {store.written} livres enregistrés ou mis à jour[/cyan]")
+
+
+def create_image_store(output: Path, download_images: bool) -> Optional[ImageStore]:
+    """Stockage des couvertures du dossier de sortie, si les images sont demandées."""
+    if download_images and settings.replay_archive:
+        console.print("[yellow]⚠️ Images ignorées en mode --replay (aucun accès réseau)[/yellow]")
+        return None
+    return ImageStore.for_output(output) if download_images else None
+
+
+def finish_image_store(images: Optional[ImageStore]):
+    """Enregistre l'index des images et affiche le bilan des téléchargements."""
+    if images is None:
+        return
+    images.save()
+    stats = images.stats
+    console.print(f"🖼️ [cyan]Images: {stats.downloaded} téléchargées "
+                  f"({stats.bytes / 1024:.0f} Ko), {stats.reused} réutilisées, "
+                  f"{stats.failed} en échec[/cyan]")
+
 
 def display_banner():
     """Affiche la bannière de bienvenue avec Rich."""
@@ -52,14 +508,20 @@ def display_categories(categories):
 def scrape_single_book(
     url: str = typer.Argument(..., help="URL du livre à analyser"),
     output: Path = typer.Option(Path("output"), "--output", "-o", help="Dossier de sortie"),
-    download_images: bool = typer.Option(False, "--images", "-i", help="Télécharger les images")
+    download_images: bool = typer.Option(False, "--images", "-i", help="Télécharger les images"),
+    export_format: ExportFormat = typer.Option(ExportFormat.csv.value, "--format", "-f",
+                                               help="Format de sortie (parquet/arrow : CSV + fichier en colonnes typées)"),
+    store_option: Optional[str] = typer.Option(None, "--store",
+                                               help="Enregistre aussi les livres dans une base (sqlite:CHEMIN)")
 ):
     """🔍 Analyse un livre unique à partir de son URL."""
+    fmt = check_export_format(export_format)
+    store = open_book_store(store_option)
     display_banner()
     
     console.print(f"🔍 [bold cyan]Analyse du livre: {url}[/bold cyan]")
     
-    scraper = BookStoreScraper()
+    scraper = create_scraper()
     
     with Progress(
         SpinnerColumn(),
@@ -71,6 +533,7 @@ def scrape_single_book(
         book = scraper.get_book_details(url)
         
         if not book:
+            close_book_store(store)
             console.print("[red]❌ Impossible de récupérer les informations du livre[/red]")
             raise typer.Exit(1)
         
@@ -82,9 +545,16 @@ def scrape_single_book(
         # Sauvegarde en CSV
         csv_path = output / "single_book.csv"
         FileHandler.save_books_to_csv([book.to_dict()], csv_path)
+        if fmt in COLUMNAR_FORMATS:
+            FileHandler.export_csv(csv_path, fmt)
+        if store:
+            store.upsert([book])
+        index = BookIndex.for_output(output)
+        index.update(csv_path)
+        index.close()
         
-        # Téléchargement de l'image si demandé
-        if download_images and book.image_url:
+        # Téléchargement de l'image si demandé (jamais en rejeu d'archive)
+        if download_images and book.image_url and not settings.replay_archive:
             img_dir = output / "images"
             FileHandler.create_directory(img_dir)
             
@@ -92,7 +562,8 @@ def scrape_single_book(
             img_path = img_dir / img_filename
             
             progress.update(task, description="🖼️ Téléchargement image...")
-            save_image(book.image_url, img_path)
+            save_image(book.image_url, img_path,
+                       timeout=(settings.connect_timeout, settings.read_timeout))
     
     # Affichage des résultats
     result_table = Table(title="📊 Résultats de l'analyse")
@@ -104,9 +575,11 @@ def scrape_single_book(
     result_table.add_row("Prix HT", book.formatted_price_exc_tax)
     result_table.add_row("Catégorie", book.category)
     result_table.add_row("Note", book.review_rating)
-    result_table.add_row("Disponibilité", str(book.availability_number))
+    available = book.availability_number
+    result_table.add_row("Disponibilité", str(available) if available is not None else book.number_available)
     
     console.print(result_table)
+    close_book_store(store)
     console.print(f"✅ [green]Données sauvegardées dans: {csv_path}[/green]")
 
 
@@ -114,12 +587,28 @@ def scrape_single_book(
 def scrape_category(
     output: Path = typer.Option(Path("output"), "--output", "-o", help="Dossier de sortie"),
     download_images: bool = typer.Option(False, "--images", "-i", help="Télécharger les images"),
-    category_name: Optional[str] = typer.Option(None, "--name", "-n", help="Nom de la catégorie")
+    category_name: Optional[str] = typer.Option(None, "--name", "-n", help="Nom de la catégorie"),
+    incremental: bool = typer.Option(False, "--incremental",
+                                     help="Ne réécrit que les livres nouveaux ou modifiés depuis le dernier run"),
+    recheck_days: float = typer.Option(RECHECK_DAYS, "--recheck-days", min=0,
+                                       help="Avec --incremental : retélécharge la page détail des livres vérifiés "
+                                            "il y a plus de N jours (stock absent du listing, 0 = toujours)"),
+    export_format: ExportFormat = typer.Option(ExportFormat.csv.value, "--format", "-f",
+                                               help="Format de sortie (parquet/arrow : CSV + fichier en colonnes typées)"),
+    store_option: Optional[str] = typer.Option(None, "--store",
+                                               help="Enregistre aussi les livres dans une base (sqlite:CHEMIN)"),
+    listing_only: bool = typer.Option(False, "--listing-only",
+                                      help="Livres lus sur les pages de listing, sans page détail (UPC, description, prix HT vides)"),
+    fill_details: bool = typer.Option(False, "--fill-details",
+                                      help="Avec --listing-only : télécharge la page détail des livres absents du CSV")
 ):
     """📚 Analyse tous les livres d'une catégorie spécifique."""
+    fmt = check_export_format(export_format)
+    check_listing_options(listing_only, fill_details, incremental, store_option)
     display_banner()
     
-    scraper = BookStoreScraper()
+    scraper = create_async_scraper()
+    catalog = open_catalog(output, scraper)
     
     # Récupération des catégories
     with Progress(
@@ -128,7 +617,7 @@ def scrape_category(
         console=console
     ) as progress:
         task = progress.add_task("🔍 Récupération des catégories...", total=None)
-        categories = scraper.get_all_categories()
+        categories = load_categories(scraper, catalog)
     
     if not categories:
         console.print("[red]❌ Aucune catégorie trouvée[/red]")
@@ -163,24 +652,9 @@ def scrape_category(
     
     console.print(f"📚 [bold cyan]Catégorie sélectionnée: {selected_category.nom.title()}[/bold cyan]")
     
-    # Récupération des liens des livres
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console
-    ) as progress:
-        task = progress.add_task("🔗 Récupération des liens...", total=None)
-        book_links = scraper.get_books_from_category(selected_category)
-    
-    if not book_links:
-        console.print("[red]❌ Aucun livre trouvé dans cette catégorie[/red]")
-        raise typer.Exit(1)
-    
-    console.print(f"📖 [green]{len(book_links)} livres trouvés[/green]")
-    
-    # Scraping des livres
-    books_data = []
+    store = open_book_store(store_option)
     
+    # Scraping des livres : découverte, extraction et sauvegarde se font en flux
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -188,62 +662,95 @@ def scrape_category(
         TaskProgressColumn(),
         console=console
     ) as progress:
-        task = progress.add_task("📖 Extraction des données...", total=len(book_links))
-        
-        for i, book_url in enumerate(book_links):
-            book = scraper.get_book_details(book_url)
-            if book:
-                books_data.append(book.to_dict())
-                
-                # Téléchargement d'image si demandé
-                if download_images and book.image_url:
-                    img_dir = output / selected_category.safe_name / "images"
-                    FileHandler.create_directory(img_dir)
-                    
-                    img_filename = FileHandler.sanitize_filename(book.title) + ".jpg"
-                    img_path = img_dir / img_filename
-                    save_image(book.image_url, img_path)
-            
-            progress.update(task, advance=1, description=f"📖 Livre {i+1}/{len(book_links)}")
+        task = progress.add_task("🔗 Récupération des liens...", total=None)
+        images = create_image_store(output, download_images)
+        index = BookIndex.for_output(output)
+        try:
+            csv_path, written = scrape_category_streaming(scraper, selected_category, output,
+                                                          progress, task, incremental, images,
+                                                          export_format=fmt, store=store, index=index,
+                                                          listing_only=listing_only,
+                                                          fill_details=fill_details, catalog=catalog,
+                                                          recheck_days=recheck_days)
+        finally:
+            close_book_store(store)
+            index.close()
+            close_catalog(catalog)
+    
+    finish_image_store(images)
     
-    # Sauvegarde
-    cat_dir = output / selected_category.safe_name
-    FileHandler.create_directory(cat_dir)
+    if incremental:
+        console.print(f"✅ [green]{written} livres mis à jour dans: {csv_path}[/green]")
+        return
     
-    csv_path = cat_dir / f"{selected_category.safe_name}.csv"
-    FileHandler.save_books_to_csv(books_data, csv_path)
+    if not written:
+        console.print("[red]❌ Aucun livre trouvé dans cette catégorie[/red]")
+        raise typer.Exit(1)
     
-    console.print(f"✅ [green]{len(books_data)} livres sauvegardés dans: {csv_path}[/green]")
+    console.print(f"✅ [green]{written} livres sauvegardés dans: {csv_path}[/green]")
 
 
 @app.command("all")
 def scrape_all_books(
     output: Path = typer.Option(Path("output"), "--output", "-o", help="Dossier de sortie"),
-    download_images: bool = typer.Option(False, "--images", "-i", help="Télécharger les images")
+    download_images: bool = typer.Option(False, "--images", "-i", help="Télécharger les images"),
+    incremental: bool = typer.Option(False, "--incremental",
+                                     help="Ne réécrit que les livres nouveaux ou modifiés depuis le dernier run"),
+    recheck_days: float = typer.Option(RECHECK_DAYS, "--recheck-days", min=0,
+                                       help="Avec --incremental : retélécharge la page détail des livres vérifiés "
+                                            "il y a plus de N jours (stock absent du listing, 0 = toujours)"),
+    resume: bool = typer.Option(False, "--resume",
+                                help="Reprend le run interrompu depuis son journal de progression"),
+    export_format: ExportFormat = typer.Option(ExportFormat.csv.value, "--format", "-f",
+                                               help="Format de sortie (parquet/arrow : CSV + fichier en colonnes typées)"),
+    store_option: Optional[str] = typer.Option(None, "--store",
+                                               help="Enregistre aussi les livres dans une base (sqlite:CHEMIN)"),
+    listing_only: bool = typer.Option(False, "--listing-only",
+                                      help="Livres lus sur les pages de listing, sans page détail (UPC, description, prix HT vides)"),
+    fill_details: bool = typer.Option(False, "--fill-details",
+                                      help="Avec --listing-only : télécharge la page détail des livres absents du CSV")
 ):
     """🌍 Analyse TOUS les livres du site (attention: très long!)."""
+    fmt = check_export_format(export_format)
+    check_listing_options(listing_only, fill_details, incremental, store_option)
     display_banner()
     
     if not Confirm.ask("⚠️ Cette opération peut prendre plusieurs heures. Continuer?"):
         raise typer.Exit()
     
-    scraper = BookStoreScraper()
-    
-    # Récupération des catégories
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console
-    ) as progress:
-        task = progress.add_task("🔍 Récupération des catégories...", total=None)
-        categories = scraper.get_all_categories()
+    scraper = create_async_scraper()
+    journal = ProgressJournal.for_output(output, resume)
+    catalog = open_catalog(output, scraper)
     
-    if not categories:
-        console.print("[red]❌ Aucune catégorie trouvée[/red]")
-        raise typer.Exit(1)
+    if journal.categories:
+        categories = journal.categories
+        console.print(f"📓 [cyan]Reprise: {len(journal.finished)} catégories déjà terminées[/cyan]")
+    else:
+        # Récupération des catégories
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console
+        ) as progress:
+            task = progress.add_task("🔍 Récupération des catégories...", total=None)
+            categories = load_categories(scraper, catalog)
+        
+        if not categories:
+            journal.close()
+            console.print("[red]❌ Aucune catégorie trouvée[/red]")
+            raise typer.Exit(1)
+        journal.record_categories(categories)
     
     console.print(f"📚 [green]{len(categories)} catégories à traiter[/green]")
     
+    images = create_image_store(output, download_images)
+    try:
+        store = open_book_store(store_option)
+    except typer.BadParameter:
+        journal.close()
+        raise
+    index = BookIndex.for_output(output)
+    
     # Traitement de toutes les catégories
     with Progress(
         SpinnerColumn(),
@@ -254,46 +761,269 @@ def scrape_all_books(
     ) as progress:
         main_task = progress.add_task("🏷️ Catégories", total=len(categories))
         
-        for category in categories:
-            progress.update(main_task, description=f"📚 {category.nom.title()}")
-            
-            # Récupère les livres de la catégorie
-            book_links = scraper.get_books_from_category(category)
-            
-            if book_links:
-                books_data = []
-                book_task = progress.add_task(f"  📖 Livres de {category.nom}", total=len(book_links))
+        try:
+            for category in categories:
+                if journal.is_finished(category):
+                    progress.update(main_task, advance=1)
+                    continue
                 
-                for book_url in book_links:
-                    book = scraper.get_book_details(book_url)
-                    if book:
-                        books_data.append(book.to_dict())
-                        
-                        # Images si demandé
-                        if download_images and book.image_url:
-                            img_dir = output / category.safe_name / "images"
-                            FileHandler.create_directory(img_dir)
-                            
-                            img_filename = FileHandler.sanitize_filename(book.title) + ".jpg"
-                            img_path = img_dir / img_filename
-                            save_image(book.image_url, img_path)
-                    
-                    progress.update(book_task, advance=1)
-                
-                # Sauvegarde de la catégorie
-                cat_dir = output / category.safe_name
-                FileHandler.create_directory(cat_dir)
-                
-                csv_path = cat_dir / f"{category.safe_name}.csv"
-                FileHandler.save_books_to_csv(books_data, csv_path)
+                progress.update(main_task, description=f"📚 {category.nom.title()}")
                 
+                book_task = progress.add_task(f"  📖 Livres de {category.nom}", total=None)
+                scrape_category_streaming(scraper, category, output, progress, book_task,
+                                          incremental, images, journal, fmt, store, index,
+                                          listing_only, fill_details, catalog, recheck_days)
                 progress.remove_task(book_task)
-            
-            progress.update(main_task, advance=1)
+                
+                progress.update(main_task, advance=1)
+        finally:
+            journal.close()
+            close_book_store(store)
+            index.close()
+            close_catalog(catalog)
     
+    finish_image_store(images)
     console.print("✅ [green]Scraping complet terminé![/green]")
 
 
+@app.command("crawl")
+def crawl_books(
+    output: Path = typer.Option(Path("output"), "--output", "-o", help="Dossier de sortie"),
+    workers: int = typer.Option(2, "--workers", "-w", min=0,
+                                help="Processus workers lancés localement (0 = workers externes uniquement)"),
+    frontier_path: Optional[Path] = typer.Option(None, "--frontier",
+                                                 help="Base SQLite de la frontière (défaut: OUTPUT/.frontier.sqlite)"),
+    resume: bool = typer.Option(False, "--resume",
+                                help="Reprend la frontière existante au lieu de repartir de zéro"),
+    lease: float = typer.Option(60.0, "--lease", min=1,
+                                help="Durée (s) d'un bail : une tâche non acquittée est ensuite redistribuée"),
+    shared: bool = typer.Option(False, "--shared",
+                                help="Frontière ouverte par des crawl-worker d'autres machines (NFS, SMB) : "
+                                     "journal SQLite sans WAL. Implicite avec --workers 0")
+):
+    """🧭 Crawl complet réparti entre plusieurs processus via une frontière SQLite partagée."""
+    display_banner()
+    
+    if settings.record_archive:
+        raise typer.BadParameter("--record n'est pas disponible en mode crawl (une archive par processus)",
+                                 param_hint="--record")
+    if settings.cache_dir:
+        console.print("[yellow]⚠️ Cache HTTP ignoré par les workers du mode crawl[/yellow]")
+    
+    frontier_path = frontier_path or output / UrlFrontier.FILE_NAME
+    # Le WAL exige que tous les processus soient sur la même machine
+    journal_mode = SHARED_JOURNAL if shared or not workers else LOCAL_JOURNAL
+    frontier = UrlFrontier.for_path(frontier_path, fresh=not resume, lease_seconds=lease,
+                                    journal_mode=journal_mode)
+    # Bilans des workers d'un run précédent (--resume) : seul ce run est mesuré
+    frontier.clear_metrics()
+    
+    try:
+        if frontier.stats().total:
+            console.print(f"🧭 [cyan]Reprise de la frontière {frontier_path}[/cyan]")
+        else:
+            scraper = create_scraper()
+            catalog = open_catalog(output, scraper)
+            categories = load_categories(scraper, catalog)
+            if not categories:
+                console.print("[red]❌ Aucune catégorie trouvée[/red]")
+                raise typer.Exit(1)
+            seed_frontier(frontier, scraper, categories, catalog)
+            close_catalog(catalog)
+        
+        console.print(f"👷 [green]{workers} workers locaux, frontière: {frontier_path}[/green]")
+        if frontier.shared:
+            console.print(f"🌐 [cyan]Workers externes: crawl-worker --frontier {frontier_path}[/cyan]")
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=run_worker, args=(str(frontier_path), settings))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TaskProgressColumn(),
+                console=console
+            ) as progress:
+                task = progress.add_task("🧭 Pages livres", total=None)
+                while True:
+                    total, done = frontier.book_counts()
+                    progress.update(task, total=total or None, completed=done,
+                                    description=f"🧭 Pages livres {done}/{total}")
+                    if frontier.stats().finished:
+                        break
+                    if processes and not any(process.is_alive() for process in processes):
+                        console.print("[red]❌ Tous les workers se sont arrêtés avant la fin[/red]")
+                        break
+                    time.sleep(0.5)
+        finally:
+            for process in processes:
+                process.join()
+        
+        # Requêtes et parsing ont eu lieu dans les workers : leurs bilans rejoignent
+        # celui du coordinateur avant l'affichage et --metrics-file
+        for data in frontier.worker_metrics():
+            run_metrics.merge(data)
+        
+        # Fusion : un CSV par catégorie, comme la commande all
+        index = BookIndex.for_output(output)
+        written = merge_results(frontier, output)
+        for csv_path in written.values():
+            index.update(csv_path)
+        index.close()
+        
+        failures = frontier.failures()
+        if failures:
+            console.print(f"[yellow]⚠️ {len(failures)} URLs abandonnées après plusieurs échecs[/yellow]")
+            for url, error in failures[:20]:
+                console.print(f"   [yellow]• {url}: {error}[/yellow]")
+    finally:
+        frontier.close()
+    
+    console.print(f"✅ [green]{len(written)} catégories fusionnées dans {output}[/green]")
+
+
+@app.command("crawl-worker")
+def crawl_worker(
+    frontier_path: Path = typer.Option(..., "--frontier", exists=True, dir_okay=False,
+                                       help="Base SQLite de la frontière partagée")
+):
+    """👷 Worker de crawl à lancer sur une autre machine partageant la frontière (crawl --shared)."""
+    frontier = UrlFrontier(frontier_path)
+    shared = frontier.shared
+    frontier.close()
+    if not shared:
+        # Une base WAL ouverte depuis une autre machine se corrompt ou se bloque
+        console.print("[red]❌ Frontière en mode WAL, réservée aux workers locaux : "
+                      "relancez crawl avec --shared[/red]")
+        raise typer.Exit(1)
+    
+    console.print(f"👷 [cyan]Worker connecté à {frontier_path}[/cyan]")
+    processed = run_worker(str(frontier_path), settings)
+    console.print(f"✅ [green]{processed} tâches traitées[/green]")
+
+
+@app.command("analyze")
+def analyze_books(
+    output: Path = typer.Option(Path("output"), "--output", "-o", exists=True, file_okay=False,
+                                help="Dossier de sortie à analyser (sous-dossiers et snapshots compris)")
+):
+    """📊 Statistiques de prix, de taxe, de stock et de notes par catégorie."""
+    display_banner()
+    
+    try:
+        require_numpy()
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="analyze")
+    
+    paths = find_book_csvs(output)
+    with console.status(f"📥 Chargement de {len(paths)} fichiers CSV..."):
+        start = time.perf_counter()
+        data = load_columns(paths)
+        stats = category_stats(data)
+        elapsed = time.perf_counter() - start
+    
+    if not len(data):
+        console.print(f"[red]❌ Aucun livre trouvé dans {output}[/red]")
+        raise typer.Exit(1)
+    
+    table = Table(title=f"📊 Analyse de {len(data)} livres ({len(paths)} fichiers)")
+    table.add_column("Catégorie", style="cyan", no_wrap=True)
+    table.add_column("Livres", justify="right")
+    table.add_column("Prix min", justify="right", style="green")
+    table.add_column("Médian", justify="right")
+    table.add_column("Prix max", justify="right", style="red")
+    table.add_column("Taxe moy.", justify="right", style="magenta")
+    table.add_column("Taxe max", justify="right", style="magenta")
+    table.add_column("Stock", justify="right", style="blue")
+    table.add_column("Note moy.", justify="right", style="yellow")
+    
+    for i in stats.books.argsort()[::-1]:
+        rating = f"{stats.mean_rating[i]:.2f}" if stats.ratings[i, 1:].any() else "-"
+        stock = str(stats.stock[i])
+        if stats.unknown_stock[i]:
+            stock += f" (+{stats.unknown_stock[i]} ?)"
+        table.add_row(stats.categories[i].title(), str(stats.books[i]),
+                      f"£{stats.min_price[i]:.2f}", f"£{stats.median_price[i]:.2f}",
+                      f"£{stats.max_price[i]:.2f}", format_price(stats.mean_tax[i]),
+                      format_price(stats.max_tax[i]), stock, rating)
+    console.print(table)
+    
+    distribution = Table(title="⭐ Répartition des notes")
+    distribution.add_column("Note", style="yellow")
+    distribution.add_column("Livres", justify="right")
+    distribution.add_column("Part", justify="right", style="cyan")
+    totals = stats.ratings.sum(axis=0)
+    for level, count in enumerate(totals):
+        if level == 0 and not count:
+            continue
+        label = "⭐" * level if level else "Inconnue"
+        distribution.add_row(label, str(count), f"{count / len(data):.1%}")
+    console.print(distribution)
+    
+    console.print(f"📦 [cyan]Stock total: {stats.stock.sum()} exemplaires, "
+                  f"analyse en {elapsed * 1000:.0f} ms[/cyan]")
+    unknown_stock = stats.unknown_stock.sum()
+    if unknown_stock:
+        console.print(f"[yellow]⚠️ {unknown_stock} livres en stock sans nombre d'exemplaires "
+                      f"(lus sur le listing) ne sont pas comptés dans le stock[/yellow]")
+
+
+@app.command("query")
+def query_books(
+    terms: List[str] = typer.Argument(..., help="UPC ou titre exact (casse et espaces ignorés)"),
+    output: Path = typer.Option(Path("output"), "--output", "-o", exists=True, file_okay=False,
+                                help="Dossier de sortie à interroger"),
+    reindex: bool = typer.Option(False, "--reindex",
+                                 help="Parcourt tout le dossier (CSV ajoutés ou modifiés hors de l'outil)")
+):
+    """🔎 Retrouve un livre par UPC ou par titre dans tous les CSV, via l'index persistant."""
+    # Chronométrée en entier : ouverture de l'index, recherches, vérification des CSV, lecture des lignes
+    start = time.perf_counter()
+    index = BookIndex.for_output(output)
+    try:
+        # Les CSV écrits par l'outil sont indexés au fil de l'eau : le dossier
+        # n'est parcouru que pour un index neuf ou sur demande
+        refreshed = index.refresh() if reindex or index.empty else 0
+        if refreshed:
+            console.print(f"🔎 [cyan]{refreshed} fichiers CSV (ré)indexés[/cyan]")
+        
+        table = Table(title=f"🔎 Résultats ({index.count()} livres indexés)")
+        table.add_column("Fichier", style="magenta")
+        table.add_column("UPC", style="cyan", no_wrap=True)
+        table.add_column("Titre", style="green")
+        table.add_column("Prix TTC", justify="right")
+        table.add_column("Disponibilité")
+        table.add_column("Note", style="yellow")
+        
+        found = 0
+        shown = set()  # Une ligne trouvée par plusieurs termes n'est affichée qu'une fois
+        for term in terms:
+            locations = index.lookup(term)
+            if not locations:
+                console.print(f"[yellow]⚠️ Aucun livre pour '{term}'[/yellow]")
+            for location in locations:
+                if location in shown:
+                    continue
+                shown.add(location)
+                row = index.read_row(location)
+                table.add_row(location[0], row["universal_product_code"], row["title"],
+                              f"£{row['price_including_tax']}", row["number_available"],
+                              row["review_rating"])
+                found += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        index.close()
+    
+    if not found:
+        raise typer.Exit(1)
+    console.print(table)
+    console.print(f"✅ [green]{found} lignes trouvées en {elapsed * 1000:.2f} ms[/green]")
+
+
 @app.command("interactive")
 def interactive_mode():
     """🎮 Mode interactif avec menu."""
@@ -321,13 +1051,15 @@ def interactive_mode():
         elif choice == "1":
             url = Prompt.ask("🔗 URL du livre")
             download_imgs = Confirm.ask("🖼️ Télécharger les images?", default=False)
-            scrape_single_book(url, Path("output"), download_imgs)
+            scrape_single_book(url, Path("output"), download_imgs, ExportFormat.csv, None)
         elif choice == "2":
             download_imgs = Confirm.ask("🖼️ Télécharger les images?", default=False)
-            scrape_category(Path("output"), download_imgs, None)
+            scrape_category(Path("output"), download_imgs, None, False, ExportFormat.csv, None,
+                            False, False)
         elif choice == "3":
             download_imgs = Confirm.ask("🖼️ Télécharger les images?", default=False)
-            scrape_all_books(Path("output"), download_imgs)
+            scrape_all_books(Path("output"), download_imgs, False, False, ExportFormat.csv, None,
+                             False, False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+"""
+⚙️ Configuration partagée entre le scraper et l'interface CLI
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class ScraperConfig:
+    """Réglages du moteur de scraping (réseau, parallélisme...)."""
+
+    # Nombre maximum de pages détail récupérées en parallèle (1 = mode séquentiel)
+    concurrency: int = 1
+
+    # Ajuste le parallélisme par hôte selon la latence et les 429/503 (AIMD)
+    adaptive: bool = False
+    # Plafond du parallélisme en mode adaptatif
+    max_concurrency: int = 32
+
+    # Timeouts (secondes) d'établissement de connexion et de lecture de chaque requête
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    # Nouvelles tentatives sur erreur réseau / statut transitoire, attente de base (secondes)
+    retries: int = 2
+    backoff: float = 0.5
+    # Doublonne une requête qui dépasse le p95 observé (la première réponse l'emporte)
+    hedge: bool = False
+    # Budget de temps global du run en secondes (None = illimité)
+    deadline: Optional[float] = None
+
+    # Nombre maximum de pages de listing récupérées en parallèle
+    page_concurrency: int = 8
+
+    # Nombre maximum d'images téléchargées en parallèle
+    image_concurrency: int = 4
+
+    # Backend de parsing HTML (voir parsers.PARSER_BACKENDS)
+    parser: str = "html.parser"
+
+    # Nombre de processus dédiés au parsing HTML (0 = parsing dans le processus principal)
+    parse_workers: int = 0
+
+    # Cache HTTP persistant (désactivé si aucun dossier n'est fourni)
+    cache_dir: Optional[Path] = None
+    cache_max_mb: int = 100
+    # Durée (secondes) pendant laquelle une réponse est servie sans revalidation
+    cache_max_age: float = 0
+
+    # Carte du catalogue (catégories, livres des listings) : durée de validité en secondes
+    # (0 = désactivée). Optionnelle : un livre ajouté depuis la carte échappe au run
+    catalog_ttl: float = 0.0
+    # Ignore la carte existante et la reconstruit
+    refresh_catalog: bool = False
+
+    # Archive WARC : enregistre chaque réponse (record) ou sert les pages depuis l'archive (replay)
+    record_archive: Optional[Path] = None
+    replay_archive: Optional[Path] = None
@@ -0,0 +1,356 @@
+"""
+🧭 Frontière d'URLs SQLite partagée par les workers du mode crawl (bail / acquittement)
+"""
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rich.console import Console
+
+from .config import ScraperConfig
+from .metrics import run_metrics
+from .models.book import Book, Category
+from .utils.catalog import CatalogMap
+
+console = Console()
+
+# Types de tâches : page de listing d'une catégorie ou page détail d'un livre
+LISTING = "listing"
+BOOK = "book"
+
+# Modes de journal SQLite : le WAL repose sur une mémoire partagée propre à une
+# machine ; une frontière ouverte depuis plusieurs machines (NFS, SMB) garde le
+# journal classique, qui ne dépend que des verrous du système de fichiers
+LOCAL_JOURNAL = "wal"
+SHARED_JOURNAL = "truncate"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    url TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    category TEXT NOT NULL,
+    category_url TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, kind);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    owner TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class Task:
+    """Une URL à traiter, louée par un worker."""
+
+    url: str
+    kind: str
+    category: Category
+    page: int
+    position: int
+
+
+@dataclass
+class FrontierStats:
+    pending: int = 0
+    leased: int = 0
+    done: int = 0
+    failed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.pending + self.leased + self.done + self.failed
+
+    @property
+    def finished(self) -> bool:
+        return not self.pending and not self.leased
+
+
+class UrlFrontier:
+    """File d'URLs durable dans une base SQLite.
+
+    Un worker *loue* un lot de tâches pour ``lease_seconds`` : elles ne sont
+    plus proposées aux autres workers. Il les *acquitte* une fois traitées
+    (avec le livre extrait pour une page détail) ou les signale en échec.
+    Une tâche dont le bail expire (worker arrêté ou machine perdue) redevient
+    disponible ; après ``max_attempts`` échecs elle est abandonnée.
+
+    Plusieurs processus peuvent utiliser la même frontière : les baux sont
+    pris dans une transaction ``BEGIN IMMEDIATE``. Le mode de journal est
+    choisi par le coordinateur qui crée la frontière (``journal_mode``) et
+    conservé par les workers : :data:`LOCAL_JOURNAL` quand tous les workers
+    tournent sur sa machine, :data:`SHARED_JOURNAL` pour des workers sur
+    d'autres machines partageant le fichier (système de fichiers réseau
+    avec verrous fonctionnels).
+    """
+
+    FILE_NAME = ".frontier.sqlite"
+
+    def __init__(self, path: Path, lease_seconds: float = 60.0, max_attempts: int = 3,
+                 journal_mode: Optional[str] = None):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if journal_mode:
+            self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.journal_mode = self._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if self.journal_mode == LOCAL_JOURNAL:
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def shared(self) -> bool:
+        """Vrai si des workers d'autres machines peuvent ouvrir la frontière."""
+        return self.journal_mode != LOCAL_JOURNAL
+
+    @classmethod
+    def for_path(cls, path: Path, fresh: bool = False, **kwargs) -> "UrlFrontier":
+        """Ouvre la frontière ``path``, vidée au préalable si ``fresh``."""
+        if fresh:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(f"{path}{suffix}")
+                except FileNotFoundError:
+                    pass
+        return cls(path, **kwargs)
+
+    def set_meta(self, key: str, value: str):
+        """Enregistre un réglage partagé par les workers (URL du site...)."""
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def save_metrics(self, owner: str, data: dict):
+        """Enregistre le bilan :meth:`RunMetrics.to_dict` d'un worker."""
+        self._conn.execute("INSERT OR REPLACE INTO metrics (owner, data) VALUES (?, ?)",
+                           (owner, json.dumps(data)))
+
+    def worker_metrics(self) -> List[dict]:
+        """Bilans enregistrés par les workers, à fusionner par le coordinateur."""
+        rows = self._conn.execute("SELECT data FROM metrics ORDER BY owner")
+        return [json.loads(data) for (data,) in rows]
+
+    def clear_metrics(self):
+        self._conn.execute("DELETE FROM metrics")
+
+    def add(self, tasks: Iterable[Tuple[str, str, Category, int, int]]) -> int:
+        """Ajoute des tâches ``(url, kind, category, page, position)`` ; les URLs déjà connues sont ignorées."""
+        rows = [(url, kind, category.nom, category.url, page, position)
+                for url, kind, category, page, position in tasks]
+        with self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tasks (url, kind, category, category_url, page, position) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            return self._conn.total_changes - before
+
+    def lease(self, owner: str, limit: int = 1) -> List[Task]:
+        """Loue jusqu'à ``limit`` tâches disponibles, pages de listing d'abord."""
+        now = time.time()
+        with self._transaction(immediate=True):
+            rows = self._conn.execute(
+                "SELECT url, kind, category, category_url, page, position FROM tasks "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY kind = 'book', page, position LIMIT ?", (now, limit)).fetchall()
+            self._conn.executemany(
+                "UPDATE tasks SET state = 'leased', owner = ?, lease_expires = ? WHERE url = ?",
+                [(owner, now + self.lease_seconds, row[0]) for row in rows])
+        return [Task(url, kind, Category(category, category_url), page, position)
+                for url, kind, category, category_url, page, position in rows]
+
+    def ack(self, url: str, result: Optional[tuple] = None):
+        """Marque une tâche traitée, avec l'enregistrement du livre extrait."""
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE tasks SET state = 'done', lease_expires = NULL, result = ? "
+                "WHERE url = ?", (json.dumps(result) if result is not None else None, url))
+
+    def fail(self, url: str, error: str):
+        """Remet une tâche en file, ou l'abandonne après ``max_attempts`` échecs."""
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE tasks SET attempts = attempts + 1, error = ?, owner = NULL, lease_expires = NULL, "
+                "state = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END WHERE url = ?",
+                (error, self.max_attempts, url))
+
+    def stats(self) -> FrontierStats:
+        now = time.time()
+        stats = FrontierStats()
+        for state, expired, count in self._conn.execute(
+                "SELECT state, state = 'leased' AND lease_expires < ?, COUNT(*) FROM tasks "
+                "GROUP BY 1, 2", (now,)):
+            # Un bail expiré compte comme une tâche en attente
+            state = "pending" if expired else state
+            setattr(stats, state, getattr(stats, state) + count)
+        return stats
+
+    def book_counts(self) -> Tuple[int, int]:
+        """Nombre de pages détail connues et traitées (barre de progression)."""
+        return self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(state IN ('done', 'failed')), 0) FROM tasks WHERE kind = ?",
+            (BOOK,)).fetchone()
+
+    def failures(self) -> List[Tuple[str, str]]:
+        return self._conn.execute("SELECT url, error FROM tasks WHERE state = 'failed'").fetchall()
+
+    def results(self) -> Iterator[Tuple[Category, List[Book]]]:
+        """Livres extraits, regroupés par catégorie dans l'ordre des pages de listing."""
+        rows = self._conn.execute(
+            "SELECT category, category_url, result FROM tasks "
+            "WHERE kind = ? AND state = 'done' AND result IS NOT NULL "
+            "ORDER BY category, page, position", (BOOK,))
+        current, books = None, []
+        for category, category_url, result in rows:
+            if current is not None and category != current.nom:
+                yield current, books
+                books = []
+            current = Category(category, category_url)
+            books.append(Book(*json.loads(result)))
+        if current is not None:
+            yield current, books
+
+    def close(self):
+        self._conn.close()
+
+    @contextmanager
+    def _transaction(self, immediate: bool = False):
+        self._conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+
+def seed_frontier(frontier: UrlFrontier, scraper, categories: List[Category],
+                  catalog: Optional[CatalogMap] = None) -> int:
+    """Ajoute la première page de listing de chaque catégorie et l'URL du site.
+
+    Pour une catégorie à jour dans la carte du catalogue, ses pages détail
+    sont ajoutées directement, sans passer par les pages de listing.
+    """
+    frontier.set_meta("base_url", scraper.base_url)
+    tasks = []
+    for category in categories:
+        pages = catalog.listing(category) if catalog else None
+        if pages is None:
+            tasks.append((scraper.category_page_url(category, 1), LISTING, category, 1, 0))
+            continue
+        for page, items in enumerate(pages, 1):
+            tasks += [(item.url, BOOK, category, page, position) for position, item in enumerate(items)]
+    return frontier.add(tasks)
+
+
+def run_worker(frontier_path: str, config: ScraperConfig, owner: Optional[str] = None,
+               batch_size: int = 8, idle_delay: float = 0.5) -> int:
+    """Boucle d'un worker : loue des tâches, les traite et les acquitte.
+
+    Une page de listing ajoute les pages détail de ses livres et les pages de
+    listing suivantes ; une page détail est acquittée avec le livre extrait.
+    Le worker s'arrête quand il ne reste plus de tâche en attente ni louée ;
+    il enregistre alors ses métriques dans la frontière pour le coordinateur.
+    Renvoie le nombre de tâches traitées.
+    """
+    from .scraper import BookStoreScraper
+
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+    # Le cache HTTP et l'archive WARC ne se partagent pas entre processus
+    config = replace(config, cache_dir=None, record_archive=None)
+    frontier = UrlFrontier(Path(frontier_path))
+    base_url = frontier.get_meta("base_url")
+    scraper = BookStoreScraper(base_url, config) if base_url else BookStoreScraper(config=config)
+    processed = 0
+    run_metrics.reset()
+    try:
+        while True:
+            tasks = frontier.lease(owner, batch_size)
+            if not tasks:
+                if frontier.stats().finished:
+                    return processed
+                # D'autres workers peuvent encore ajouter des pages
+                time.sleep(idle_delay)
+                continue
+
+            for task in tasks:
+                try:
+                    if task.kind == LISTING:
+                        _process_listing(frontier, scraper, task)
+                    else:
+                        _process_book(frontier, scraper, task)
+                except Exception as e:
+                    # Une page qui fait planter le traitement ne doit pas arrêter le
+                    # worker : l'échec est compté et la tâche abandonnée après
+                    # ``max_attempts`` essais, au lieu d'être relouée indéfiniment
+                    console.print(f"[red]❌ Erreur lors du traitement de {task.url}: {e}[/red]")
+                    frontier.fail(task.url, f"{type(e).__name__}: {e}")
+                processed += 1
+    finally:
+        frontier.save_metrics(owner, run_metrics.to_dict())
+        frontier.close()
+        scraper.close()
+
+
+def _process_listing(frontier: UrlFrontier, scraper, task: Task):
+    listing = scraper._fetch_listing(task.url)
+    if listing is None:
+        frontier.ack(task.url)
+        return
+
+    tasks = [(url, BOOK, task.category, task.page, position)
+             for position, url in enumerate(listing.links)]
+    if task.page == 1 and listing.page_count:
+        next_pages = range(2, listing.page_count + 1)
+    else:
+        next_pages = [task.page + 1] if listing.has_next else []
+    tasks += [(scraper.category_page_url(task.category, page), LISTING, task.category, page, 0)
+              for page in next_pages]
+    frontier.add(tasks)
+    frontier.ack(task.url)
+
+
+def _process_book(frontier: UrlFrontier, scraper, task: Task):
+    response = scraper.fetch(task.url)
+    response.raise_for_status()
+    book = scraper.parse_book_details(response.content, task.url)
+    if book is None:
+        frontier.fail(task.url, "page produit illisible")
+        return
+    frontier.ack(task.url, book.to_record())
+
+
+def merge_results(frontier: UrlFrontier, output: Path) -> Dict[str, Path]:
+    """Écrit un CSV par catégorie à partir des livres de la frontière (coordinateur)."""
+    from .utils.file_handler import BookCSVWriter
+
+    written = {}
+    for category, books in frontier.results():
+        csv_path = output / category.safe_name / f"{category.safe_name}.csv"
+        with BookCSVWriter(csv_path) as writer:
+            for book in books:
+                writer.write(book)
+        written[category.nom] = csv_path
+    return written
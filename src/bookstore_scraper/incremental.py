@@ -0,0 +1,126 @@
+"""
+🔁 Re-crawl incrémental : seules les lignes des livres modifiés sont réécrites
+"""
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from rich.console import Console
+
+from .async_scraper import AsyncBookStoreScraper
+from .models.book import Book, Category
+from .pipeline import ScrapePipeline
+from .models.listing import ListingItem
+from .utils.file_handler import CSV_HEADERS, FileHandler
+from .utils.manifest import RECHECK_DAYS, CrawlManifest
+
+console = Console()
+
+
+@dataclass
+class IncrementalStats:
+    """Bilan d'un re-crawl incrémental."""
+
+    skipped: int = 0  # Prix et disponibilité inchangés sur le listing : pas de page détail
+    rechecked: int = 0  # Listing inchangé, mais page détail trop ancienne : retéléchargée (stock)
+    unchanged: int = 0  # Page détail téléchargée mais contenu identique
+    new: int = 0
+    changed: int = 0
+
+
+class IncrementalPipeline(ScrapePipeline):
+    """Pipeline qui compare chaque livre au manifeste de la catégorie.
+
+    - les livres dont le prix et la disponibilité du listing n'ont pas bougé
+      ne sont pas téléchargés, sauf si leur page détail date de plus de
+      ``max_age`` secondes : le nombre d'exemplaires n'apparaît que sur elle ;
+    - les autres sont comparés à leur empreinte : seules les lignes nouvelles
+      ou modifiées sont réécrites dans le CSV existant ;
+    - ces lignes sont aussi écrites dans ``<catégorie>.delta.csv``.
+    """
+
+    def __init__(self, scraper: AsyncBookStoreScraper, manifest: CrawlManifest,
+                 max_age: Optional[float] = RECHECK_DAYS * 86400, **kwargs):
+        super().__init__(scraper, **kwargs)
+        self.manifest = manifest
+        self.max_age = max_age
+        self.stats = IncrementalStats()
+        self._listing: Dict[str, str] = {}
+
+    def accept(self, item: ListingItem) -> bool:
+        if self.manifest.listing_unchanged(item.url, item.signature):
+            if not self.manifest.detail_stale(item.url, self.max_age):
+                self.manifest.mark_seen(item.url)
+                self.stats.skipped += 1
+                return False
+            self.stats.rechecked += 1
+        self._listing[item.url] = item.signature
+        return True
+
+    def listing_signature(self, url: str) -> str:
+        """Prix / disponibilité vus sur le listing pour un livre retenu."""
+        return self._listing.get(url, "")
+
+    def open_writer(self, category: Category, csv_path: Path) -> "_IncrementalWriter":
+        return _IncrementalWriter(self, csv_path)
+
+
+class _IncrementalWriter:
+    """Accumule les livres modifiés et patche le CSV à la fermeture."""
+
+    def __init__(self, pipeline: IncrementalPipeline, csv_path: Path):
+        self.pipeline = pipeline
+        self.csv_path = csv_path
+        self.changes: List[Tuple[str, Book]] = []
+
+    def write(self, book: Book):
+        stats = self.pipeline.stats
+        change = self.pipeline.manifest.update(
+            book, self.pipeline.listing_signature(book.product_page_url))
+        if change is None:
+            stats.unchanged += 1
+            return
+        if change == "new":
+            stats.new += 1
+        else:
+            stats.changed += 1
+        self.changes.append((change, book))
+
+    def close(self) -> int:
+        if self.changes:
+            self._patch_csv()
+        # Toujours réécrit : un delta vide signifie "rien n'a changé depuis le dernier run"
+        self._write_delta()
+        self.pipeline.manifest.save()
+        return len(self.changes)
+
+    def abort(self):
+        """Interruption : ni le CSV, ni le delta, ni le manifeste ne sont modifiés."""
+        self.changes.clear()
+
+    def _patch_csv(self):
+        """Remplace les lignes modifiées (par UPC) et ajoute les nouvelles en fin de fichier."""
+        rows = FileHandler.load_books_from_csv(self.csv_path)
+        position = {row["universal_product_code"]: i for i, row in enumerate(rows)}
+
+        for _, book in self.changes:
+            row = book.to_dict()
+            index = position.get(book.universal_product_code)
+            if index is None:
+                position[book.universal_product_code] = len(rows)
+                rows.append(row)
+            else:
+                rows[index] = row
+
+        FileHandler.save_books_to_csv(rows, self.csv_path)
+
+    def _write_delta(self):
+        """Écrit les seules lignes nouvelles / modifiées de ce run."""
+        delta_path = self.csv_path.with_suffix(".delta.csv")
+        delta_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(delta_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=["change"] + CSV_HEADERS)
+            writer.writeheader()
+            for change, book in self.changes:
+                writer.writerow({"change": change, **book.to_dict()})
@@ -0,0 +1,82 @@
+"""
+📋 Mode --listing-only : livres construits depuis les pages de listing, sans page détail
+"""
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Optional
+
+from .async_scraper import AsyncBookStoreScraper
+from .models.book import Book, Category, parse_availability, parse_price
+from .models.listing import ListingItem
+from .pipeline import ScrapePipeline
+from .utils.file_handler import FileHandler
+
+
+@dataclass
+class ListingOnlyStats:
+    """Bilan d'un run --listing-only."""
+
+    known: int = 0  # Champs de la page détail repris du CSV existant
+    partial: int = 0  # Livres partiels (UPC, description et prix HT vides)
+    fetched: int = 0  # Pages détail téléchargées (--fill-details)
+
+
+class ListingOnlyPipeline(ScrapePipeline):
+    """Pipeline qui se contente des pages de listing (une requête pour 20 livres).
+
+    Le listing donne le titre, le prix TTC, la note, la miniature et l'état du
+    stock. Pour chaque livre :
+
+    - déjà présent dans le CSV de la catégorie au même prix : les champs de
+      la page détail (UPC, description, prix HT, image) en sont repris ;
+    - sinon, un livre partiel est écrit, ou sa page détail est téléchargée
+      avec ``fill_details``.
+    """
+
+    def __init__(self, scraper: AsyncBookStoreScraper, fill_details: bool = False, **kwargs):
+        super().__init__(scraper, **kwargs)
+        self.fill_details = fill_details
+        self.stats = ListingOnlyStats()
+        self._known: Dict[str, Book] = {}
+        self._category = ""
+
+    async def run_async(self, category: Category, csv_path: Path, *args, **kwargs) -> int:
+        self._known = load_known_books(csv_path)
+        # Nom affiché de secours si la page de listing n'a pas de titre
+        self._category = category.nom.title()
+        return await super().run_async(category, csv_path, *args, **kwargs)
+
+    def listing_book(self, item: ListingItem) -> Optional[Book]:
+        known = self._known.get(item.url)
+        if known is not None and known.price_including_tax == parse_price(item.price):
+            self.stats.known += 1
+            return merge_listing(known, item)
+        if self.fill_details:
+            self.stats.fetched += 1
+            return None
+        self.stats.partial += 1
+        return replace(item.to_book(), category=item.category or self._category)
+
+
+def load_known_books(csv_path: Path) -> Dict[str, Book]:
+    """Livres complets (avec UPC) d'un CSV existant, par URL."""
+    books = {}
+    for row in FileHandler.load_books_from_csv(csv_path):
+        if row.get("universal_product_code"):
+            books[row["product_page_url"]] = Book(**row)
+    return books
+
+
+def merge_listing(known: Book, item: ListingItem) -> Book:
+    """Met à jour un livre connu avec les informations du listing.
+
+    Le nombre d'exemplaires n'apparaît que sur la page détail : il est
+    conservé tant que le listing indique toujours le livre en stock.
+    """
+    availability = item.availability or known.number_available
+    if availability == "In stock" and parse_availability(known.number_available):
+        availability = known.number_available
+    return replace(known,
+                   title=item.title or known.title,
+                   number_available=availability,
+                   review_rating=item.rating or known.review_rating)
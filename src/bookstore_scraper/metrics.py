@@ -0,0 +1,264 @@
+"""
+📈 Métriques du run : requêtes, latences, octets, parsing, écriture CSV et images
+"""
+import bisect
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+from urllib.parse import urlparse
+
+# Bornes supérieures (secondes) des classes des histogrammes de durée
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statut noté pour une requête sans réponse (erreur réseau, timeout)
+ERROR_STATUS = "error"
+
+# Extensions de --metrics-file reconnues comme texte Prometheus (sinon JSON)
+PROMETHEUS_SUFFIXES = (".prom", ".txt")
+
+
+class Histogram:
+    """Histogramme cumulable à classes fixes, au format Prometheus."""
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self):
+        # Une case par borne de LATENCY_BUCKETS, plus une pour les valeurs au-delà (+Inf)
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimation du quantile ``q`` par interpolation dans sa classe (comme ``histogram_quantile``)."""
+        total = self.count
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(LATENCY_BUCKETS):
+                    # Au-delà de la dernière borne : la borne est la meilleure estimation
+                    return LATENCY_BUCKETS[-1]
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                return lower + (LATENCY_BUCKETS[i] - lower) * (rank - seen) / count
+            seen += count
+        return LATENCY_BUCKETS[-1]
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        """Couples ``(borne, nombre cumulé)`` des séries ``_bucket``."""
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.counts):
+            running += count
+            yield ("+Inf" if bound == float("inf") else f"{bound:g}"), running
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "sum": round(self.sum, 6),
+                "buckets": dict(self.cumulative())}
+
+    def merge(self, data: dict):
+        """Ajoute un histogramme exporté par :meth:`to_dict` (classes cumulées)."""
+        previous = 0
+        for i, running in enumerate(data["buckets"].values()):
+            self.counts[i] += running - previous
+            previous = running
+        self.sum += data["sum"]
+
+
+@dataclass
+class RequestStats:
+    """Requêtes d'un hôte ayant reçu un même statut."""
+
+    latency: Histogram = field(default_factory=Histogram)
+    bytes: int = 0
+
+
+class RunMetrics:
+    """Instrumentation d'un run, alimentée par les scrapers et les écritures de fichiers.
+
+    - requêtes HTTP par hôte et statut : nombre, histogramme de latence, octets reçus ;
+    - durée de parsing par type de page (``book``, ``listing``, ``home``) ;
+    - durée d'écriture des CSV et nombre de lignes ;
+    - images téléchargées et leurs octets.
+
+    Le bilan s'exporte en JSON (:meth:`to_json`) ou au format texte de
+    Prometheus (:meth:`to_prometheus`), par exemple pour un node_exporter
+    (textfile collector) qui suit un scraping lancé par cron.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.requests: Dict[Tuple[str, str], RequestStats] = {}
+        self.parse: Dict[str, Histogram] = {}
+        self.write_seconds = 0.0
+        self.rows_written = 0
+        self.images = 0
+        self.image_bytes = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    # ------------------------------------------------------------------
+    # Enregistrement
+    # ------------------------------------------------------------------
+
+    def record_request(self, url: str, status, seconds: float, size: int = 0):
+        """Note une requête terminée (``status`` : code HTTP ou :data:`ERROR_STATUS`)."""
+        key = (urlparse(url).netloc, str(status))
+        stats = self.requests.get(key)
+        if stats is None:
+            stats = self.requests[key] = RequestStats()
+        stats.latency.observe(seconds)
+        stats.bytes += size
+
+    def record_parse(self, page_type: str, seconds: float):
+        histogram = self.parse.get(page_type)
+        if histogram is None:
+            histogram = self.parse[page_type] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time_parse(self, page_type: str):
+        """Mesure la durée du parsing d'une page du type donné."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_parse(page_type, time.perf_counter() - start)
+
+    def record_write(self, seconds: float, rows: int = 0):
+        self.write_seconds += seconds
+        self.rows_written += rows
+
+    def record_image(self, size: int):
+        self.images += 1
+        self.image_bytes += size
+
+    def merge(self, data: dict):
+        """Ajoute le bilan :meth:`to_dict` d'un autre processus (worker du mode crawl).
+
+        La durée et le début du run restent ceux de ce processus.
+        """
+        for entry in data["requests"]:
+            key = (entry["host"], entry["status"])
+            stats = self.requests.get(key)
+            if stats is None:
+                stats = self.requests[key] = RequestStats()
+            stats.latency.merge(entry["latency_seconds"])
+            stats.bytes += entry["bytes"]
+        for page_type, values in data["parse_seconds"].items():
+            histogram = self.parse.get(page_type)
+            if histogram is None:
+                histogram = self.parse[page_type] = Histogram()
+            histogram.merge(values)
+        self.write_seconds += data["csv"]["write_seconds"]
+        self.rows_written += data["csv"]["rows"]
+        self.images += data["images"]["count"]
+        self.image_bytes += data["images"]["bytes"]
+
+    # ------------------------------------------------------------------
+    # Bilan
+    # ------------------------------------------------------------------
+
+    @property
+    def request_count(self) -> int:
+        return sum(stats.latency.count for stats in self.requests.values())
+
+    @property
+    def bytes_received(self) -> int:
+        return sum(stats.bytes for stats in self.requests.values())
+
+    def hosts(self) -> List[Tuple[str, str, RequestStats]]:
+        """Statistiques par hôte et statut, triées."""
+        return [(host, status, stats) for (host, status), stats in sorted(self.requests.items())]
+
+    def to_dict(self) -> dict:
+        elapsed = self.elapsed
+        return {
+            "started": self.started,
+            "duration_seconds": round(elapsed, 6),
+            "requests": [{"host": host, "status": status, "count": stats.latency.count,
+                          "bytes": stats.bytes, "latency_seconds": stats.latency.to_dict()}
+                         for host, status, stats in self.hosts()],
+            "requests_per_second": round(self.request_count / elapsed, 3) if elapsed else 0.0,
+            "parse_seconds": {page_type: histogram.to_dict()
+                              for page_type, histogram in sorted(self.parse.items())},
+            "csv": {"rows": self.rows_written, "write_seconds": round(self.write_seconds, 6)},
+            "images": {"count": self.images, "bytes": self.image_bytes},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Bilan au format texte d'exposition Prometheus."""
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: str, values: Histogram):
+            for bound, count in values.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {values.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {values.count}")
+
+        metric("bookstore_http_request_duration_seconds", "histogram",
+               "Latence des requêtes HTTP par hôte et statut.")
+        for host, status, stats in self.hosts():
+            histogram("bookstore_http_request_duration_seconds",
+                      f'host="{_escape(host)}",status="{status}"', stats.latency)
+        metric("bookstore_http_response_bytes_total", "counter", "Octets reçus par hôte et statut.")
+        for host, status, stats in self.hosts():
+            lines.append(f'bookstore_http_response_bytes_total{{host="{_escape(host)}",status="{status}"}} '
+                         f"{stats.bytes}")
+        metric("bookstore_parse_duration_seconds", "histogram", "Durée de parsing par type de page.")
+        for page_type, values in sorted(self.parse.items()):
+            histogram("bookstore_parse_duration_seconds", f'page_type="{page_type}"', values)
+        metric("bookstore_csv_write_seconds_total", "counter", "Temps passé à écrire les CSV.")
+        lines.append(f"bookstore_csv_write_seconds_total {self.write_seconds:.6f}")
+        metric("bookstore_csv_rows_total", "counter", "Lignes écrites dans les CSV.")
+        lines.append(f"bookstore_csv_rows_total {self.rows_written}")
+        metric("bookstore_images_total", "counter", "Images téléchargées.")
+        lines.append(f"bookstore_images_total {self.images}")
+        metric("bookstore_image_bytes_total", "counter", "Octets d'images téléchargés.")
+        lines.append(f"bookstore_image_bytes_total {self.image_bytes}")
+        metric("bookstore_run_duration_seconds", "gauge", "Durée du run.")
+        lines.append(f"bookstore_run_duration_seconds {self.elapsed:.6f}")
+        metric("bookstore_run_start_time_seconds", "gauge", "Début du run (horodatage Unix).")
+        lines.append(f"bookstore_run_start_time_seconds {self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Path):
+        """Écrit le bilan de manière atomique : texte Prometheus (``.prom``, ``.txt``) ou JSON."""
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix in PROMETHEUS_SUFFIXES else self.to_json()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Métriques du run en cours, partagées par les scrapers et les écritures de fichiers
+run_metrics = RunMetrics()
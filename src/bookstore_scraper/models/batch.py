@@ -0,0 +1,203 @@
+"""
+🧮 Lot de livres en colonnes (struct-of-arrays) pour les gros volumes
+"""
+import sys
+from array import array
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from .book import (Book, CompactBook, RATING_CODES, RATING_LABELS, _availability_code,
+                   availability_label, parse_price)
+
+# Ordre des champs d'un enregistrement (celui de Book.to_record)
+BOOK_FIELDS = tuple(Book.__dataclass_fields__)
+
+# Prix inconnu (prix HT d'un livre lu sur le listing) dans une colonne en centimes
+MISSING_PRICE = -2 ** 63
+
+
+def to_pence(price: Union[str, Decimal, None]) -> int:
+    """Prix en centimes (virgule fixe) : ``"£51.77"`` → ``5177`` (``MISSING_PRICE`` si vide)."""
+    price = parse_price(price)
+    return MISSING_PRICE if price is None else int(price.scaleb(2))
+
+
+class BookBatch:
+    """Lot de livres stocké colonne par colonne.
+
+    Les valeurs numériques sont dans des :class:`array.array` (prix en
+    centimes, ``MISSING_PRICE`` si inconnu ; disponibilité et note codées
+    comme dans :class:`CompactBook` ; code de catégorie) et les textes
+    dans des listes ; les noms de catégorie sont stockés une seule fois
+    (``categories``). Un lot de centaines de milliers de livres n'a donc pas
+    le coût mémoire d'un objet par livre.
+
+    Un livre n'est matérialisé (:class:`CompactBook`) qu'à la demande, par
+    ``batch[i]`` ; le découpage (``batch[a:b]``), :meth:`filter` et
+    :meth:`take` renvoient de nouveaux lots avec la même table des
+    catégories (les codes restent valides).
+    """
+
+    def __init__(self, categories: List[str] = None):
+        self.categories: List[str] = categories if categories is not None else []
+        self._category_codes: Dict[str, int] = {name: code for code, name in enumerate(self.categories)}
+        self.price_including_tax = array('q')
+        self.price_excluding_tax = array('q')
+        self.available = array('q')
+        self.rating = array('b')
+        self.category_code = array('i')
+        self.product_page_url: List[str] = []
+        self.universal_product_code: List[str] = []
+        self.title: List[str] = []
+        self.product_description: List[str] = []
+        self.image_url: List[str] = []
+
+    @classmethod
+    def from_records(cls, records: Iterable[tuple]) -> "BookBatch":
+        """Lot construit depuis des tuples :meth:`Book.to_record` (ou des lignes CSV)."""
+        batch = cls()
+        for record in records:
+            batch.append_record(record)
+        return batch
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[Dict[str, str]]) -> "BookBatch":
+        """Lot construit depuis des dictionnaires :meth:`Book.to_dict` (lignes de ``csv.DictReader``)."""
+        return cls.from_records(tuple(row[name] for name in BOOK_FIELDS) for row in rows)
+
+    @classmethod
+    def from_books(cls, books: Iterable[Union[Book, CompactBook]]) -> "BookBatch":
+        return cls.from_records(book.to_record() for book in books)
+
+    # ------------------------------------------------------------------
+    # Ajout
+    # ------------------------------------------------------------------
+
+    def append(self, book: Union[Book, CompactBook]):
+        self.append_record(book.to_record())
+
+    def extend(self, books: Iterable[Union[Book, CompactBook]]):
+        for book in books:
+            self.append(book)
+
+    def append_record(self, record: tuple):
+        """Ajoute un enregistrement dans l'ordre des champs de :class:`Book`."""
+        (url, upc, title, price_inc, price_exc, availability,
+         description, category, rating, image_url) = record
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self.categories)
+            self.categories.append(sys.intern(category))
+
+        self.product_page_url.append(url)
+        self.universal_product_code.append(upc)
+        self.title.append(title)
+        self.price_including_tax.append(to_pence(price_inc))
+        self.price_excluding_tax.append(to_pence(price_exc))
+        self.available.append(_availability_code(availability))
+        self.product_description.append(description)
+        self.category_code.append(code)
+        self.rating.append(RATING_CODES.get(rating, 0))
+        self.image_url.append(image_url)
+
+    # ------------------------------------------------------------------
+    # Accès, découpage et filtrage
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.category_code)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._derive(lambda column: column[key])
+        return CompactBook(
+            self.product_page_url[key],
+            self.universal_product_code[key],
+            self.title[key],
+            _from_pence(self.price_including_tax[key]),
+            _from_pence(self.price_excluding_tax[key]),
+            self.available[key],
+            self.product_description[key],
+            self.categories[self.category_code[key]],
+            self.rating[key],
+            self.image_url[key],
+        )
+
+    def __iter__(self) -> Iterator[CompactBook]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def take(self, indices: Iterable[int]) -> "BookBatch":
+        """Nouveau lot formé des livres aux positions ``indices``."""
+        indices = list(indices)
+        return self._derive(lambda column: _take(column, indices))
+
+    def filter(self, mask: Iterable[bool]) -> "BookBatch":
+        """Nouveau lot des livres dont l'entrée de ``mask`` est vraie.
+
+        Le masque se calcule directement sur les colonnes, par exemple ::
+
+            cheap = batch.filter(price < 1000 for price in batch.price_including_tax)
+        """
+        return self.take(i for i, keep in enumerate(mask) if keep)
+
+    def in_category(self, category: str) -> "BookBatch":
+        code = self._category_codes.get(category)
+        return self.filter(value == code for value in self.category_code)
+
+    def _derive(self, select) -> "BookBatch":
+        batch = BookBatch(list(self.categories))
+        for name, column in vars(self).items():
+            if isinstance(column, (array, list)) and name != "categories":
+                setattr(batch, name, select(column))
+        return batch
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def records(self) -> Iterator[tuple]:
+        """Enregistrements au format de :meth:`Book.to_record` (lignes CSV), libellés d'origine compris."""
+        categories = self.categories
+        for i in range(len(self)):
+            yield (
+                self.product_page_url[i],
+                self.universal_product_code[i],
+                self.title[i],
+                _format_pence(self.price_including_tax[i]),
+                _format_pence(self.price_excluding_tax[i]),
+                availability_label(self.available[i]),
+                self.product_description[i],
+                categories[self.category_code[i]],
+                RATING_LABELS.get(self.rating[i], ""),
+                self.image_url[i],
+            )
+
+    def to_csv(self, output_path: Path) -> bool:
+        """Écrit le lot dans un CSV (voir :meth:`FileHandler.save_batch_to_csv`)."""
+        from ..utils.file_handler import FileHandler
+        return FileHandler.save_batch_to_csv(self, output_path)
+
+    def to_columnar(self, output_path: Path, fmt: str = "parquet") -> bool:
+        """Écrit le lot en Parquet ou Arrow (voir :meth:`FileHandler.save_batch_to_columnar`)."""
+        from ..utils.file_handler import FileHandler
+        return FileHandler.save_batch_to_columnar(self, output_path, fmt)
+
+
+def _take(column, indices: List[int]):
+    if isinstance(column, array):
+        return array(column.typecode, [column[i] for i in indices])
+    return [column[i] for i in indices]
+
+
+def _from_pence(pence: int) -> Optional[Decimal]:
+    return None if pence == MISSING_PRICE else Decimal(pence).scaleb(-2)
+
+
+def _format_pence(pence: int) -> str:
+    if pence == MISSING_PRICE:
+        return ""
+    sign = "-" if pence < 0 else ""
+    units, cents = divmod(abs(pence), 100)
+    return f"{sign}{units}.{cents:02d}"
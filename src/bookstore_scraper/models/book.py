@@ -1,10 +1,89 @@
 """
 📖 Modèle de données pour représenter un livre
 """
+import re
+import sys
 from dataclasses import dataclass
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Union
 from decimal import Decimal
 
+# Disponibilité affichée : "In stock (22 available)"
+AVAILABILITY_PATTERN = re.compile(r'\((?P<available>\d+) available\)')
+
+# Disponibilités sans nombre d'exemplaires ("In stock" : page de listing)
+IN_STOCK = "In stock"
+OUT_OF_STOCK = "Out of stock"
+# Code entier d'une disponibilité "In stock" dont le nombre d'exemplaires est inconnu
+UNKNOWN_STOCK = -1
+
+# Note en toutes lettres (classe CSS "star-rating Three") → nombre d'étoiles
+RATING_VALUES = {"One": 1, "Two": 2, "Three": 3, "Four": 4, "Five": 5}
+# Note de repli du parseur quand la page produit n'en affiche pas
+UNKNOWN_RATING = "Unknown"
+# Codes entiers des notes : 1 à 5 étoiles, 0 sans note, -1 pour UNKNOWN_RATING
+RATING_CODES = {"": 0, UNKNOWN_RATING: -1, **RATING_VALUES}
+RATING_LABELS = {code: label for label, code in RATING_CODES.items()}
+
+# Symboles monétaires retirés des prix affichés ("£51.77")
+CURRENCY_SYMBOLS = "£€$"
+
+
+def parse_price(price: Union[str, Decimal, None]) -> Optional[Decimal]:
+    """Convertit un prix affiché en ``Decimal`` (déjà converti : renvoyé tel quel).
+
+    Un prix vide (inconnu, ex: prix HT d'un livre lu sur le listing) donne ``None``.
+    """
+    if isinstance(price, str):
+        price = price.strip().strip(CURRENCY_SYMBOLS)
+        return Decimal(price) if price else None
+    return price
+
+
+def price_text(price: Optional[Decimal]) -> str:
+    """Prix tel qu'écrit dans le CSV (chaîne vide si inconnu)."""
+    return "" if price is None else str(price)
+
+
+def format_price(price: Union[Decimal, float, None]) -> str:
+    """Prix formaté pour l'affichage (``-`` si inconnu : ``None`` ou ``nan``)."""
+    # nan est le seul nombre différent de lui-même
+    return "-" if price is None or price != price else f"£{price:.2f}"
+
+
+def parse_availability(value: Union[str, int]) -> Optional[int]:
+    """Nombre d'exemplaires d'une disponibilité ``"In stock (22 available)"`` (0 si absent).
+
+    ``"In stock"`` sans nombre d'exemplaires (page de listing) donne ``None`` : stock inconnu.
+    """
+    code = availability_code(value)
+    return None if code == UNKNOWN_STOCK else code
+
+
+def availability_code(value: Union[str, int]) -> int:
+    """Disponibilité en entier : nombre d'exemplaires, 0 si épuisé.
+
+    ``"In stock"`` sans nombre d'exemplaires (page de listing) donne
+    :data:`UNKNOWN_STOCK` ; :func:`availability_label` redonne le libellé.
+    """
+    if isinstance(value, int):
+        return value
+    match = AVAILABILITY_PATTERN.search(value)
+    if match:
+        return int(match.group(1))
+    return UNKNOWN_STOCK if value.strip() == IN_STOCK else 0
+
+
+def availability_label(code: int) -> str:
+    """Libellé du site d'un code de :func:`availability_code`."""
+    if code == UNKNOWN_STOCK:
+        return IN_STOCK
+    return f"In stock ({code} available)" if code else OUT_OF_STOCK
+
+
+# Les libellés de disponibilité sont peu nombreux : chacun n'est analysé qu'une fois
+_availability_code = lru_cache(maxsize=1024)(availability_code)
+
 
 @dataclass
 class Book:
@@ -14,7 +93,7 @@ class Book:
     universal_product_code: str
     title: str
     price_including_tax: Decimal
-    price_excluding_tax: Decimal
+    price_excluding_tax: Optional[Decimal]  # None : lu sur le listing (--listing-only)
     number_available: int
     product_description: str
     category: str
@@ -23,35 +102,43 @@ class Book:
     
     def __post_init__(self):
         """Validation et conversion des données après initialisation."""
-        # Convertir les prix en Decimal si ce sont des strings
-        if isinstance(self.price_including_tax, str):
-            # Supprimer le symbole monétaire et convertir
-            price_str = self.price_including_tax.replace('£', '').replace('€', '').replace('$', '')
-            self.price_including_tax = Decimal(price_str)
-            
-        if isinstance(self.price_excluding_tax, str):
-            price_str = self.price_excluding_tax.replace('£', '').replace('€', '').replace('$', '')
-            self.price_excluding_tax = Decimal(price_str)
+        # Convertir les prix en Decimal si ce sont des strings (symbole monétaire retiré)
+        self.price_including_tax = parse_price(self.price_including_tax)
+        self.price_excluding_tax = parse_price(self.price_excluding_tax)
     
     @property
     def formatted_price_inc_tax(self) -> str:
         """Prix TTC formaté."""
-        return f"£{self.price_including_tax:.2f}"
+        return format_price(self.price_including_tax)
     
     @property
     def formatted_price_exc_tax(self) -> str:
         """Prix HT formaté."""
-        return f"£{self.price_excluding_tax:.2f}"
+        return format_price(self.price_excluding_tax)
     
     @property
-    def availability_number(self) -> int:
-        """Extrait le nombre de livres disponibles."""
-        if isinstance(self.number_available, str):
-            # Extrait le nombre de "In stock (XX available)"
-            import re
-            match = re.search(r'\((\d+) available\)', self.number_available)
-            return int(match.group(1)) if match else 0
-        return self.number_available
+    def availability_number(self) -> Optional[int]:
+        """Extrait le nombre de livres disponibles (``None`` si inconnu)."""
+        return parse_availability(self.number_available)
+    
+    def compact(self) -> "CompactBook":
+        """Variante compacte du livre (voir :class:`CompactBook`)."""
+        return CompactBook.from_record(self.to_record())
+    
+    def to_record(self) -> tuple:
+        """Tuple compact de chaînes, dans l'ordre des champs (``Book(*record)`` le reconstruit)."""
+        return (
+            self.product_page_url,
+            self.universal_product_code,
+            self.title,
+            str(self.price_including_tax),
+            price_text(self.price_excluding_tax),
+            self.number_available,
+            self.product_description,
+            self.category,
+            self.review_rating,
+            self.image_url
+        )
     
     def to_dict(self) -> dict:
         """Convertit le livre en dictionnaire pour export CSV."""
@@ -60,7 +147,95 @@ class Book:
             'universal_product_code': self.universal_product_code,
             'title': self.title,
             'price_including_tax': str(self.price_including_tax),
-            'price_excluding_tax': str(self.price_excluding_tax),
+            'price_excluding_tax': price_text(self.price_excluding_tax),
+            'number_available': self.number_available,
+            'product_description': self.product_description,
+            'category': self.category,
+            'review_rating': self.review_rating,
+            'image_url': self.image_url
+        }
+
+
+@dataclass(slots=True)
+class CompactBook:
+    """Livre compact pour les gros lots en mémoire.
+    
+    Sans ``__dict__`` (``__slots__``), avec la disponibilité et la note
+    converties une fois pour toutes en entiers (:func:`availability_code`,
+    :data:`RATING_CODES`) et la catégorie internée (une seule chaîne
+    partagée par tous les livres de la catégorie). :meth:`to_dict` et
+    :meth:`to_record` produisent les mêmes valeurs qu'un :class:`Book`,
+    avec les libellés du site : ``"In stock"`` sans nombre d'exemplaires et
+    la note ``"Unknown"`` ont leur propre code.
+    """
+    
+    product_page_url: str
+    universal_product_code: str
+    title: str
+    price_including_tax: Decimal
+    price_excluding_tax: Optional[Decimal]
+    available: int
+    product_description: str
+    category: str
+    rating: int
+    image_url: str
+    
+    @classmethod
+    def from_record(cls, record: tuple) -> "CompactBook":
+        """Construit le livre depuis un tuple de :meth:`Book.to_record` (prix en chaînes)."""
+        (url, upc, title, price_inc, price_exc, availability,
+         description, category, rating, image_url) = record
+        return cls(url, upc, title, parse_price(price_inc), parse_price(price_exc),
+                   _availability_code(availability), description, sys.intern(category),
+                   RATING_CODES.get(rating, 0), image_url)
+    
+    @property
+    def number_available(self) -> str:
+        """Disponibilité au format du site."""
+        return availability_label(self.available)
+    
+    @property
+    def review_rating(self) -> str:
+        return RATING_LABELS.get(self.rating, "")
+    
+    @property
+    def availability_number(self) -> Optional[int]:
+        return None if self.available == UNKNOWN_STOCK else self.available
+    
+    @property
+    def formatted_price_inc_tax(self) -> str:
+        return format_price(self.price_including_tax)
+    
+    @property
+    def formatted_price_exc_tax(self) -> str:
+        return format_price(self.price_excluding_tax)
+    
+    def to_book(self) -> Book:
+        return Book(*self.to_record())
+    
+    def to_record(self) -> tuple:
+        """Tuple de chaînes identique à celui du :class:`Book` d'origine."""
+        return (
+            self.product_page_url,
+            self.universal_product_code,
+            self.title,
+            str(self.price_including_tax),
+            price_text(self.price_excluding_tax),
+            self.number_available,
+            self.product_description,
+            self.category,
+            self.review_rating,
+            self.image_url
+        )
+    
+    def to_dict(self) -> dict:
+        """Convertit le livre en dictionnaire pour export CSV (mêmes valeurs que :meth:`Book.to_dict`)."""
+        return {
+            'product_page_url': self.product_page_url,
+            'universal_product_code': self.universal_product_code,
+            'title': self.title,
+            'price_including_tax': str(self.price_including_tax),
+            'price_excluding_tax': price_text(self.price_excluding_tax),
             'number_available': self.number_available,
             'product_description': self.product_description,
             'category': self.category,
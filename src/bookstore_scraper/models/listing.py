@@ -0,0 +1,61 @@
+"""
+🗂️ Modèles des pages de listing (liste des livres d'une catégorie)
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .book import Book
+
+
+@dataclass
+class ListingItem:
+    """Livre tel qu'il apparaît sur une page de listing."""
+    
+    url: str
+    price: str = ""  # Prix affiché, ex: "£51.77"
+    availability: str = ""  # Ex: "In stock"
+    title: str = ""  # Titre complet (attribut title du lien)
+    rating: str = ""  # Ex: "Three"
+    image_url: str = ""  # Miniature de la couverture
+    category: str = ""  # Catégorie affichée en titre de la page de listing
+    
+    @property
+    def signature(self) -> str:
+        """Empreinte des informations visibles sans ouvrir la page détail."""
+        return f"{self.price}|{self.availability}"
+    
+    def to_book(self) -> Book:
+        """Livre partiel construit sans la page détail.
+        
+        L'UPC, la description et le prix HT ne figurent que sur la page
+        détail : ils restent vides. La disponibilité est celle du listing
+        (``"In stock"``, sans le nombre d'exemplaires : stock inconnu, voir
+        :data:`~.book.UNKNOWN_STOCK`) et l'image est la miniature du listing.
+        """
+        return Book(
+            product_page_url=self.url,
+            universal_product_code="",
+            title=self.title,
+            price_including_tax=self.price,
+            price_excluding_tax="",
+            number_available=self.availability,
+            product_description="",
+            category=self.category,
+            review_rating=self.rating,
+            image_url=self.image_url
+        )
+
+
+@dataclass
+class ListingPage:
+    """Résultat de l'analyse d'une page de listing."""
+    
+    items: List[ListingItem]
+    has_next: bool
+    page_count: Optional[int] = None  # Nombre total de pages, si connu
+    result_count: Optional[int] = None  # Nombre total de livres, si connu
+    
+    @property
+    def links(self) -> List[str]:
+        """URLs complètes des livres de la page."""
+        return [item.url for item in self.items]
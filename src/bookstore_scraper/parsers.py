@@ -0,0 +1,370 @@
+"""
+🧩 Backends de parsing HTML interchangeables (html.parser, lxml, SoupStrainer, selectolax)
+
+L'extraction des champs est écrite une seule fois, sur une petite interface de
+nœud (``find`` / ``find_all`` / ``text``...). Chaque backend ne fait que
+construire l'arbre et adapter ses nœuds : les valeurs extraites sont donc
+identiques quel que soit le backend choisi.
+"""
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+from rich.console import Console
+
+from .models.book import Book, Category
+from .models.listing import ListingItem, ListingPage
+
+console = Console()
+
+PAGER_PATTERN = re.compile(r'Page\s+\d+\s+of\s+(\d+)')
+
+# Remontées "../" en tête des chemins relatifs des pages de listing
+PARENT_DIRS = re.compile(r'^(?:\.\./)+')
+
+# Types de pages analysées
+BOOK_PAGE = "book"
+LISTING_PAGE = "listing"
+HOME_PAGE = "home"
+
+
+# ---------------------------------------------------------------------------
+# Adaptateurs de nœuds
+# ---------------------------------------------------------------------------
+
+class _SoupNode:
+    """Nœud BeautifulSoup."""
+
+    __slots__ = ("tag",)
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def find(self, name: str, cls: Optional[str] = None) -> Optional["_SoupNode"]:
+        found = self.tag.find(name, class_=cls) if cls else self.tag.find(name)
+        return _SoupNode(found) if found else None
+
+    def find_all(self, name: str, cls: Optional[str] = None) -> List["_SoupNode"]:
+        found = self.tag.find_all(name, class_=cls) if cls else self.tag.find_all(name)
+        return [_SoupNode(tag) for tag in found]
+
+    def find_parent(self, name: str, cls: str) -> Optional["_SoupNode"]:
+        found = self.tag.find_parent(name, class_=cls)
+        return _SoupNode(found) if found else None
+
+    def text(self) -> str:
+        return self.tag.get_text()
+
+    def get(self, attribute: str, default=None):
+        return self.tag.get(attribute, default)
+
+    def classes(self) -> List[str]:
+        return self.tag.get('class') or []
+
+
+class _SelectolaxNode:
+    """Nœud selectolax (moteur Lexbor), beaucoup plus rapide à construire."""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    @staticmethod
+    def _selector(name: str, cls: Optional[str]) -> str:
+        return f"{name}.{cls}" if cls else name
+
+    def find(self, name: str, cls: Optional[str] = None) -> Optional["_SelectolaxNode"]:
+        found = self.node.css_first(self._selector(name, cls))
+        return _SelectolaxNode(found) if found else None
+
+    def find_all(self, name: str, cls: Optional[str] = None) -> List["_SelectolaxNode"]:
+        return [_SelectolaxNode(node) for node in self.node.css(self._selector(name, cls))]
+
+    def find_parent(self, name: str, cls: str) -> Optional["_SelectolaxNode"]:
+        parent = self.node.parent
+        while parent is not None:
+            if parent.tag == name and cls in (parent.attributes.get('class') or "").split():
+                return _SelectolaxNode(parent)
+            parent = parent.parent
+        return None
+
+    def text(self) -> str:
+        return self.node.text(deep=True)
+
+    def get(self, attribute: str, default=None):
+        value = self.node.attributes.get(attribute)
+        return default if value is None else value
+
+    def classes(self) -> List[str]:
+        return (self.node.attributes.get('class') or "").split()
+
+
+# ---------------------------------------------------------------------------
+# Extraction (commune à tous les backends)
+# ---------------------------------------------------------------------------
+
+def extract_book(root, book_url: str, base_url: str) -> Optional[Book]:
+    """Extrait un livre d'une page produit."""
+    # Extraction des informations produit
+    product_info = root.find_all("td")
+    if len(product_info) < 6:
+        console.print(f"[yellow]⚠️ Informations incomplètes pour {book_url}[/yellow]")
+        return None
+
+    # Extraction des données
+    upc = product_info[0].text().strip()
+    price_exc_tax = product_info[2].text().strip()[1:]  # Remove £
+    price_inc_tax = product_info[3].text().strip()[1:]  # Remove £
+    availability = product_info[5].text().strip()
+
+    # Titre
+    title_elem = root.find("h1")
+    title = title_elem.text().strip() if title_elem else "Titre inconnu"
+
+    # Description
+    description_elem = root.find("article", "product_page")
+    description = ""
+    if description_elem:
+        desc_paragraphs = description_elem.find_all('p')
+        if len(desc_paragraphs) >= 4:
+            description = desc_paragraphs[3].text().strip()
+
+    # Catégorie depuis le breadcrumb
+    breadcrumb = root.find("ul", "breadcrumb")
+    category = "Unknown"
+    if breadcrumb:
+        links = breadcrumb.find_all("a")
+        if len(links) >= 3:
+            category = links[2].text().strip()
+
+    # Rating
+    rating_elem = root.find('p', "star-rating")
+    rating = rating_elem.classes()[1] if rating_elem else "Unknown"
+
+    # Image URL
+    img_elem = root.find('img')
+    image_url = ""
+    if img_elem:
+        img_src = img_elem.get('src', '')
+        if img_src.startswith('../..'):
+            image_url = urljoin(base_url, img_src[6:])
+        else:
+            image_url = urljoin(base_url, img_src)
+
+    return Book(
+        product_page_url=book_url,
+        universal_product_code=upc,
+        title=title,
+        price_including_tax=price_inc_tax,
+        price_excluding_tax=price_exc_tax,
+        number_available=availability,
+        product_description=description,
+        category=category,
+        review_rating=rating,
+        image_url=image_url
+    )
+
+
+def extract_categories(root) -> Optional[List[Category]]:
+    """Extrait les catégories de la navigation (``None`` si elle est introuvable)."""
+    nav_list = root.find("ul", "nav-list")
+    if not nav_list:
+        return None
+
+    categories = []
+    for link in nav_list.find_all("a")[1:]:  # Skip le premier qui est "Books"
+        category_name = link.text().strip()
+        category_url = link.get('href')
+
+        if category_name and category_url:
+            categories.append(Category(
+                nom=category_name.lower(),
+                url=category_url
+            ))
+    return categories
+
+
+def extract_listing(root, base_url: str) -> ListingPage:
+    """Extrait les livres et les infos de pagination d'une page de listing."""
+    items = []
+
+    # Nom de la catégorie affiché en titre de la page
+    heading = root.find("h1")
+    category = heading.text().strip() if heading else ""
+
+    # Trouve tous les conteneurs d'images (qui contiennent les liens)
+    for container in root.find_all("div", "image_container"):
+        link_elem = container.find("a")
+        if link_elem:
+            book_link = link_elem.get('href')
+            if book_link:
+                # Construit l'URL complète
+                if book_link.startswith('../../../'):
+                    full_url = urljoin(base_url, 'catalogue/' + book_link[9:])
+                else:
+                    full_url = urljoin(base_url, book_link)
+                items.append(_extract_listing_item(container, full_url, base_url, category))
+
+    # Vérifie s'il y a une page suivante
+    has_next = root.find("li", "next") is not None
+
+    # Nombre total de pages annoncé par le pager ("Page 1 of 50")
+    page_count = None
+    current = root.find("li", "current")
+    if current:
+        match = PAGER_PATTERN.search(current.text())
+        if match:
+            page_count = int(match.group(1))
+
+    # Nombre de résultats annoncé dans l'en-tête ("1000 results")
+    result_count = None
+    form = root.find("form", "form-horizontal")
+    if form:
+        count_elem = form.find("strong")
+        if count_elem and count_elem.text().strip().isdigit():
+            result_count = int(count_elem.text().strip())
+
+    if page_count is None and not has_next:
+        page_count = 1
+    elif page_count is None and result_count and items:
+        page_count = -(-result_count // len(items))
+
+    return ListingPage(items, has_next, page_count, result_count)
+
+
+def _extract_listing_item(container, url: str, base_url: str, category: str = "") -> ListingItem:
+    """Lit les informations affichées à côté du lien d'un livre (prix, note, titre...)."""
+    item = ListingItem(url, category=category)
+    # La miniature porte le titre complet (alt), le lien du h3 ne montre qu'un titre tronqué
+    img_elem = container.find("img")
+    if img_elem:
+        item.title = img_elem.get('alt', '').strip()
+        item.image_url = urljoin(base_url, PARENT_DIRS.sub("", img_elem.get('src', '')))
+    product = container.find_parent("article", "product_pod")
+    if product:
+        rating_elem = product.find("p", "star-rating")
+        rating_classes = rating_elem.classes() if rating_elem else []
+        if len(rating_classes) > 1:
+            item.rating = rating_classes[1]
+        price_elem = product.find("p", "price_color")
+        if price_elem:
+            item.price = price_elem.text().strip()
+        availability_elem = product.find("p", "availability")
+        if availability_elem:
+            item.availability = " ".join(availability_elem.text().split())
+    return item
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class HtmlParser:
+    """Backend BeautifulSoup avec le parseur de la bibliothèque standard."""
+
+    name = "html.parser"
+    features = "html.parser"
+
+    def root(self, content: bytes, page_type: str):
+        """Construit l'arbre d'une page et renvoie son nœud racine adapté."""
+        return _SoupNode(BeautifulSoup(content, self.features))
+
+    def parse_book(self, content: bytes, book_url: str, base_url: str) -> Optional[Book]:
+        return extract_book(self.root(content, BOOK_PAGE), book_url, base_url)
+
+    def parse_categories(self, content: bytes) -> Optional[List[Category]]:
+        return extract_categories(self.root(content, HOME_PAGE))
+
+    def parse_listing(self, content: bytes, base_url: str) -> ListingPage:
+        return extract_listing(self.root(content, LISTING_PAGE), base_url)
+
+
+class LxmlParser(HtmlParser):
+    """BeautifulSoup construit avec lxml (extension C), nettement plus rapide."""
+
+    name = "lxml"
+    features = "lxml"
+
+
+class StrainerParser(LxmlParser):
+    """lxml + SoupStrainer : seules les parties utiles de la page sont construites."""
+
+    name = "strainer"
+
+    STRAINERS: Dict[str, SoupStrainer] = {
+        # Fiche produit + breadcrumb (catégorie)
+        BOOK_PAGE: SoupStrainer(["article", "ul"]),
+        # Livres, pager, en-tête des résultats et titre (catégorie)
+        LISTING_PAGE: SoupStrainer(["article", "ul", "form", "h1"]),
+        # Navigation des catégories
+        HOME_PAGE: SoupStrainer("ul", class_=re.compile(r"(^|\s)nav-list(\s|$)")),
+    }
+
+    def root(self, content: bytes, page_type: str):
+        return _SoupNode(BeautifulSoup(content, self.features, parse_only=self.STRAINERS[page_type]))
+
+
+class SelectolaxParser(HtmlParser):
+    """Backend selectolax (sans BeautifulSoup), le plus rapide."""
+
+    name = "selectolax"
+
+    def root(self, content: bytes, page_type: str):
+        from selectolax.lexbor import LexborHTMLParser
+        return _SelectolaxNode(LexborHTMLParser(content).root)
+
+
+PARSER_BACKENDS = {
+    parser.name: parser for parser in (HtmlParser, LxmlParser, StrainerParser, SelectolaxParser)
+}
+
+
+def get_parser(name: str = "html.parser") -> HtmlParser:
+    """Instancie un backend par son nom.
+
+    Lève :class:`ValueError` si le backend est inconnu ou si sa dépendance
+    optionnelle (lxml, selectolax) n'est pas installée.
+    """
+    try:
+        parser_class = PARSER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Parseur inconnu '{name}' (choix: {', '.join(PARSER_BACKENDS)})")
+
+    dependency = {"lxml": "lxml", "strainer": "lxml", "selectolax": "selectolax"}.get(name)
+    if dependency:
+        try:
+            __import__(dependency)
+        except ImportError:
+            raise ValueError(f"Le parseur '{name}' nécessite le paquet '{dependency}' "
+                             f"(pip install {dependency})")
+    return parser_class()
+
+
+# ---------------------------------------------------------------------------
+# Parsing dans un processus séparé
+# ---------------------------------------------------------------------------
+
+# Backends déjà instanciés dans le processus worker
+_worker_parsers: Dict[str, HtmlParser] = {}
+
+
+def parse_book_record(parser_name: str, content: bytes, book_url: str,
+                      base_url: str) -> Optional[tuple]:
+    """Point d'entrée des workers d'un ``ProcessPoolExecutor``.
+
+    Reçoit les octets bruts de la page et renvoie un tuple compact
+    (voir :meth:`Book.to_record`) : aucun arbre HTML ne traverse la frontière
+    entre processus.
+    """
+    parser = _worker_parsers.get(parser_name)
+    if parser is None:
+        parser = _worker_parsers[parser_name] = get_parser(parser_name)
+
+    try:
+        book = parser.parse_book(content, book_url, base_url)
+    except Exception as e:
+        console.print(f"[red]❌ Erreur inattendue pour {book_url}: {e}[/red]")
+        return None
+    return book.to_record() if book else None
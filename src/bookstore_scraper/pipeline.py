@@ -0,0 +1,234 @@
+"""
+🚰 Pipeline de scraping en flux : découverte → téléchargement → parsing → écriture
+"""
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Callable, List, Optional
+
+import aiohttp
+from rich.console import Console
+
+from .async_scraper import AsyncBookStoreScraper
+from .resilience import DeadlineExceeded
+from .models.listing import ListingItem
+from .models.book import Book, Category
+from .utils.catalog import CatalogMap
+from .utils.file_handler import BookCSVWriter, FileHandler
+from .utils.image_store import ImageStore
+from .utils.journal import ProgressJournal
+from .utils.sqlite_store import SQLiteBookStore, StoreWriter
+
+console = Console()
+
+# Marqueur de fin de flux transmis d'un étage au suivant
+_DONE = object()
+
+
+class ScrapePipeline:
+    """Enchaîne les étapes du scraping d'une catégorie avec des files bornées.
+
+    Chaque étape tourne en parallèle des autres :
+
+    - **découverte** : parcourt les pages de listing et pousse les URLs de livres ;
+    - **téléchargement** : ``concurrency`` workers récupèrent les pages détail ;
+    - **parsing** : transforme le HTML en :class:`Book`, dans un pool de
+      processus si ``parse_workers`` est configuré ;
+    - **écriture** : ajoute chaque livre au CSV dès qu'il est prêt ;
+    - **images** (optionnel) : ``image_concurrency`` workers récupèrent les
+      couvertures via un :class:`ImageStore` dédupliqué.
+
+    Les files ont une taille maximale : quand une étape prend du retard, celles
+    qui l'alimentent attendent (backpressure). La mémoire reste donc bornée
+    quelle que soit la taille de la catégorie.
+
+    Avec un :class:`ProgressJournal`, chaque livre écrit est journalisé et la
+    catégorie est marquée terminée une fois son CSV publié ; les livres déjà
+    journalisés ne sont pas retéléchargés.
+
+    Avec un :class:`SQLiteBookStore`, chaque livre écrit est aussi inséré ou
+    mis à jour dans la base.
+
+    Avec une :class:`CatalogMap` à jour, les pages de listing ne sont pas
+    retéléchargées : les livres de la catégorie en sont repris.
+
+    Un livre que :meth:`listing_book` sait construire depuis le listing passe
+    directement de la découverte à l'écriture, sans téléchargement ni parsing.
+    """
+
+    def __init__(self, scraper: AsyncBookStoreScraper, queue_size: Optional[int] = None,
+                 images: Optional[ImageStore] = None,
+                 journal: Optional[ProgressJournal] = None,
+                 store: Optional[SQLiteBookStore] = None,
+                 catalog: Optional[CatalogMap] = None):
+        self.scraper = scraper
+        self.images = images
+        self.journal = journal
+        self.store = store
+        self.catalog = catalog
+        self.concurrency = scraper.concurrency
+        self.image_concurrency = max(1, scraper.config.image_concurrency)
+        # Un parseur par worker du pool de processus, sinon le parsing reste séquentiel
+        self.parse_tasks = max(1, scraper.config.parse_workers)
+        self.queue_size = queue_size or max(self.concurrency, self.parse_tasks) * 2
+
+    def accept(self, item: ListingItem) -> bool:
+        """Indique si la page détail d'un livre du listing doit être téléchargée."""
+        return True
+
+    def listing_book(self, item: ListingItem) -> Optional[Book]:
+        """Livre construit depuis le listing sans page détail (``None`` : page détail à télécharger)."""
+        return None
+
+    async def listing_pages(self, session: aiohttp.ClientSession,
+                            category: Category) -> AsyncIterator[List[ListingItem]]:
+        """Livres de chaque page de listing : depuis la carte du catalogue si elle est à jour.
+
+        Sinon les pages sont parcourues sur le site et, si aucune n'a échoué,
+        enregistrées dans la carte.
+        """
+        if self.catalog:
+            pages = self.catalog.listing(category)
+            if pages is not None:
+                for items in pages:
+                    yield items
+                return
+
+        pages = []
+        errors_before = self.scraper.listing_errors
+        unreached_before = len(self.scraper.unreached)
+        async for items in self.scraper.iter_books_from_category_async(session, category):
+            pages.append(items)
+            yield items
+        complete = (self.scraper.listing_errors == errors_before
+                    and len(self.scraper.unreached) == unreached_before)
+        if self.catalog and pages and complete:
+            self.catalog.set_listing(category, pages)
+
+    def open_writer(self, category: Category, csv_path: Path) -> BookCSVWriter:
+        """Crée la destination des livres extraits.
+
+        Interface attendue : ``write(book)``, ``close() -> int`` (publication)
+        et ``abort()`` (interruption, rien n'est publié).
+        """
+        return BookCSVWriter(csv_path)
+
+    async def run_async(self, category: Category, csv_path: Path,
+                        on_links: Optional[Callable[[int], None]] = None,
+                        on_book: Optional[Callable[[Optional[Book]], None]] = None,
+                        image_dir: Optional[Path] = None) -> int:
+        """Scrape une catégorie et écrit ses livres dans ``csv_path``.
+
+        ``on_links`` reçoit le nombre de liens retenus sur chaque page de listing,
+        ``on_book`` est appelé pour chaque livre traité (``None`` en cas d'échec).
+        Si ``image_dir`` est fourni (et le pipeline créé avec ``images``), les
+        couvertures y sont enregistrées sous le titre du livre.
+        Renvoie le nombre de livres écrits.
+        """
+        url_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        page_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        book_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        image_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        with_images = self.images is not None and image_dir is not None
+        journal = self.journal
+        unreached_before = len(self.scraper.unreached)
+
+        async def discover(session: aiohttp.ClientSession):
+            async for items in self.listing_pages(session, category):
+                if journal:
+                    items = [item for item in items if not journal.has_book(category, item.url)]
+                accepted = [item for item in items if self.accept(item)]
+                if on_links:
+                    on_links(len(accepted))
+                for item in accepted:
+                    book = self.listing_book(item)
+                    if book is not None:
+                        # Livre complet sans la page détail : directement à l'écriture
+                        await book_queue.put(book)
+                    else:
+                        await url_queue.put(item.url)
+            for _ in range(self.concurrency):
+                await url_queue.put(_DONE)
+
+        async def fetch(session: aiohttp.ClientSession):
+            while (book_url := await url_queue.get()) is not _DONE:
+                try:
+                    content = await self.scraper.fetch_async(session, book_url)
+                except DeadlineExceeded:
+                    # URL notée par le scraper, rapportée en fin de run
+                    content = None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    console.print(f"[red]❌ Erreur lors du scraping de {book_url}: {e}[/red]")
+                    content = None
+                await page_queue.put((book_url, content))
+
+        async def fetch_all(session: aiohttp.ClientSession):
+            await asyncio.gather(*(fetch(session) for _ in range(self.concurrency)))
+            for _ in range(self.parse_tasks):
+                await page_queue.put(_DONE)
+
+        async def parse():
+            while (item := await page_queue.get()) is not _DONE:
+                book_url, content = item
+                book = await self.scraper.parse_book_details_async(content, book_url) if content else None
+                await book_queue.put(book)
+
+        async def parse_all():
+            await asyncio.gather(*(parse() for _ in range(self.parse_tasks)))
+            await book_queue.put(_DONE)
+
+        async def write() -> int:
+            writer = self.open_writer(category, csv_path)
+            if self.store:
+                writer = StoreWriter(writer, self.store)
+            try:
+                if journal:
+                    # Livres écrits avant l'interruption : repris depuis le journal
+                    for book in journal.written_books(category):
+                        writer.write(book)
+                while (book := await book_queue.get()) is not _DONE:
+                    if book:
+                        writer.write(book)
+                        if journal:
+                            journal.record_book(category, book)
+                        if with_images and book.image_url:
+                            img_filename = FileHandler.sanitize_filename(book.title) + ".jpg"
+                            await image_queue.put((book.image_url, image_dir / img_filename))
+                    if on_book:
+                        on_book(book)
+            except BaseException:
+                # Interruption : le CSV n'est pas publié
+                writer.abort()
+                raise
+            finally:
+                for _ in range(self.image_concurrency):
+                    await image_queue.put(_DONE)
+
+            written = writer.close()
+            # Catégorie coupée par --deadline : elle sera reprise
+            if journal and len(self.scraper.unreached) == unreached_before:
+                journal.record_category(category, written)
+            return written
+
+        async def download_images(session: aiohttp.ClientSession):
+            while (item := await image_queue.get()) is not _DONE:
+                if with_images:
+                    image_url, image_path = item
+                    await self.images.save_image(session, image_url, image_path)
+
+        async with self.scraper.client_session() as session:
+            _, _, _, written, _ = await asyncio.gather(
+                discover(session),
+                fetch_all(session),
+                parse_all(),
+                write(),
+                asyncio.gather(*(download_images(session) for _ in range(self.image_concurrency))),
+            )
+        return written
+
+    def run(self, category: Category, csv_path: Path,
+            on_links: Optional[Callable[[int], None]] = None,
+            on_book: Optional[Callable[[Optional[Book]], None]] = None,
+            image_dir: Optional[Path] = None) -> int:
+        """Point d'entrée synchrone de :meth:`run_async`."""
+        return asyncio.run(self.run_async(category, csv_path, on_links, on_book, image_dir))
+
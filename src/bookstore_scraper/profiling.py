@@ -0,0 +1,286 @@
+"""
+🔬 Mode --profile : temps (cProfile) et mémoire (tracemalloc) attribués aux étapes du run
+"""
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Étapes, reconnues au module (ou à la fonction native) où le temps est passé ou la mémoire allouée.
+# Le temps d'une fonction non reconnue (bibliothèque standard, fonction native...) revient
+# aux étapes de ses appelants, au prorata du temps passé pour chacun. Les bibliothèques
+# utilisées par plusieurs étapes (csv, sqlite3, pyarrow, decimal...) ne sont donc pas listées :
+# pyarrow écrit les exports Parquet mais lit aussi les CSV d'analyze, sqlite3 sert aussi
+# à la frontière de crawl.
+STAGE_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("images", ("/image_store.py", "/aiofiles/")),
+    ("write", ("/file_handler.py", "/sqlite_store.py", "/journal.py", "/book_index.py")),
+    ("model", ("/models/",)),
+    ("parse", ("/parsers.py", "/bs4/", "/soupsieve/", "/lxml/", "lxml.", "/selectolax/",
+               "selectolax.", "/html/parser.py", "_markupbase.py")),
+    ("fetch", ("/scraper.py", "/async_scraper.py", "/resilience.py", "/throttle.py", "/http_cache.py", "/archive.py",
+               "/aiohttp/", "/requests/", "/urllib3/", "/http/client.py", "/yarl/", "/multidict/",
+               "/socket.py", "/ssl.py", "/selectors.py", "_socket.", "_ssl.", "select.")),
+    ("display", ("/rich/",)),
+)
+STAGES = tuple(stage for stage, _ in STAGE_RULES)
+OTHER = "other"
+
+# Mémoire tracée supplémentaire (facteur) déclenchant un nouvel échantillon tracemalloc
+SNAPSHOT_GROWTH = 1.1
+
+
+def stage_of(location: str) -> Optional[str]:
+    """Étape d'un fichier source ou d'une fonction native (``None`` si non reconnue)."""
+    location = location.replace("\\", "/")
+    for stage, patterns in STAGE_RULES:
+        if any(pattern in location for pattern in patterns):
+            return stage
+    return None
+
+
+def short_path(filename: str) -> str:
+    """Fin d'un chemin source (``bs4/element.py``), lisible dans un tableau."""
+    return "/".join(Path(filename).parts[-2:])
+
+
+def function_name(func: tuple) -> str:
+    """Nom d'une fonction au format de pstats, avec un chemin raccourci."""
+    filename, line, name = func
+    if filename == "~":
+        return pstats.func_std_string(func)
+    return f"{short_path(filename)}:{line}({name})"
+
+
+def _function_location(func: tuple) -> str:
+    filename, _, name = func
+    # Fonctions natives : ('~', 0, "<method 'writerows' of '_csv.writer' objects>")
+    return name if filename == "~" else filename
+
+
+def _caller_groups(successors: Dict[tuple, Iterable[tuple]]) -> List[List[tuple]]:
+    """Composantes fortement connexes du graphe fonction → appelants (Tarjan, itératif).
+
+    Chaque composante est renvoyée après celles de tous ses appelants.
+    """
+    index: Dict[tuple, int] = {}
+    low: Dict[tuple, int] = {}
+    stack: List[tuple] = []
+    on_stack = set()
+    groups = []
+    for root in successors:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors[root]))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors.get(child, ()))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    group = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        group.append(member)
+                        if member == node:
+                            break
+                    groups.append(group)
+    return groups
+
+
+class StageProfiler:
+    """Profil du run attribué aux étapes fetch, parse, model, write, images (et display).
+
+    - **temps** : le temps propre de chaque fonction (cProfile) va à l'étape
+      de son module ; celui d'une fonction non reconnue est réparti entre
+      les étapes de ses appelants. Le temps d'attente du réseau (``select``)
+      revient à ``fetch`` ;
+    - **mémoire** : tracemalloc est échantillonné quand la mémoire tracée
+      atteint un nouveau maximum ; chaque bloc de l'échantillon le plus
+      élevé est attribué à l'étape du premier module reconnu de sa pile.
+
+    Seul le thread principal est profilé (le pipeline asynchrone y tourne) ;
+    le parsing dans les processus de ``--parse-workers`` n'apparaît que par
+    son attente. :meth:`stop` écrit ``run.prof`` et un ``<étape>.prof`` par
+    étape dans ``output_dir`` (triables avec ``python -m pstats`` ou
+    snakeviz), ainsi que ``memory.txt``.
+    """
+
+    def __init__(self, output_dir: Path, top: int = 20, nframes: int = 25,
+                 sample_interval: float = 0.2):
+        self.output_dir = Path(output_dir)
+        self.top = top
+        self.nframes = nframes
+        self.sample_interval = sample_interval
+        self.profile = cProfile.Profile()
+        self.stats: Optional[pstats.Stats] = None
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_bytes: Dict[str, int] = {}
+        self._stage_shares: Dict[tuple, Dict[str, float]] = {}
+        self.peak_bytes = 0
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._snapshot_size = 0
+        self._stop_sampling = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self):
+        tracemalloc.start(self.nframes)
+        self._sampler = threading.Thread(target=self._sample_memory, name="tracemalloc-sampler",
+                                         daemon=True)
+        self._sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        """Arrête le profilage, attribue temps et mémoire aux étapes et écrit les fichiers."""
+        self.profile.disable()
+        self._stop_sampling.set()
+        if self._sampler:
+            self._sampler.join()
+        self._take_snapshot()
+        self.peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.stats = pstats.Stats(self.profile)
+        self.stage_seconds = self._stage_times()
+        self.stage_bytes = self._stage_memory()
+        self._write_files()
+
+    # ------------------------------------------------------------------
+    # Temps
+    # ------------------------------------------------------------------
+
+    def _stage_times(self) -> Dict[str, float]:
+        seconds = dict.fromkeys(STAGES + (OTHER,), 0.0)
+        for func, (_, _, tottime, _, _) in self.stats.stats.items():
+            for stage, share in self._shares(func).items():
+                seconds[stage] += tottime * share
+        return seconds
+
+    def _shares(self, func: tuple) -> Dict[str, float]:
+        """Répartition d'une fonction entre les étapes (somme 1)."""
+        if not self._stage_shares:
+            self._stage_shares = self._attribute_stages()
+        return self._stage_shares.get(func, {OTHER: 1.0})
+
+    def _attribute_stages(self) -> Dict[tuple, Dict[str, float]]:
+        """Répartition de chaque fonction du profil entre les étapes.
+
+        Une fonction non reconnue suit ses appelants, au prorata du temps
+        passé pour chacun. Des fonctions qui s'appellent mutuellement (cycle
+        d'appels, récursion, imports imbriqués) forment un groupe qui suit
+        ses appelants extérieurs. Les groupes sont traités appelants d'abord :
+        chaque répartition est calculée une fois, sans limite de profondeur.
+        """
+        callers_of = {func: values[4] for func, values in self.stats.stats.items()}
+        successors = {func: () if stage_of(_function_location(func)) else callers
+                      for func, callers in callers_of.items()}
+        shares: Dict[tuple, Dict[str, float]] = {}
+        for group in _caller_groups(successors):
+            stage = stage_of(_function_location(group[0])) if len(group) == 1 else None
+            if stage is not None:
+                shares[group[0]] = {stage: 1.0}
+                continue
+
+            members = set(group)
+            weights: Dict[tuple, float] = {}
+            for func in group:
+                for caller, values in callers_of.get(func, {}).items():
+                    if caller not in members and values[2] > 0:
+                        weights[caller] = weights.get(caller, 0.0) + values[2]
+            total = sum(weights.values())
+            result: Dict[str, float] = {}
+            for caller, weight in weights.items():
+                for caller_stage, share in shares[caller].items():
+                    result[caller_stage] = result.get(caller_stage, 0.0) + share * weight / total
+            for func in group:
+                shares[func] = result or {OTHER: 1.0}
+        return shares
+
+    def main_stage(self, func: tuple) -> str:
+        shares = self._shares(func)
+        return max(shares, key=shares.get)
+
+    def top_functions(self) -> List[Tuple[str, int, float, float, str]]:
+        """Fonctions au plus fort temps propre : ``(nom, appels, temps propre, temps cumulé, étape)``."""
+        rows = sorted(self.stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [(function_name(func), calls, tottime, cumtime, self.main_stage(func))
+                for func, (_, calls, tottime, cumtime, _) in rows[:self.top]]
+
+    # ------------------------------------------------------------------
+    # Mémoire
+    # ------------------------------------------------------------------
+
+    def _sample_memory(self):
+        while not self._stop_sampling.wait(self.sample_interval):
+            current = tracemalloc.get_traced_memory()[0]
+            if current > self._snapshot_size * SNAPSHOT_GROWTH:
+                self._take_snapshot()
+
+    def _take_snapshot(self):
+        current = tracemalloc.get_traced_memory()[0]
+        if current <= self._snapshot_size:
+            return
+        self._snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        self._snapshot_size = current
+
+    def _stage_memory(self) -> Dict[str, int]:
+        sizes = dict.fromkeys(STAGES + (OTHER,), 0)
+        if self._snapshot is None:
+            return sizes
+        for trace in self._snapshot.traces:
+            stage = OTHER
+            # Du cadre le plus récent au plus ancien
+            for frame in reversed(trace.traceback):
+                found = stage_of(frame.filename)
+                if found:
+                    stage = found
+                    break
+            sizes[stage] += trace.size
+        return sizes
+
+    def top_allocations(self) -> List[tracemalloc.Statistic]:
+        if self._snapshot is None:
+            return []
+        return self._snapshot.statistics("lineno")[:self.top]
+
+    # ------------------------------------------------------------------
+    # Fichiers
+    # ------------------------------------------------------------------
+
+    def _write_files(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.stats.dump_stats(self.output_dir / "run.prof")
+
+        for stage in STAGES + (OTHER,):
+            stage_stats = pstats.Stats(self.profile)
+            stage_stats.stats = {func: values for func, values in stage_stats.stats.items()
+                                 if self.main_stage(func) == stage}
+            if stage_stats.stats:
+                stage_stats.dump_stats(self.output_dir / f"{stage}.prof")
+
+        lines = [f"Pic de mémoire tracée: {self.peak_bytes / 1024:.0f} Ko",
+                 f"Échantillon le plus élevé: {self._snapshot_size / 1024:.0f} Ko", ""]
+        lines += [f"{stage}: {size / 1024:.0f} Ko" for stage, size in self.stage_bytes.items()]
+        lines += ["", "Allocations principales :"]
+        lines += [str(statistic) for statistic in self.top_allocations()]
+        (self.output_dir / "memory.txt").write_text("\n".join(lines) + "\n", encoding='utf-8')
@@ -0,0 +1,63 @@
+"""
+⏱️ Maîtrise de la latence de queue : nouvelles tentatives, budget de temps global et requêtes couvertes
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+
+# Statuts transitoires pour lesquels une nouvelle tentative a un sens
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Nombre minimum de latences observées avant de déclencher des requêtes couvertes
+HEDGE_MIN_SAMPLES = 20
+
+
+class DeadlineExceeded(requests.Timeout, asyncio.TimeoutError):
+    """Le budget de temps global (``--deadline``) est épuisé.
+
+    Hérite des exceptions de timeout de ``requests`` et d'``asyncio`` : les
+    gestionnaires d'erreurs réseau existants la traitent comme un échec de requête.
+    """
+
+
+@dataclass
+class RetryPolicy:
+    """Nouvelles tentatives avec attente exponentielle « full jitter »."""
+
+    retries: int = 2
+    backoff: float = 0.5  # Attente de base (secondes) avant la première nouvelle tentative
+    max_backoff: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Attente avant la tentative ``attempt`` (1 = première nouvelle tentative).
+
+        Un ``Retry-After`` fourni par le serveur est prioritaire ; sinon
+        l'attente est tirée uniformément entre 0 et ``backoff × 2^(attempt-1)``
+        pour que les clients en échec ne reviennent pas tous en même temps.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+class Deadline:
+    """Budget de temps global d'un run, démarré à sa création."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def clamp(self, timeout: float) -> float:
+        """Réduit un timeout pour qu'il ne dépasse pas le budget restant (1 ms au minimum)."""
+        return max(0.001, min(timeout, self.remaining()))
@@ -2,19 +2,27 @@
 🔍 Scraper principal modernisé avec support asynchrone et gestion d'erreurs robuste
 """
 import asyncio
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 from urllib.parse import urljoin
 
 import aiohttp
 import requests
-from bs4 import BeautifulSoup
 from rich.console import Console
 from rich.progress import Progress, TaskID
 
+from .config import ScraperConfig
 from .models.book import Book, Category
+from .models.listing import ListingPage
+from .metrics import ERROR_STATUS, run_metrics
+from .parsers import BOOK_PAGE, HOME_PAGE, LISTING_PAGE, get_parser
+from .resilience import RETRY_STATUSES, Deadline, DeadlineExceeded, RetryPolicy
+from .throttle import parse_retry_after
+from .utils.archive import ArchivedResponse, PageArchive
 from .utils.file_handler import save_image
+from .utils.http_cache import ResponseCache
 
 console = Console()
 
@@ -22,44 +30,174 @@ console = Console()
 class BookStoreScraper:
     """Scraper moderne pour books.toscrape.com avec interface Rich."""
     
-    def __init__(self, base_url: str = "http://books.toscrape.com/"):
+    def __init__(self, base_url: str = "http://books.toscrape.com/",
+                 config: Optional[ScraperConfig] = None):
         self.base_url = base_url
+        self.config = config or ScraperConfig()
+        self.parser = get_parser(self.config.parser)
         self.headers = {
             'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                          "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Pool de connexions assez grand pour les pages de listing parallèles
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(10, self.config.page_concurrency))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        self.cache = None
+        if self.config.cache_dir:
+            self.cache = ResponseCache(self.config.cache_dir,
+                                       max_bytes=self.config.cache_max_mb * 1024 * 1024,
+                                       max_age=self.config.cache_max_age)
+        
+        self.retry_policy = RetryPolicy(self.config.retries, self.config.backoff)
+        self.deadline = Deadline(self.config.deadline) if self.config.deadline else None
+        # URLs abandonnées faute de temps (budget --deadline épuisé)
+        self.unreached: List[str] = []
+        
+        # Archive WARC : pages servies depuis l'archive (rejeu) ou ajoutées à l'archive
+        self.archive: Optional[PageArchive] = None
+        if self.config.replay_archive:
+            self.archive = PageArchive.for_replay(self.config.replay_archive)
+        elif self.config.record_archive:
+            self.archive = PageArchive.for_recording(self.config.record_archive)
+    
+    def _check_deadline(self, url: str):
+        """Lève :class:`DeadlineExceeded` (et note l'URL) si le budget global est épuisé."""
+        if self.deadline and self.deadline.expired:
+            self.unreached.append(url)
+            raise DeadlineExceeded(f"Budget de temps épuisé avant {url}")
+    
+    def _request_timeout(self):
+        """Timeouts ``(connexion, lecture)`` d'une requête, bornés par le budget restant."""
+        connect, read = self.config.connect_timeout, self.config.read_timeout
+        if self.deadline:
+            connect, read = self.deadline.clamp(connect), self.deadline.clamp(read)
+        return connect, read
+    
+    def _get(self, url: str, headers: Optional[dict] = None) -> requests.Response:
+        """GET avec timeouts et nouvelles tentatives (attente exponentielle avec jitter).
+        
+        Les erreurs réseau et les statuts transitoires (429, 5xx) sont retentés
+        ``config.retries`` fois ; la dernière réponse ou erreur est renvoyée.
+        """
+        attempt = 0
+        while True:
+            self._check_deadline(url)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self._request_timeout())
+            except (requests.ConnectionError, requests.Timeout):
+                run_metrics.record_request(url, ERROR_STATUS, time.perf_counter() - start)
+                # Requête coupée par le budget global : l'URL est notée comme non atteinte
+                self._check_deadline(url)
+                if attempt >= self.retry_policy.retries:
+                    raise
+                attempt += 1
+                time.sleep(self._retry_delay(attempt))
+                continue
+            run_metrics.record_request(url, response.status_code, time.perf_counter() - start,
+                                       len(response.content))
+            
+            if response.status_code in RETRY_STATUSES and attempt < self.retry_policy.retries:
+                attempt += 1
+                time.sleep(self._retry_delay(
+                    attempt, parse_retry_after(response.headers.get("Retry-After"))))
+                continue
+            return response
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Attente avant une nouvelle tentative, bornée par le budget restant."""
+        delay = self.retry_policy.delay(attempt, retry_after)
+        return self.deadline.clamp(delay) if self.deadline else delay
+    
+    def fetch(self, url: str) -> requests.Response:
+        """Télécharge une page, ou la relit depuis l'archive en mode rejeu.
+        
+        En mode enregistrement, chaque réponse est ajoutée à l'archive.
+        """
+        if self.archive and self.archive.replaying:
+            return self._replayed_response(url, self.archive.lookup(url))
+        
+        response = self._fetch_http(url)
+        if self.archive:
+            self.archive.record(url, response.status_code, response.headers, response.content)
+        return response
+    
+    def _fetch_http(self, url: str) -> requests.Response:
+        """Télécharge une page, en passant par le cache HTTP s'il est activé."""
+        if not self.cache:
+            return self._get(url)
+        
+        entry = self.cache.lookup(url)
+        if entry and self.cache.is_fresh(entry):
+            content = self.cache.load(url, entry)
+            if content is not None:
+                return self._cached_response(url, content)
+        
+        response = self._get(url, headers=self.cache.conditional_headers(entry))
+        
+        # 304 : la copie en cache est toujours valide
+        if response.status_code == 304 and entry:
+            content = self.cache.load(url, entry, revalidated=True)
+            if content is not None:
+                return self._cached_response(url, content)
+            response = self._get(url)
+        
+        self.cache.record_miss()
+        if response.status_code == 200:
+            self.cache.store(url, response.headers, response.content)
+        return response
+    
+    @staticmethod
+    def _cached_response(url: str, content: bytes) -> requests.Response:
+        """Construit une réponse ``requests`` à partir d'un corps servi par le cache."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = content
+        return response
+    
+    @staticmethod
+    def _replayed_response(url: str, archived: Optional[ArchivedResponse]) -> requests.Response:
+        """Construit une réponse ``requests`` depuis l'archive (404 si la page n'y est pas)."""
+        response = requests.Response()
+        response.url = url
+        if archived is None:
+            response.status_code = 404
+            response.reason = "Absent de l'archive"
+            response._content = b""
+            return response
+        response.status_code = archived.status
+        response.headers.update(archived.headers)
+        response._content = archived.body
+        return response
+    
+    def close(self):
+        """Libère la session HTTP, enregistre l'index du cache et ferme l'archive."""
+        if self.archive:
+            self.archive.close()
+        if self.cache:
+            self.cache.save()
+        self.session.close()
     
     def get_all_categories(self) -> List[Category]:
         """Récupère toutes les catégories disponibles sur le site."""
         console.print("🔍 [bold cyan]Récupération des catégories...[/bold cyan]")
         
         try:
-            response = self.session.get(self.base_url)
+            response = self.fetch(self.base_url)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, "html.parser")
-            categories = []
-            
             # Trouve toutes les catégories dans la navigation
-            nav_list = soup.find("ul", class_="nav-list")
-            if not nav_list:
+            with run_metrics.time_parse(HOME_PAGE):
+                categories = self.parser.parse_categories(response.content)
+            if categories is None:
                 console.print("[red]❌ Impossible de trouver la liste des catégories[/red]")
                 return []
             
-            links = nav_list.find_all("a")
-            
-            for link in links[1:]:  # Skip le premier qui est "Books"
-                category_name = link.get_text().strip()
-                category_url = link.get('href')
-                
-                if category_name and category_url:
-                    categories.append(Category(
-                        nom=category_name.lower(),
-                        url=category_url
-                    ))
-            
             console.print(f"✅ [green]{len(categories)} catégories trouvées[/green]")
             return categories
             
@@ -70,132 +208,119 @@ class BookStoreScraper:
     def get_book_details(self, book_url: str) -> Optional[Book]:
         """Récupère les détails d'un livre à partir de son URL."""
         try:
-            response = self.session.get(book_url)
+            response = self.fetch(book_url)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, "html.parser")
-            
-            # Extraction des informations produit
-            product_info = soup.find_all("td")
-            if len(product_info) < 6:
-                console.print(f"[yellow]⚠️ Informations incomplètes pour {book_url}[/yellow]")
-                return None
-            
-            # Extraction des données
-            upc = product_info[0].get_text().strip()
-            price_exc_tax = product_info[2].get_text().strip()[1:]  # Remove £
-            price_inc_tax = product_info[3].get_text().strip()[1:]  # Remove £ 
-            availability = product_info[5].get_text().strip()
-            
-            # Titre
-            title_elem = soup.find("h1")
-            title = title_elem.get_text().strip() if title_elem else "Titre inconnu"
-            
-            # Description
-            description_elem = soup.find("article", class_="product_page")
-            description = ""
-            if description_elem:
-                desc_paragraphs = description_elem.find_all('p')
-                if len(desc_paragraphs) >= 4:
-                    description = desc_paragraphs[3].get_text().strip()
-            
-            # Catégorie depuis le breadcrumb
-            breadcrumb = soup.find("ul", class_="breadcrumb")
-            category = "Unknown"
-            if breadcrumb:
-                links = breadcrumb.find_all("a")
-                if len(links) >= 3:
-                    category = links[2].get_text().strip()
-            
-            # Rating
-            rating_elem = soup.find('p', class_="star-rating")
-            rating = rating_elem.get('class')[1] if rating_elem else "Unknown"
-            
-            # Image URL
-            img_elem = soup.find('img')
-            image_url = ""
-            if img_elem:
-                img_src = img_elem.get('src', '')
-                if img_src.startswith('../..'):
-                    image_url = urljoin(self.base_url, img_src[6:])
-                else:
-                    image_url = urljoin(self.base_url, img_src)
-            
-            return Book(
-                product_page_url=book_url,
-                universal_product_code=upc,
-                title=title,
-                price_including_tax=price_inc_tax,
-                price_excluding_tax=price_exc_tax,
-                number_available=availability,
-                product_description=description,
-                category=category,
-                review_rating=rating,
-                image_url=image_url
-            )
-            
         except requests.RequestException as e:
             console.print(f"[red]❌ Erreur lors du scraping de {book_url}: {e}[/red]")
             return None
+        
+        return self.parse_book_details(response.content, book_url)
+    
+    def get_books_details(self, book_urls: List[str],
+                          on_book: Optional[Callable[[Optional[Book]], None]] = None) -> List[Book]:
+        """Récupère les détails d'une liste de livres, un par un.
+        
+        ``on_book`` est appelé après chaque URL traitée (avec ``None`` en cas d'échec),
+        ce qui permet d'avancer une barre de progression.
+        """
+        books = []
+        for book_url in book_urls:
+            book = self.get_book_details(book_url)
+            if book:
+                books.append(book)
+            if on_book:
+                on_book(book)
+        return books
+    
+    def parse_book_details(self, content: bytes, book_url: str) -> Optional[Book]:
+        """Extrait un livre du HTML d'une page produit."""
+        try:
+            with run_metrics.time_parse(BOOK_PAGE):
+                return self.parser.parse_book(content, book_url, self.base_url)
         except Exception as e:
             console.print(f"[red]❌ Erreur inattendue pour {book_url}: {e}[/red]")
             return None
     
-    def get_books_from_category(self, category: Category) -> List[str]:
-        """Récupère tous les liens des livres d'une catégorie (avec pagination)."""
-        book_links = []
-        
+    def category_page_url(self, category: Category, page: int) -> str:
+        """Construit l'URL d'une page de listing d'une catégorie."""
         # Construction de l'URL de base pour la catégorie
         category_base_url = urljoin(self.base_url, category.url[:-10])  # Remove index.html
         
-        page = 1
+        if page == 1:
+            return urljoin(category_base_url, "index.html")
+        return urljoin(category_base_url, f"page-{page}.html")
+    
+    def parse_category_page(self, content: bytes) -> ListingPage:
+        """Extrait les livres et les infos de pagination d'une page de listing."""
+        with run_metrics.time_parse(LISTING_PAGE):
+            return self.parser.parse_listing(content, self.base_url)
+    
+    def _fetch_listing(self, page_url: str) -> Optional[ListingPage]:
+        """Télécharge et analyse une page de listing (``None`` si elle n'existe pas)."""
+        response = self.fetch(page_url)
         
-        while True:
-            # URL de la page courante
-            if page == 1:
-                page_url = urljoin(category_base_url, "index.html")
-            else:
-                page_url = urljoin(category_base_url, f"page-{page}.html")
-            
+        # Si la page n'existe pas, on s'arrête
+        if response.status_code == 404:
+            return None
+        
+        response.raise_for_status()
+        return self.parse_category_page(response.content)
+    
+    def get_books_from_category(self, category: Category) -> List[str]:
+        """Récupère tous les liens des livres d'une catégorie (avec pagination).
+        
+        La première page indique le nombre total de pages : les pages 2..N sont
+        alors demandées en parallèle au lieu d'être suivies une à une.
+        """
+        try:
+            first = self._fetch_listing(self.category_page_url(category, 1))
+        except requests.RequestException as e:
+            console.print(f"[red]❌ Erreur page 1 de {category.nom}: {e}[/red]")
+            return []
+        
+        if not first or not first.links:
+            return []
+        
+        if first.page_count is None:
+            return first.links + self._get_remaining_pages_sequential(category, first)
+        
+        book_links = list(first.links)
+        pages = range(2, first.page_count + 1)
+        
+        def fetch_page(page: int) -> List[str]:
+            try:
+                listing = self._fetch_listing(self.category_page_url(category, page))
+            except requests.RequestException as e:
+                console.print(f"[red]❌ Erreur page {page} de {category.nom}: {e}[/red]")
+                return []
+            return listing.links if listing else []
+        
+        # map conserve l'ordre des pages
+        with ThreadPoolExecutor(max_workers=self.config.page_concurrency) as executor:
+            for links in executor.map(fetch_page, pages):
+                book_links.extend(links)
+        
+        return book_links
+    
+    def _get_remaining_pages_sequential(self, category: Category, first: ListingPage) -> List[str]:
+        """Suit les liens "next" un par un quand le pager n'indique pas le nombre de pages."""
+        book_links = []
+        has_next = first.has_next
+        page = 2
+        
+        while has_next:
             try:
-                response = self.session.get(page_url)
-                
-                # Si la page n'existe pas, on s'arrête
-                if response.status_code == 404:
-                    break
-                    
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, "html.parser")
-                
-                # Trouve tous les conteneurs d'images (qui contiennent les liens)
-                book_containers = soup.find_all("div", class_="image_container")
-                
-                if not book_containers:
-                    break
-                
-                # Extrait les liens des livres
-                for container in book_containers:
-                    link_elem = container.find("a")
-                    if link_elem:
-                        book_link = link_elem.get('href')
-                        if book_link:
-                            # Construit l'URL complète
-                            if book_link.startswith('../../../'):
-                                full_url = urljoin(self.base_url, 'catalogue/' + book_link[9:])
-                            else:
-                                full_url = urljoin(self.base_url, book_link)
-                            book_links.append(full_url)
-                
-                # Vérifie s'il y a une page suivante
-                next_button = soup.find("li", class_="next")
-                if not next_button:
-                    break
-                    
-                page += 1
-                
+                listing = self._fetch_listing(self.category_page_url(category, page))
             except requests.RequestException as e:
                 console.print(f"[red]❌ Erreur page {page} de {category.nom}: {e}[/red]")
                 break
+            
+            if not listing or not listing.links:
+                break
+            
+            book_links.extend(listing.links)
+            has_next = listing.has_next
+            page += 1
         
         return book_links
     
@@ -0,0 +1,184 @@
+"""
+🎚️ Contrôle adaptatif du parallélisme par hôte (AIMD) piloté par la latence et les 429/503
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+# Statuts signalant que le serveur nous demande de ralentir
+THROTTLE_STATUSES = (429, 503)
+
+
+def percentile(values: Iterable[float], pct: float) -> float:
+    """Percentile par rang le plus proche (0 si aucune valeur)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convertit un en-tête ``Retry-After`` (secondes ou date HTTP) en secondes d'attente."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class LatencyWindow:
+    """Dernières latences observées (secondes) et leur p95."""
+
+    def __init__(self, size: int = 100):
+        self.values: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, latency: float):
+        self.values.append(latency)
+
+    @property
+    def p95(self) -> float:
+        return percentile(self.values, 95)
+
+
+class AdaptiveLimiter:
+    """Limite de requêtes simultanées ajustée en AIMD pour un hôte.
+
+    - **augmentation additive** : +1 à chaque « tour » (``limit`` réponses)
+      tant que le p95 de latence reste proche de la meilleure valeur observée ;
+    - **diminution multiplicative** : ×``decrease`` sur un 429/503 ou quand
+      le p95 dépasse ``tolerance`` × la référence, au plus une fois par
+      épisode : les 429/503 des requêtes parties avant la dernière diminution
+      appartiennent au même épisode et sont ignorés ;
+    - ``Retry-After`` suspend toutes les nouvelles requêtes vers l'hôte.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64,
+                 window: int = 20, tolerance: float = 1.5, decrease: float = 0.5):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(self.maximum, max(minimum, initial)))
+        self.window = window
+        self.tolerance = tolerance
+        self.decrease = decrease
+
+        self.in_flight = 0
+        self.peak = int(self.limit)
+        self.backoffs = 0
+        self.latencies = LatencyWindow()
+        self._baseline: Optional[float] = None
+        self._since_adjust = 0
+        self._last_decrease = float("-inf")
+        self._blocked_until = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    @property
+    def p95(self) -> float:
+        return self.latencies.p95
+
+    async def acquire(self):
+        """Attend une place libre (et la fin d'un éventuel ``Retry-After``)."""
+        while True:
+            delay = self._blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight < self.current_limit:
+                self.in_flight += 1
+                return
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def release(self):
+        """Libère une place."""
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        free = self.current_limit - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def record(self, latency: float, status: int, retry_after: Optional[float] = None):
+        """Intègre le résultat d'une requête et ajuste la limite.
+
+        ``latency`` (secondes, horloge ``time.monotonic``) date aussi le départ
+        de la requête, pour rattacher un 429/503 à son épisode de saturation.
+        """
+        if status in THROTTLE_STATUSES:
+            # Toutes les requêtes en vol lors de la saturation reviennent en 429 :
+            # une seule diminution pour l'épisode, pas une par réponse
+            if time.monotonic() - latency >= self._last_decrease:
+                self._back_off()
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            return
+
+        self.latencies.add(latency)
+        self._since_adjust += 1
+        if self._since_adjust < max(self.window, self.current_limit):
+            return
+        self._since_adjust = 0
+
+        p95 = self.p95
+        if self._baseline is None or p95 < self._baseline:
+            self._baseline = p95
+
+        if p95 > self._baseline * self.tolerance:
+            self._back_off()
+            # La référence suit la latence pour ne pas redescendre indéfiniment
+            self._baseline = (self._baseline + p95) / 2
+        elif self.limit < self.maximum:
+            self.limit += 1
+            self.peak = max(self.peak, self.current_limit)
+            self._wake()
+
+    def _back_off(self):
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self.backoffs += 1
+        self._since_adjust = 0
+        self._last_decrease = time.monotonic()
+
+
+class AdaptiveThrottle:
+    """Registre des limiteurs adaptatifs, un par hôte."""
+
+    def __init__(self, initial: int, maximum: int = 64, minimum: int = 1):
+        self.initial = initial
+        self.maximum = maximum
+        self.minimum = minimum
+        self.hosts: Dict[str, AdaptiveLimiter] = {}
+
+    def limiter(self, url: str) -> AdaptiveLimiter:
+        host = urlparse(url).netloc
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            limiter = self.hosts[host] = AdaptiveLimiter(self.initial, self.minimum, self.maximum)
+        return limiter
@@ -0,0 +1,212 @@
+"""
+🗃️ Archive WARC des pages téléchargées : enregistrement (--record) et rejeu hors ligne (--replay)
+"""
+import gzip
+import json
+import threading
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+
+from rich.console import Console
+
+console = Console()
+
+# En-têtes qui ne décrivent plus le corps enregistré (déjà décompressé, longueur recalculée)
+_SKIPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+# Taille des blocs lus pendant la reconstruction de l'index
+_REBUILD_CHUNK = 1 << 16
+
+
+@dataclass
+class ArchivedResponse:
+    """Réponse relue depuis l'archive."""
+
+    url: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+
+class PageArchive:
+    """Archive append-only au format WARC 1.0 compressé (``.warc.gz``).
+
+    Chaque réponse est un enregistrement ``response`` compressé dans son
+    propre membre gzip : le fichier reste lisible par les outils WARC et un
+    enregistrement se relit sans décompresser le reste. L'index
+    ``<archive>.idx`` (une ligne JSON par enregistrement : URL, position,
+    longueur) est complété à chaque ajout ; il est reconstruit en parcourant
+    l'archive s'il manque ou s'il est en retard sur elle.
+    """
+
+    def __init__(self, path: Path, replay: bool = False):
+        self.path = Path(path)
+        self.replaying = replay
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.missing = 0
+
+        if replay:
+            if not self.path.exists():
+                raise FileNotFoundError(f"Archive introuvable: {self.path}")
+            self._load_index()
+            self._file = open(self.path, 'rb')
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'ab')
+            self._index_file = open(self.index_path, 'a', encoding='utf-8')
+
+    @classmethod
+    def for_recording(cls, path: Path) -> "PageArchive":
+        return cls(path, replay=False)
+
+    @classmethod
+    def for_replay(cls, path: Path) -> "PageArchive":
+        return cls(path, replay=True)
+
+    # ------------------------------------------------------------------
+    # Enregistrement
+    # ------------------------------------------------------------------
+
+    def record(self, url: str, status: int, headers: Mapping[str, str], body: bytes):
+        """Ajoute une réponse à l'archive."""
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ""
+        http_head = f"HTTP/1.1 {status} {reason}\r\n"
+        http_head += "".join(f"{name}: {value}\r\n" for name, value in headers.items()
+                             if name.lower() not in _SKIPPED_HEADERS)
+        http_head += f"Content-Length: {len(body)}\r\n\r\n"
+        payload = http_head.encode('utf-8') + body
+
+        warc_head = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n"
+        )
+        member = gzip.compress(warc_head.encode('utf-8') + payload + b"\r\n\r\n")
+
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(member)
+            self._file.flush()
+            self._index[url] = (offset, len(member))
+            self._index_file.write(json.dumps({"url": url, "offset": offset,
+                                               "length": len(member), "status": status}) + "\n")
+            self._index_file.flush()
+            self.recorded += 1
+
+    # ------------------------------------------------------------------
+    # Rejeu
+    # ------------------------------------------------------------------
+
+    def lookup(self, url: str) -> Optional[ArchivedResponse]:
+        """Relit la dernière réponse enregistrée pour ``url`` (``None`` si absente)."""
+        position = self._index.get(url)
+        if position is None:
+            self.missing += 1
+            return None
+
+        offset, length = position
+        with self._lock:
+            self._file.seek(offset)
+            member = self._file.read(length)
+        self.replayed += 1
+        return self._parse_record(url, gzip.decompress(member))
+
+    @staticmethod
+    def _parse_record(url: str, record: bytes) -> ArchivedResponse:
+        warc_head, _, rest = record.partition(b"\r\n\r\n")
+        warc_headers = _parse_headers(warc_head.decode('utf-8').split("\r\n")[1:])
+        payload = rest[:int(warc_headers.get("content-length", len(rest)))]
+
+        http_head, _, body = payload.partition(b"\r\n\r\n")
+        lines = http_head.decode('utf-8').split("\r\n")
+        status = int(lines[0].split()[1])
+        return ArchivedResponse(url, status, _parse_headers(lines[1:]), body)
+
+    def _load_index(self):
+        size = self.path.stat().st_size
+        end = 0
+        try:
+            with open(self.index_path, encoding='utf-8') as index_file:
+                for line in index_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    self._index[entry["url"]] = (entry["offset"], entry["length"])
+                    end = max(end, entry["offset"] + entry["length"])
+        except FileNotFoundError:
+            pass
+
+        # Index absent ou incomplet (arrêt brutal pendant l'enregistrement)
+        if end < size:
+            console.print(f"[yellow]⚠️ Index de {self.path.name} incomplet, reconstruction...[/yellow]")
+            self._rebuild_index(end)
+
+    def _rebuild_index(self, start: int = 0):
+        """Parcourt les membres gzip de l'archive à partir de ``start`` pour retrouver chaque enregistrement.
+
+        Les enregistrements avant ``start`` sont ceux de l'index. L'archive est
+        lue par blocs de taille fixe : seul l'en-tête WARC de chaque membre est
+        conservé.
+        """
+        with open(self.path, 'rb') as archive:
+            archive.seek(start)
+            offset = start
+            pending = b""  # Octets lus au-delà du membre précédent
+            while True:
+                decompressor = zlib.decompressobj(wbits=31)
+                head = b""
+                length = 0
+                while not decompressor.eof:
+                    chunk = pending or archive.read(_REBUILD_CHUNK)
+                    pending = b""
+                    if not chunk:
+                        break
+                    try:
+                        output = decompressor.decompress(chunk)
+                    except zlib.error:
+                        console.print(f"[yellow]⚠️ Fin d'archive illisible ignorée à l'octet {offset}[/yellow]")
+                        return
+                    if b"\r\n\r\n" not in head:
+                        head += output
+                    pending = decompressor.unused_data
+                    length += len(chunk) - len(pending)
+                if not decompressor.eof:
+                    # Fin de fichier, ou dernier enregistrement tronqué
+                    return
+                warc_head = head.split(b"\r\n\r\n", 1)[0].decode('utf-8')
+                for line in warc_head.split("\r\n"):
+                    if line.startswith("WARC-Target-URI:"):
+                        self._index[line.split(":", 1)[1].strip()] = (offset, length)
+                offset += length
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            if not self.replaying:
+                self._index_file.close()
+
+
+def _parse_headers(lines) -> Dict[str, str]:
+    headers = {}
+    for line in lines:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return headers
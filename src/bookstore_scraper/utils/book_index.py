@@ -0,0 +1,206 @@
+"""
+🔎 Index persistant des livres du dossier de sortie (UPC / titre → fichier, position)
+"""
+import csv
+import mmap
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from rich.console import Console
+
+from .file_handler import CSV_HEADERS
+
+console = Console()
+
+# Position d'une ligne : chemin du CSV relatif au dossier de sortie, position en octets
+Location = Tuple[str, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    name TEXT NOT NULL,
+    upc TEXT,
+    title TEXT,
+    offset INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rows_upc ON rows (upc);
+CREATE INDEX IF NOT EXISTS rows_title ON rows (title);
+CREATE INDEX IF NOT EXISTS rows_name ON rows (name);
+"""
+
+
+def normalize_title(title: str) -> str:
+    """Forme de recherche d'un titre : casse et espaces ignorés."""
+    return " ".join(title.casefold().split())
+
+
+def iter_csv_offsets(csv_path: Path) -> Iterator[Tuple[int, List[str]]]:
+    """Parcourt un CSV en renvoyant la position en octets du début de chaque ligne de données.
+
+    Une description peut contenir des retours à la ligne : les lignes physiques
+    sont confiées une à une à ``csv.reader``, qui ne lit jamais au-delà de
+    l'enregistrement en cours ; la position consommée marque donc le début du
+    suivant.
+    """
+    consumed = 0
+
+    with open(csv_path, 'rb') as csvfile:
+        def lines() -> Iterator[str]:
+            nonlocal consumed
+            for raw in csvfile:
+                consumed += len(raw)
+                yield raw.decode('utf-8')
+
+        reader = csv.reader(lines())
+        next(reader, None)  # En-tête
+        start = consumed
+        for row in reader:
+            yield start, row
+            start = consumed
+
+
+class BookIndex:
+    """Index SQLite des livres de tous les CSV d'un dossier de sortie.
+
+    Pour chaque CSV indexé, l'index garde sa taille et sa date de modification
+    ainsi que l'UPC, le titre normalisé et la position en octets de chaque
+    ligne. Les commandes qui écrivent un CSV le réindexent aussitôt
+    (:meth:`update`) : une recherche (:meth:`lookup`) ne consulte que les
+    index SQLite et ne vérifie que les CSV où elle a trouvé des lignes, quel
+    que soit le nombre de fichiers du dossier. :meth:`refresh` parcourt tout
+    le dossier, pour un index neuf ou des CSV modifiés hors de l'outil. Les
+    lignes trouvées sont lues directement à leur position, dans le fichier
+    projeté en mémoire (``mmap``).
+    """
+
+    FILE_NAME = ".book_index.sqlite"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.path = self.root / self.FILE_NAME
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(_SCHEMA)
+        self._maps: Dict[str, mmap.mmap] = {}
+
+    @classmethod
+    def for_output(cls, output: Path) -> "BookIndex":
+        return cls(output)
+
+    @property
+    def empty(self) -> bool:
+        """Vrai si aucun CSV n'est encore indexé (index neuf)."""
+        return self._conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+
+    def _drop(self, name: str):
+        """Oublie les lignes d'un CSV (à appeler dans une transaction)."""
+        self._conn.execute("DELETE FROM rows WHERE name = ?", (name,))
+        self._conn.execute("DELETE FROM files WHERE name = ?", (name,))
+        data = self._maps.pop(name, None)
+        if data is not None:
+            data.close()
+
+    def update(self, csv_path: Path) -> int:
+        """(Ré)indexe un CSV qui vient d'être écrit et renvoie son nombre de lignes."""
+        name = Path(csv_path).relative_to(self.root).as_posix()
+        stat = csv_path.stat()
+        upc_col = CSV_HEADERS.index("universal_product_code")
+        title_col = CSV_HEADERS.index("title")
+        # Les livres partiels (--listing-only) n'ont pas d'UPC : il n'est pas indexé
+        rows = [(name, row[upc_col] or None, normalize_title(row[title_col]) or None, offset)
+                for offset, row in iter_csv_offsets(csv_path) if len(row) == len(CSV_HEADERS)]
+        with self._conn:
+            self._drop(name)
+            self._conn.executemany("INSERT INTO rows (name, upc, title, offset) VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT INTO files (name, size, mtime_ns, rows) VALUES (?, ?, ?, ?)",
+                               (name, stat.st_size, stat.st_mtime_ns, len(rows)))
+        return len(rows)
+
+    def _check(self, name: str, size: int, mtime_ns: int) -> bool:
+        """Réindexe ou oublie un CSV modifié ou supprimé ; renvoie vrai s'il a changé."""
+        csv_path = self.root / name
+        try:
+            stat = csv_path.stat()
+        except FileNotFoundError:
+            with self._conn:
+                self._drop(name)
+            return True
+        if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+            return False
+        self.update(csv_path)
+        return True
+
+    def refresh(self) -> int:
+        """Indexe les CSV nouveaux ou modifiés et oublie les disparus ; renvoie le nombre de CSV relus."""
+        known = {name: (size, mtime_ns)
+                 for name, size, mtime_ns in self._conn.execute("SELECT name, size, mtime_ns FROM files")}
+        updated = 0
+        for csv_path in self.root.rglob("*.csv"):
+            if csv_path.name.endswith(".delta.csv"):
+                continue
+            name = csv_path.relative_to(self.root).as_posix()
+            previous = known.pop(name, None)
+            if previous is None:
+                self.update(csv_path)
+                updated += 1
+            elif self._check(name, *previous):
+                updated += 1
+        if known:
+            with self._conn:
+                for name in known:
+                    self._drop(name)
+        return updated
+
+    def _find(self, column: str, key: str) -> List[Location]:
+        return self._conn.execute(f"SELECT name, offset FROM rows WHERE {column} = ? ORDER BY name, offset",
+                                  (key,)).fetchall()
+
+    def find_upc(self, upc: str) -> List[Location]:
+        upc = upc.strip()
+        return self._find("upc", upc) if upc else []
+
+    def find_title(self, title: str) -> List[Location]:
+        title = normalize_title(title)
+        return self._find("title", title) if title else []
+
+    def lookup(self, term: str) -> List[Location]:
+        """Lignes d'un UPC, à défaut d'un titre, en réindexant les CSV trouvés s'ils ont changé."""
+        locations = self.find_upc(term) or self.find_title(term)
+        names = sorted({name for name, _ in locations})
+        if not names:
+            return locations
+        files = self._conn.execute(
+            f"SELECT name, size, mtime_ns FROM files WHERE name IN ({', '.join('?' * len(names))})",
+            names).fetchall()
+        changed = [self._check(*entry) for entry in files]
+        if any(changed):
+            locations = self.find_upc(term) or self.find_title(term)
+        return locations
+
+    def read_row(self, location: Location) -> Dict[str, str]:
+        """Relit la ligne CSV située à ``location``."""
+        name, offset = location
+        data = self._maps.get(name)
+        if data is None:
+            with open(self.root / name, 'rb') as csvfile:
+                data = self._maps[name] = mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ)
+        data.seek(offset)
+        reader = csv.reader(line.decode('utf-8') for line in iter(data.readline, b""))
+        return dict(zip(CSV_HEADERS, next(reader)))
+
+    def count(self) -> int:
+        """Nombre de lignes indexées."""
+        total: Optional[int] = self._conn.execute("SELECT SUM(rows) FROM files").fetchone()[0]
+        return total or 0
+
+    def close(self):
+        for data in self._maps.values():
+            data.close()
+        self._maps.clear()
+        self._conn.close()
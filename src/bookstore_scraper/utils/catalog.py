@@ -0,0 +1,106 @@
+"""
+🗺️ Carte du catalogue : catégories et livres de chaque page de listing, avec durée de validité
+"""
+import json
+import os
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from rich.console import Console
+
+from ..models.book import Category
+from ..models.listing import ListingItem
+
+console = Console()
+
+
+class CatalogMap:
+    """Carte persistante catégorie → pages de listing → livres.
+
+    Chaque commande commence par la liste des catégories puis parcourt leurs
+    pages de listing, qui changent rarement. La carte les garde dans un
+    fichier JSON du dossier de sortie : une entrée plus récente que ``ttl``
+    secondes est servie sans requête. Une entrée expirée (ou toutes, avec
+    ``refresh``) est ignorée ; le run parcourt alors le site et la remplace.
+
+    La carte est liée à l'URL du site : un fichier d'un autre site est ignoré.
+    """
+
+    FILE_NAME = ".catalog.json"
+
+    def __init__(self, path: Path, base_url: str, ttl: float = 86400, refresh: bool = False):
+        self.path = Path(path)
+        self.base_url = base_url
+        self.ttl = ttl
+        self.refresh = refresh
+        self.hits = 0  # Listings servis depuis la carte
+        self.updates = 0  # Listings (re)parcourus et enregistrés
+        self._categories: Optional[dict] = None
+        self._listings: Dict[str, dict] = {}
+        self._dirty = False
+        self._load()
+
+    @classmethod
+    def for_output(cls, output: Path, base_url: str, ttl: float = 86400,
+                   refresh: bool = False) -> "CatalogMap":
+        return cls(output / cls.FILE_NAME, base_url, ttl, refresh)
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            console.print(f"[yellow]⚠️ Carte du catalogue illisible {self.path}, reconstruction: {e}[/yellow]")
+            return
+
+        if data.get("base_url") != self.base_url:
+            return
+        self._categories = data.get("categories")
+        self._listings = data.get("listings", {})
+
+    def save(self):
+        """Écrit la carte de manière atomique, si elle a changé."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"base_url": self.base_url, "categories": self._categories,
+                                        "listings": self._listings}), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def _fresh(self, entry: Optional[dict]) -> bool:
+        return (entry is not None and not self.refresh
+                and time.time() - entry["fetched_at"] < self.ttl)
+
+    def categories(self) -> Optional[List[Category]]:
+        """Catégories de la carte (``None`` si absentes ou expirées)."""
+        if not self._fresh(self._categories):
+            return None
+        return [Category(nom, url) for nom, url in self._categories["items"]]
+
+    def set_categories(self, categories: List[Category]):
+        self._categories = {"fetched_at": time.time(),
+                            "items": [[category.nom, category.url] for category in categories]}
+        self._dirty = True
+
+    def listing(self, category: Category) -> Optional[List[List[ListingItem]]]:
+        """Livres de chaque page de listing d'une catégorie (``None`` si absents ou expirés)."""
+        entry = self._listings.get(category.url)
+        if not self._fresh(entry):
+            return None
+        self.hits += 1
+        return [[ListingItem(**item) for item in page] for page in entry["pages"]]
+
+    def set_listing(self, category: Category, pages: List[List[ListingItem]]):
+        """Enregistre un parcours complet des pages de listing d'une catégorie."""
+        self._listings[category.url] = {"fetched_at": time.time(),
+                                        "pages": [[asdict(item) for item in page] for page in pages]}
+        self.updates += 1
+        self._dirty = True
+
+    def close(self):
+        self.save()
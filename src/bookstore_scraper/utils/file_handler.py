@@ -2,7 +2,10 @@
 📁 Utilitaires pour la gestion des fichiers avec pathlib moderne
 """
 import csv
+import os
 import re
+import time
+from decimal import Decimal
 from pathlib import Path
 from typing import List, Dict, Any
 
@@ -10,8 +13,34 @@ import aiofiles
 import requests
 from rich.console import Console
 
+from ..metrics import run_metrics
+from ..models.batch import MISSING_PRICE, BookBatch
+from ..models.book import UNKNOWN_STOCK
+
 console = Console()
 
+# En-têtes CSV
+CSV_HEADERS = [
+    "product_page_url",
+    "universal_product_code",
+    "title", 
+    "price_including_tax",
+    "price_excluding_tax",
+    "number_available",
+    "product_description",
+    "category",
+    "review_rating",
+    "image_url"
+]
+
+# Formats d'export en colonnes typées (pyarrow) et extension des fichiers produits
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def partial_path(output_path: Path) -> Path:
+    """Fichier temporaire d'un CSV en cours d'écriture (``poetry.csv`` → ``poetry.csv.part``)."""
+    return output_path.with_name(output_path.name + ".part")
+
 
 class FileHandler:
     """Gestionnaire de fichiers modernisé."""
@@ -47,24 +76,15 @@ class FileHandler:
             # S'assure que le répertoire parent existe
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # En-têtes CSV
-            headers = [
-                "product_page_url",
-                "universal_product_code",
-                "title", 
-                "price_including_tax",
-                "price_excluding_tax",
-                "number_available",
-                "product_description",
-                "category",
-                "review_rating",
-                "image_url"
-            ]
-            
-            with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=headers)
+            # Écrit à côté puis remplace : un CSV existant n'est jamais à moitié réécrit
+            start = time.perf_counter()
+            part_path = partial_path(output_path)
+            with open(part_path, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=CSV_HEADERS)
                 writer.writeheader()
                 writer.writerows(books)
+            os.replace(part_path, output_path)
+            run_metrics.record_write(time.perf_counter() - start, len(books))
             
             console.print(f"✅ [green]{len(books)} livres sauvegardés dans {output_path}[/green]")
             return True
@@ -74,18 +94,104 @@ class FileHandler:
             return False
     
     @staticmethod
-    def save_image(image_url: str, output_path: Path) -> bool:
-        """Télécharge et sauvegarde une image."""
+    def save_books_to_columnar(books: List[Dict[str, Any]], output_path: Path,
+                               fmt: str = "parquet") -> bool:
+        """Sauvegarde des livres en colonnes typées (Parquet ou Arrow IPC).
+        
+        Les lignes ont le format de ``save_books_to_csv``. Les prix deviennent
+        des ``decimal128(10, 2)``, la disponibilité un entier, la note un
+        entier de 1 à 5 (nul si inconnue) et la catégorie une colonne
+        dictionnaire. Lève :class:`ValueError` si pyarrow n'est pas installé.
+        """
+        require_pyarrow(fmt)
+        return FileHandler.save_batch_to_columnar(BookBatch.from_dicts(books), output_path, fmt)
+    
+    @staticmethod
+    def save_batch_to_columnar(batch: BookBatch, output_path: Path, fmt: str = "parquet") -> bool:
+        """Sauvegarde un :class:`BookBatch` en Parquet ou Arrow IPC, colonnes reprises sans copie."""
+        pa = require_pyarrow(fmt)
+        if not len(batch):
+            console.print("[yellow]⚠️ Aucun livre à sauvegarder[/yellow]")
+            return False
+        
+        try:
+            table = _arrow_table(pa, batch)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            part_path = partial_path(output_path)
+            if fmt == "parquet":
+                import pyarrow.parquet as pq
+                pq.write_table(table, part_path, compression="zstd")
+            else:
+                options = pa.ipc.IpcWriteOptions(compression="zstd")
+                with pa.OSFile(str(part_path), 'wb') as sink:
+                    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                        writer.write_table(table)
+            os.replace(part_path, output_path)
+            
+            console.print(f"✅ [green]{len(batch)} livres exportés dans {output_path}[/green]")
+            return True
+            
+        except Exception as e:
+            console.print(f"[red]❌ Erreur export {fmt} {output_path}: {e}[/red]")
+            return False
+    
+    @staticmethod
+    def save_batch_to_csv(batch: BookBatch, output_path: Path) -> bool:
+        """Sauvegarde un :class:`BookBatch` en CSV, sans objet intermédiaire par livre."""
+        if not len(batch):
+            console.print("[yellow]⚠️ Aucun livre à sauvegarder[/yellow]")
+            return False
+        
+        try:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            start = time.perf_counter()
+            part_path = partial_path(output_path)
+            with open(part_path, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(CSV_HEADERS)
+                writer.writerows(batch.records())
+            os.replace(part_path, output_path)
+            run_metrics.record_write(time.perf_counter() - start, len(batch))
+            
+            console.print(f"✅ [green]{len(batch)} livres sauvegardés dans {output_path}[/green]")
+            return True
+            
+        except Exception as e:
+            console.print(f"[red]❌ Erreur sauvegarde CSV {output_path}: {e}[/red]")
+            return False
+    
+    @staticmethod
+    def export_csv(csv_path: Path, fmt: str) -> Path:
+        """Exporte un CSV de livres vers un fichier en colonnes à côté (``poetry.csv`` → ``poetry.parquet``)."""
+        output_path = csv_path.with_suffix(COLUMNAR_FORMATS[fmt])
+        FileHandler.save_books_to_columnar(FileHandler.load_books_from_csv(csv_path), output_path, fmt)
+        return output_path
+    
+    @staticmethod
+    def load_books_from_csv(csv_path: Path) -> List[Dict[str, Any]]:
+        """Relit un CSV de livres (liste vide si le fichier n'existe pas)."""
+        if not csv_path.exists():
+            return []
+        
+        with open(csv_path, newline='', encoding='utf-8') as csvfile:
+            return list(csv.DictReader(csvfile))
+    
+    @staticmethod
+    def save_image(image_url: str, output_path: Path, timeout=None) -> bool:
+        """Télécharge et sauvegarde une image (``timeout`` au format de ``requests``)."""
         try:
             # S'assure que le répertoire parent existe
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            response = requests.get(image_url, stream=True)
+            response = requests.get(image_url, stream=True, timeout=timeout)
             response.raise_for_status()
             
+            size = 0
             with open(output_path, 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     f.write(chunk)
+                    size += len(chunk)
+            run_metrics.record_image(size)
             
             return True
             
@@ -102,9 +208,12 @@ class FileHandler:
             
             async with session.get(image_url) as response:
                 if response.status == 200:
+                    size = 0
                     async with aiofiles.open(output_path, 'wb') as f:
                         async for chunk in response.content.iter_chunked(8192):
                             await f.write(chunk)
+                            size += len(chunk)
+                    run_metrics.record_image(size)
                     return True
                     
         except Exception as e:
@@ -112,7 +221,146 @@ class FileHandler:
         return False
 
 
+class BookCSVWriter:
+    """Écrit les livres dans un CSV au fil de l'eau.
+    
+    Les lignes sont construites directement depuis :meth:`Book.to_record`
+    (sans dictionnaire intermédiaire), accumulées par lots de ``batch_size``
+    puis écrites et flushées. Un flush a aussi lieu si ``flush_interval``
+    secondes se sont écoulées : en cas d'arrêt brutal, seules les dernières
+    lignes du lot en cours sont perdues.
+    
+    Le fichier n'est créé qu'au premier livre, comme avec ``save_books_to_csv``.
+    Les lignes sont écrites dans ``<csv>.part``, renommé atomiquement en
+    ``<csv>`` par :meth:`close` : un CSV présent est toujours complet. Après
+    :meth:`abort` (interruption), seul le fichier ``.part`` subsiste.
+    
+    Utilisation::
+    
+        with BookCSVWriter(csv_path) as writer:
+            for book in books:
+                writer.write(book)
+    """
+    
+    def __init__(self, output_path: Path, batch_size: int = 100, flush_interval: float = 5.0):
+        self.output_path = output_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._batch: List[tuple] = []
+        self._file = None
+        self._writer = None
+        self._last_flush = time.monotonic()
+    
+    def __enter__(self) -> "BookCSVWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+    
+    def write(self, book) -> None:
+        """Ajoute un :class:`Book` au lot en cours."""
+        self._batch.append(book.to_record())
+        if (len(self._batch) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+    
+    def flush(self) -> None:
+        """Écrit le lot en cours et vide les tampons vers le disque."""
+        if not self._batch:
+            return
+        
+        start = time.perf_counter()
+        if self._file is None:
+            self._open()
+        
+        self._writer.writerows(self._batch)
+        self._file.flush()
+        run_metrics.record_write(time.perf_counter() - start, len(self._batch))
+        self.written += len(self._batch)
+        self._batch.clear()
+        self._last_flush = time.monotonic()
+    
+    def close(self) -> int:
+        """Écrit les dernières lignes, publie le CSV et renvoie le nombre de livres écrits."""
+        opened = self._file is not None or bool(self._batch)
+        self._close_file()
+        if opened:
+            os.replace(self.part_path, self.output_path)
+        return self.written
+    
+    def abort(self) -> None:
+        """Ferme le fichier sans publier le CSV : le ``.part`` reste incomplet."""
+        self._close_file()
+    
+    @property
+    def part_path(self) -> Path:
+        return partial_path(self.output_path)
+    
+    def _close_file(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def _open(self) -> None:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.part_path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(CSV_HEADERS)
+
+
+def require_pyarrow(fmt: str = "parquet"):
+    """Importe pyarrow, dépendance optionnelle des exports en colonnes."""
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Format inconnu '{fmt}' (choix: {', '.join(COLUMNAR_FORMATS)})")
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError(f"L'export {fmt} nécessite le paquet 'pyarrow' (pip install pyarrow)")
+    return pyarrow
+
+
+def _arrow_table(pa, batch: BookBatch):
+    """Table Arrow typée d'un lot : les colonnes numériques sont reprises sans copie."""
+    import pyarrow.compute as pc
+    
+    def numbers(column, arrow_type):
+        return pa.Array.from_buffers(arrow_type, len(column), [None, pa.py_buffer(column)])
+    
+    def price(column):
+        # Centimes → décimal à 2 chiffres après la virgule ; prix inconnu → nul
+        cents = numbers(column, pa.int64())
+        cents = pc.if_else(pc.equal(cents, MISSING_PRICE), pa.scalar(None, pa.int64()), cents)
+        cents = cents.cast(pa.decimal128(19, 0))
+        return pc.multiply(cents, pa.scalar(Decimal("0.01"), pa.decimal128(3, 2))).cast(pa.decimal128(10, 2))
+    
+    rating = numbers(batch.rating, pa.int8())
+    available = numbers(batch.available, pa.int64())
+    return pa.table({
+        "product_page_url": pa.array(batch.product_page_url, pa.string()),
+        "universal_product_code": pa.array(batch.universal_product_code, pa.string()),
+        "title": pa.array(batch.title, pa.string()),
+        "price_including_tax": price(batch.price_including_tax),
+        "price_excluding_tax": price(batch.price_excluding_tax),
+        # En stock sans nombre d'exemplaires (listing) → nul
+        "number_available": pc.if_else(pc.equal(available, UNKNOWN_STOCK), pa.scalar(None, pa.int64()),
+                                       available).cast(pa.int32()),
+        "product_description": pa.array(batch.product_description, pa.string()),
+        "category": pa.DictionaryArray.from_arrays(numbers(batch.category_code, pa.int32()),
+                                                   pa.array(batch.categories, pa.string())),
+        # Sans note (0) ou note "Unknown" (-1) → nulle
+        "review_rating": pc.if_else(pc.less_equal(rating, 0), pa.scalar(None, pa.int8()), rating),
+        "image_url": pa.array(batch.image_url, pa.string()),
+    })
+
+
 # Fonction utilitaire pour compatibilité
-def save_image(image_url: str, output_path: Path) -> bool:
+def save_image(image_url: str, output_path: Path, timeout=None) -> bool:
     """Fonction utilitaire pour sauvegarder une image."""
-    return FileHandler.save_image(image_url, output_path)
+    return FileHandler.save_image(image_url, output_path, timeout)
@@ -0,0 +1,188 @@
+"""
+🗄️ Cache HTTP persistant sur disque avec revalidation conditionnelle et éviction LRU
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from rich.console import Console
+
+console = Console()
+
+
+@dataclass
+class CacheEntry:
+    """Métadonnées d'une réponse mise en cache."""
+
+    key: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    size: int = 0  # Taille compressée sur disque
+    stored_at: float = field(default_factory=time.time)
+    last_access: float = field(default_factory=time.time)
+
+
+@dataclass
+class CacheStats:
+    """Compteurs d'utilisation du cache pendant un run."""
+
+    hits: int = 0  # Servi depuis le disque sans requête réseau
+    revalidated: int = 0  # Réponse 304 : le corps en cache est toujours valide
+    misses: int = 0  # Téléchargement complet
+    evictions: int = 0
+
+
+class ResponseCache:
+    """Cache de réponses HTTP indexé par URL.
+
+    Les corps sont stockés compressés (zlib) dans ``directory``, l'index JSON
+    conserve ETag / Last-Modified pour revalider avec ``If-None-Match`` /
+    ``If-Modified-Since``. Quand la taille totale dépasse ``max_bytes``, les
+    entrées les moins récemment utilisées sont supprimées.
+
+    Une entrée plus récente que ``max_age`` secondes est servie sans requête.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory: Path, max_bytes: int = 100 * 1024 * 1024, max_age: float = 0):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CacheEntry] = {}
+        self._dirty = False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    # ------------------------------------------------------------------ index
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / self.INDEX_FILE
+
+    def _load_index(self):
+        """Charge l'index existant (un index illisible vide simplement le cache)."""
+        try:
+            raw = json.loads(self.index_path.read_text(encoding='utf-8'))
+            self._entries = {url: CacheEntry(**meta) for url, meta in raw.items()}
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError) as e:
+            console.print(f"[yellow]⚠️ Index du cache illisible, cache réinitialisé: {e}[/yellow]")
+
+    def save(self):
+        """Écrit l'index sur disque de manière atomique."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {url: asdict(entry) for url, entry in self._entries.items()}
+            self._dirty = False
+
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data), encoding='utf-8')
+        os.replace(tmp_path, self.index_path)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry.size for entry in self._entries.values())
+
+    # ---------------------------------------------------------------- lecture
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / f"{key}.z"
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Renvoie l'entrée associée à ``url`` si son corps est toujours sur disque."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry and not self._body_path(entry.key).exists():
+                del self._entries[url]
+                self._dirty = True
+                return None
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Indique si l'entrée peut être servie sans revalidation."""
+        return self.max_age > 0 and time.time() - entry.stored_at < self.max_age
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """En-têtes de revalidation à joindre à la requête."""
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def load(self, url: str, entry: CacheEntry, revalidated: bool = False) -> Optional[bytes]:
+        """Lit le corps d'une entrée et met à jour son rang LRU."""
+        try:
+            content = zlib.decompress(self._body_path(entry.key).read_bytes())
+        except (OSError, zlib.error):
+            self.discard(url)
+            return None
+
+        with self._lock:
+            entry.last_access = time.time()
+            if revalidated:
+                entry.stored_at = entry.last_access
+                self.stats.revalidated += 1
+            else:
+                self.stats.hits += 1
+            self._dirty = True
+        return content
+
+    # -------------------------------------------------------------- écriture
+
+    def store(self, url: str, headers: Mapping[str, str], content: bytes):
+        """Met en cache une réponse 200 puis applique la limite de taille."""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        compressed = zlib.compress(content, 6)
+        self._body_path(key).write_bytes(compressed)
+
+        with self._lock:
+            self._entries[url] = CacheEntry(
+                key=key,
+                etag=headers.get("ETag"),
+                last_modified=headers.get("Last-Modified"),
+                size=len(compressed),
+            )
+            self._dirty = True
+            self._evict()
+
+    def record_miss(self):
+        """Comptabilise une réponse téléchargée en entier."""
+        with self._lock:
+            self.stats.misses += 1
+
+    def discard(self, url: str):
+        """Supprime une entrée et son corps."""
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            self._dirty = True
+        if entry:
+            self._body_path(entry.key).unlink(missing_ok=True)
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de ``max_bytes``."""
+        total = self.total_bytes
+        if total <= self.max_bytes:
+            return
+
+        for url, entry in sorted(self._entries.items(), key=lambda item: item[1].last_access):
+            if total <= self.max_bytes:
+                break
+            del self._entries[url]
+            self._body_path(entry.key).unlink(missing_ok=True)
+            total -= entry.size
+            self.stats.evictions += 1
@@ -0,0 +1,162 @@
+"""
+🖼️ Téléchargement asynchrone et dédupliqué des couvertures
+"""
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import aiofiles
+import aiohttp
+from rich.console import Console
+
+from ..metrics import ERROR_STATUS, run_metrics
+
+console = Console()
+
+
+@dataclass
+class ImageStats:
+    """Bilan des téléchargements d'images d'un run."""
+
+    downloaded: int = 0  # Images réellement téléchargées
+    reused: int = 0  # Déjà présentes (même URL ou même contenu) : simple lien
+    failed: int = 0
+    bytes: int = 0
+
+
+class ImageStore:
+    """Stockage des couvertures adressé par contenu.
+
+    Chaque image est stockée une seule fois sous ``<root>/<sha256>.jpg``, puis
+    liée (hard link, copie à défaut) sous le nom du livre dans le dossier
+    ``images`` de sa catégorie. L'index ``url → (empreinte, taille)`` permet
+    d'éviter tout téléchargement quand le fichier attendu est déjà présent
+    avec la bonne taille.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.stats = ImageStats()
+        self._index: Dict[str, Dict[str, object]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._dirty = False
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            self._index = json.loads((self.root / self.INDEX_FILE).read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            console.print(f"[yellow]⚠️ Index des images illisible, reconstruit: {e}[/yellow]")
+
+    @classmethod
+    def for_output(cls, output: Path) -> "ImageStore":
+        """Stockage partagé par toutes les catégories d'un dossier de sortie."""
+        return cls(output / ".images")
+
+    def save(self):
+        """Écrit l'index sur disque de manière atomique."""
+        if not self._dirty:
+            return
+        index_path = self.root / self.INDEX_FILE
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._index), encoding='utf-8')
+        os.replace(tmp_path, index_path)
+        self._dirty = False
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / f"{digest}.jpg"
+
+    def _cached_blob(self, image_url: str) -> Optional[Path]:
+        """Fichier déjà stocké pour cette URL, s'il existe avec la taille attendue."""
+        entry = self._index.get(image_url)
+        if not entry:
+            return None
+        blob = self._blob_path(entry["sha256"])
+        try:
+            if blob.stat().st_size == entry["size"]:
+                return blob
+        except FileNotFoundError:
+            pass
+        return None
+
+    async def save_image(self, session: aiohttp.ClientSession, image_url: str,
+                         output_path: Path) -> bool:
+        """Rend l'image disponible sous ``output_path`` en la téléchargeant au plus une fois."""
+        blob = self._cached_blob(image_url)
+        if blob is None:
+            # Une même URL demandée plusieurs fois en parallèle n'est téléchargée qu'une fois
+            pending = self._pending.get(image_url)
+            if pending is None:
+                pending = self._pending[image_url] = asyncio.ensure_future(
+                    self._download(session, image_url))
+                try:
+                    blob = await pending
+                finally:
+                    del self._pending[image_url]
+            else:
+                blob = await asyncio.shield(pending)
+                if blob:
+                    self.stats.reused += 1
+        else:
+            self.stats.reused += 1
+
+        if blob is None:
+            return False
+
+        self._link(blob, output_path)
+        return True
+
+    async def _download(self, session: aiohttp.ClientSession, image_url: str) -> Optional[Path]:
+        start = time.perf_counter()
+        try:
+            async with session.get(image_url) as response:
+                content = await response.read()
+                run_metrics.record_request(image_url, response.status, time.perf_counter() - start,
+                                           len(content))
+                response.raise_for_status()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if not isinstance(e, aiohttp.ClientResponseError):
+                run_metrics.record_request(image_url, ERROR_STATUS, time.perf_counter() - start)
+            console.print(f"[red]❌ Erreur téléchargement async image {image_url}: {e}[/red]")
+            self.stats.failed += 1
+            return None
+        run_metrics.record_image(len(content))
+
+        digest = hashlib.sha256(content).hexdigest()
+        blob = self._blob_path(digest)
+
+        # Contenu identique déjà stocké sous une autre URL
+        if blob.exists() and blob.stat().st_size == len(content):
+            self.stats.reused += 1
+        else:
+            async with aiofiles.open(blob, 'wb') as f:
+                await f.write(content)
+            self.stats.downloaded += 1
+            self.stats.bytes += len(content)
+
+        self._index[image_url] = {"sha256": digest, "size": len(content)}
+        self._dirty = True
+        return blob
+
+    @staticmethod
+    def _link(blob: Path, output_path: Path):
+        """Expose le fichier stocké sous le nom du livre."""
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.exists():
+            if output_path.samefile(blob):
+                return
+            output_path.unlink()
+        try:
+            os.link(blob, output_path)
+        except OSError:
+            # Système de fichiers sans hard links
+            shutil.copyfile(blob, output_path)
@@ -0,0 +1,104 @@
+"""
+📓 Journal de progression append-only pour reprendre un long run (--resume)
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from rich.console import Console
+
+from ..models.book import Book, Category
+
+console = Console()
+
+
+class ProgressJournal:
+    """Journal JSON Lines des étapes terminées d'un run.
+
+    Chaque ligne est un événement, ajouté en fin de fichier et flushé aussitôt :
+
+    - ``categories`` : la liste des catégories du site (pas de nouvelle requête à la reprise) ;
+    - ``book`` : un livre écrit, avec sa ligne CSV (voir :meth:`Book.to_record`) ;
+    - ``category`` : une catégorie terminée, son CSV final publié.
+
+    À la reprise, les catégories terminées sont sautées et les livres déjà
+    écrits d'une catégorie interrompue sont réécrits depuis le journal, sans
+    retélécharger leur page. Une dernière ligne tronquée par un arrêt brutal
+    est ignorée.
+    """
+
+    FILE_NAME = ".progress.jsonl"
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = Path(path)
+        self.categories: Optional[List[Category]] = None
+        self.finished: Set[str] = set()
+        self.books: Dict[str, Dict[str, tuple]] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume:
+            self._load()
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    @classmethod
+    def for_output(cls, output: Path, resume: bool = False) -> "ProgressJournal":
+        """Journal du dossier de sortie, repris ou recommencé."""
+        return cls(output / cls.FILE_NAME, resume)
+
+    def _load(self):
+        try:
+            lines = self.path.read_text(encoding='utf-8').splitlines()
+        except FileNotFoundError:
+            return
+
+        for number, line in enumerate(lines, 1):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                if number < len(lines):
+                    console.print(f"[yellow]⚠️ Ligne {number} du journal illisible, ignorée[/yellow]")
+                continue
+
+            kind = event.get("event")
+            if kind == "categories":
+                self.categories = [Category(nom, url) for nom, url in event["items"]]
+            elif kind == "book":
+                self.books.setdefault(event["category"], {})[event["url"]] = tuple(event["record"])
+            elif kind == "category":
+                self.finished.add(event["category"])
+
+    def _append(self, event: dict, sync: bool = False):
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def record_categories(self, categories: List[Category]):
+        self.categories = list(categories)
+        self._append({"event": "categories",
+                      "items": [[category.nom, category.url] for category in categories]}, sync=True)
+
+    def record_book(self, category: Category, book: Book):
+        record = book.to_record()
+        self.books.setdefault(category.nom, {})[book.product_page_url] = record
+        self._append({"event": "book", "category": category.nom,
+                      "url": book.product_page_url, "record": record})
+
+    def record_category(self, category: Category, rows: int):
+        self.finished.add(category.nom)
+        self._append({"event": "category", "category": category.nom, "rows": rows}, sync=True)
+
+    def is_finished(self, category: Category) -> bool:
+        return category.nom in self.finished
+
+    def written_books(self, category: Category) -> List[Book]:
+        """Livres déjà écrits d'une catégorie interrompue."""
+        return [Book(*record) for record in self.books.get(category.nom, {}).values()]
+
+    def has_book(self, category: Category, url: str) -> bool:
+        return url in self.books.get(category.nom, ())
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
@@ -0,0 +1,124 @@
+"""
+🧾 Manifeste de crawl : empreinte et date de dernière observation de chaque livre
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+# Jours sans page détail au-delà desquels un livre est revérifié (mode --incremental)
+RECHECK_DAYS = 7.0
+
+from rich.console import Console
+
+from ..models.book import Book
+
+console = Console()
+
+
+def book_fingerprint(book: Book) -> str:
+    """Empreinte du contenu exporté d'un livre."""
+    payload = "\x1f".join(str(value) for value in book.to_dict().values())
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class CrawlManifest:
+    """Associe chaque ``universal_product_code`` à son empreinte et sa dernière observation.
+
+    Le manifeste est un fichier JSON stocké à côté du CSV de la catégorie. Il
+    mémorise aussi le prix et la disponibilité vus sur le listing, pour éviter
+    d'ouvrir les pages détail de livres qui n'ont pas bougé, et la date du
+    dernier téléchargement de leur page détail (``fetched``).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.books: Dict[str, Dict[str, str]] = {}
+        self._upc_by_url: Dict[str, str] = {}
+        self._load()
+
+    @classmethod
+    def for_csv(cls, csv_path: Path) -> "CrawlManifest":
+        """Manifeste associé à un CSV de catégorie (``poetry.csv`` → ``poetry.manifest.json``)."""
+        return cls(csv_path.with_suffix(".manifest.json"))
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            console.print(f"[yellow]⚠️ Manifeste illisible {self.path}, crawl complet: {e}[/yellow]")
+            return
+
+        self.books = data.get("books", {})
+        self._upc_by_url = {entry["url"]: upc for upc, entry in self.books.items()}
+
+    def save(self):
+        """Écrit le manifeste de manière atomique."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"books": self.books}, indent=1), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+    def listing_unchanged(self, url: str, listing_signature: str) -> bool:
+        """Vrai si le livre est connu et que son prix / sa disponibilité affichés n'ont pas bougé."""
+        upc = self._upc_by_url.get(url)
+        return bool(upc) and self.books[upc].get("listing") == listing_signature
+
+    def detail_stale(self, url: str, max_age: Optional[float]) -> bool:
+        """Vrai si la page détail du livre n'a pas été téléchargée depuis ``max_age`` secondes.
+
+        Le listing n'affiche que « In stock », jamais le nombre d'exemplaires :
+        seule la page détail le met à jour. Les échéances sont étalées entre la
+        moitié et la totalité de ``max_age`` selon l'UPC, pour que les livres
+        vus au même run ne soient pas tous revérifiés ensemble.
+        """
+        upc = self._upc_by_url.get(url)
+        if max_age is None or not upc:
+            return False
+        fetched = self.books[upc].get("fetched")
+        if not fetched:
+            # Manifeste antérieur à ce suivi : date du dernier téléchargement inconnue
+            return True
+        age = (datetime.now(timezone.utc) - datetime.fromisoformat(fetched)).total_seconds()
+        spread = int(hashlib.sha1(upc.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+        return age >= max_age * (0.5 + 0.5 * spread)
+
+    def mark_seen(self, url: str):
+        """Met à jour la date d'observation d'un livre resté inchangé."""
+        upc = self._upc_by_url.get(url)
+        if upc:
+            self.books[upc]["last_seen"] = _now()
+
+    def update(self, book: Book, listing_signature: Optional[str] = None) -> Optional[str]:
+        """Enregistre un livre extrait.
+
+        Renvoie ``"new"`` ou ``"changed"`` si la ligne CSV doit être réécrite,
+        ``None`` si le contenu est identique à la dernière observation.
+        """
+        upc = book.universal_product_code
+        fingerprint = book_fingerprint(book)
+        previous = self.books.get(upc)
+
+        now = _now()
+        self.books[upc] = {
+            "hash": fingerprint,
+            "last_seen": now,
+            "fetched": now,
+            "url": book.product_page_url,
+            "listing": listing_signature or (previous or {}).get("listing", ""),
+        }
+        self._upc_by_url[book.product_page_url] = upc
+
+        if previous is None:
+            return "new"
+        if previous.get("hash") != fingerprint:
+            return "changed"
+        return None
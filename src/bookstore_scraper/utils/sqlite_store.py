@@ -0,0 +1,199 @@
+"""
+🗄️ Stockage SQLite des livres (--store sqlite:PATH) pour les requêtes transverses aux catégories
+"""
+import sqlite3
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from rich.console import Console
+
+from ..models.batch import MISSING_PRICE, to_pence
+from ..models.book import Book, RATING_VALUES, parse_availability
+
+console = Console()
+
+# Préfixe de l'option --store
+SQLITE_SCHEME = "sqlite:"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    universal_product_code TEXT PRIMARY KEY,
+    product_page_url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    price_including_tax_pence INTEGER NOT NULL,
+    price_excluding_tax_pence INTEGER,
+    number_available INTEGER,
+    product_description TEXT,
+    category TEXT NOT NULL,
+    review_rating INTEGER,
+    image_url TEXT,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS books_category ON books (category);
+CREATE INDEX IF NOT EXISTS books_price ON books (price_including_tax_pence);
+CREATE INDEX IF NOT EXISTS books_rating ON books (review_rating);
+"""
+
+_UPSERT = """
+INSERT INTO books (universal_product_code, product_page_url, title, price_including_tax_pence,
+                   price_excluding_tax_pence, number_available, product_description, category,
+                   review_rating, image_url)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (universal_product_code) DO UPDATE SET
+    product_page_url = excluded.product_page_url,
+    title = excluded.title,
+    price_including_tax_pence = excluded.price_including_tax_pence,
+    price_excluding_tax_pence = excluded.price_excluding_tax_pence,
+    number_available = excluded.number_available,
+    product_description = excluded.product_description,
+    category = excluded.category,
+    review_rating = excluded.review_rating,
+    image_url = excluded.image_url,
+    updated_at = datetime('now')
+"""
+
+# Bases créées avec des prix en réels : recopiées avec des prix en centimes
+_MIGRATE_REAL_PRICES = """
+ALTER TABLE books RENAME TO books_real_prices;
+DROP INDEX IF EXISTS books_category;
+DROP INDEX IF EXISTS books_price;
+DROP INDEX IF EXISTS books_rating;
+{schema}
+INSERT INTO books
+SELECT universal_product_code, product_page_url, title,
+       CAST(ROUND(price_including_tax * 100) AS INTEGER),
+       CAST(ROUND(price_excluding_tax * 100) AS INTEGER),
+       number_available, product_description, category, review_rating, image_url, updated_at
+FROM books_real_prices;
+DROP TABLE books_real_prices;
+"""
+
+
+class SQLiteBookStore:
+    """Base SQLite des livres, mise à jour par lots.
+
+    Les livres sont accumulés puis insérés ``batch_size`` par ``batch_size``
+    avec ``executemany`` dans une seule transaction. Un livre déjà présent
+    (même UPC) est mis à jour. La base est en mode WAL : elle reste lisible
+    pendant un run. Les colonnes sont typées (prix en centimes entiers, comme
+    :class:`BookBatch`, pour rester exacts ; disponibilité et note en entiers,
+    nulles si inconnues) et indexées sur l'UPC (clé primaire), la catégorie,
+    le prix TTC et la note, par exemple ::
+
+        SELECT title, price_including_tax_pence FROM books ORDER BY price_including_tax_pence LIMIT 10;
+        SELECT title FROM books WHERE review_rating = 5;
+        SELECT title, number_available FROM books WHERE number_available < 3;
+
+    :meth:`get` relit un livre avec ses prix en ``Decimal``.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 500):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.written = 0
+        self._batch: List[tuple] = []
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(books)")}
+        if "price_including_tax" in columns:
+            self._conn.executescript(f"BEGIN;{_MIGRATE_REAL_PRICES.format(schema=_SCHEMA)}COMMIT;")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_option(cls, value: str) -> "SQLiteBookStore":
+        """Ouvre la base désignée par l'option ``--store sqlite:PATH``."""
+        if not value.startswith(SQLITE_SCHEME) or not value[len(SQLITE_SCHEME):]:
+            raise ValueError(f"Destination inconnue '{value}' (attendu: sqlite:CHEMIN)")
+        return cls(Path(value[len(SQLITE_SCHEME):]))
+
+    def add(self, book: Book):
+        """Ajoute un livre au lot en cours."""
+        self._batch.append(_row(book))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def upsert(self, books: Iterable[Book]):
+        """Insère ou met à jour des livres, puis valide la transaction."""
+        for book in books:
+            self.add(book)
+        self.flush()
+
+    def flush(self):
+        """Écrit le lot en cours dans une transaction."""
+        if not self._batch:
+            return
+        with self._conn:
+            self._conn.executemany(_UPSERT, self._batch)
+        self.written += len(self._batch)
+        self._batch.clear()
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def get(self, upc: str) -> Optional[Dict[str, object]]:
+        """Colonnes d'un livre enregistré, prix reconvertis en ``Decimal``."""
+        cursor = self._conn.execute("SELECT * FROM books WHERE universal_product_code = ?", (upc,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        data = dict(zip((column[0] for column in cursor.description), row))
+        for column in ("price_including_tax", "price_excluding_tax"):
+            pence = data.pop(f"{column}_pence")
+            data[column] = None if pence is None else Decimal(pence).scaleb(-2)
+        return data
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
+
+
+class StoreWriter:
+    """Écrit chaque livre dans la destination du pipeline et dans la base SQLite.
+
+    Les livres déjà reçus sont enregistrés dans la base même en cas
+    d'interruption : l'upsert rend la reprise sans doublon.
+    """
+
+    def __init__(self, writer, store: SQLiteBookStore):
+        self.writer = writer
+        self.store = store
+
+    def write(self, book: Book):
+        self.writer.write(book)
+        self.store.add(book)
+
+    def close(self) -> int:
+        self.store.flush()
+        return self.writer.close()
+
+    def abort(self):
+        try:
+            self.store.flush()
+        finally:
+            self.writer.abort()
+
+
+def _row(book: Book) -> tuple:
+    return (
+        book.universal_product_code,
+        book.product_page_url,
+        book.title,
+        to_pence(book.price_including_tax),
+        _nullable_pence(book.price_excluding_tax),
+        parse_availability(book.number_available),
+        book.product_description,
+        book.category,
+        RATING_VALUES.get(book.review_rating),
+        book.image_url,
+    )
+
+
+def _nullable_pence(price: Optional[Decimal]) -> Optional[int]:
+    pence = to_pence(price)
+    return None if pence == MISSING_PRICE else pence
@@ -0,0 +1,34 @@
+"""
+🧪 Configuration des tests : rend le paquet importable depuis src/ (comme main.py)
+et fournit les fixtures partagées
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from bookstore_scraper.models.book import Book  # noqa: E402
+
+
+def _make_book(availability: str, rating: str, price_excluding_tax: str = "£43.00") -> Book:
+    return Book(
+        product_page_url="http://books.toscrape.com/catalogue/a-light-in-the-attic_1000/index.html",
+        universal_product_code="a897fe39b1053632",
+        title="A Light in the Attic",
+        price_including_tax="£51.77",
+        price_excluding_tax=price_excluding_tax,
+        number_available=availability,
+        product_description="It's hard to imagine a world without A Light in the Attic.",
+        category="Poetry",
+        review_rating=rating,
+        image_url="http://books.toscrape.com/media/cache/fe/72/fe72f0532301ec28892ae79a629a293c.jpg",
+    )
+
+
+@pytest.fixture
+def make_book():
+    """Fabrique de livres : ``make_book(disponibilité, note, prix_ht="£43.00")``."""
+    return _make_book
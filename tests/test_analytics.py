@@ -0,0 +1,46 @@
+"""
+🧪 Analyse des CSV : livres partiels (--listing-only) à prix HT et stock inconnus
+"""
+import pytest
+
+from bookstore_scraper import analytics
+from bookstore_scraper.analytics import BookColumns, category_stats, load_columns
+from bookstore_scraper.models.batch import BookBatch
+from bookstore_scraper.utils.file_handler import FileHandler
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def books(make_book):
+    return [
+        make_book("In stock (22 available)", "Three"),
+        make_book("In stock (3 available)", "One"),
+        # Livre partiel lu sur le listing : stock et prix HT inconnus
+        make_book("In stock", "Two", price_excluding_tax=""),
+    ]
+
+
+@pytest.fixture
+def csv_path(tmp_path, books):
+    path = tmp_path / "poetry.csv"
+    FileHandler.save_books_to_csv([book.to_dict() for book in books], path)
+    return path
+
+
+def check_stats(data: BookColumns):
+    stats = category_stats(data)
+    assert stats.books.tolist() == [3]
+    assert stats.stock.tolist() == [25]
+    assert stats.unknown_stock.tolist() == [1]
+    assert stats.mean_tax[0] == pytest.approx(51.77 - 43.00)
+
+
+def test_category_stats_from_batch(books):
+    check_stats(BookColumns.from_batch(BookBatch.from_books(books)))
+
+
+def test_category_stats_from_csv(csv_path):
+    check_stats(load_columns([csv_path]))
+    # Chargeur de repli, sans pyarrow
+    check_stats(analytics._load_with_csv(analytics.require_numpy(), [csv_path]))
@@ -0,0 +1,76 @@
+"""
+🧪 Index persistant des livres : réindexation et livres partiels sans UPC
+"""
+from bookstore_scraper.utils.book_index import BookIndex
+from bookstore_scraper.utils.file_handler import FileHandler
+
+
+def write_csv(path, books):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    FileHandler.save_books_to_csv([book.to_dict() for book in books], path)
+
+
+def test_reindex_replaces_locations(tmp_path, make_book):
+    csv_path = tmp_path / "poetry" / "poetry.csv"
+    write_csv(csv_path, [make_book("In stock (22 available)", "Three")])
+    index = BookIndex.for_output(tmp_path)
+    assert index.refresh() == 1
+    index.update(csv_path)
+
+    locations = index.find_upc("a897fe39b1053632")
+    assert locations == index.find_title("  a LIGHT in the attic ")
+    assert len(locations) == 1
+    assert index.read_row(locations[0])["title"] == "A Light in the Attic"
+    index.close()
+
+    # Relu depuis le fichier, sans CSV modifié
+    reloaded = BookIndex.for_output(tmp_path)
+    assert reloaded.refresh() == 0
+    assert reloaded.find_upc("a897fe39b1053632") == locations
+    reloaded.close()
+
+
+def test_empty_upc_not_indexed(tmp_path, make_book):
+    partial = make_book("In stock", "Two", price_excluding_tax="")
+    partial.universal_product_code = ""
+    csv_path = tmp_path / "poetry" / "poetry.csv"
+    write_csv(csv_path, [partial, partial])
+    index = BookIndex.for_output(tmp_path)
+    index.refresh()
+    assert index.find_upc("") == []
+    assert len(index.find_title("A Light in the Attic")) == 2
+
+    csv_path.unlink()
+    index.refresh()
+    assert index.find_title("A Light in the Attic") == []
+    index.close()
+
+
+def test_lookup_checks_only_matching_files(tmp_path, make_book):
+    poetry = tmp_path / "poetry" / "poetry.csv"
+    travel = tmp_path / "travel" / "travel.csv"
+    write_csv(poetry, [make_book("In stock (22 available)", "Three")])
+    index = BookIndex.for_output(tmp_path)
+    assert index.empty
+    assert index.refresh() == 1
+    assert not index.empty
+
+    # CSV récrit hors de l'outil : la recherche le réindexe avant de lire la ligne
+    moved = make_book("In stock (21 available)", "Three")
+    moved.title = "Another Title"
+    write_csv(poetry, [make_book("Out of stock", "One"), moved])
+    locations = index.lookup("a897fe39b1053632")
+    assert [index.read_row(location)["number_available"] for location in locations] == [
+        "Out of stock", "In stock (21 available)"]
+    assert len(index.lookup("another title")) == 1
+
+    # Un CSV inconnu de l'index n'est vu qu'au parcours complet
+    write_csv(travel, [make_book("In stock", "Two")])
+    assert index.count() == 2
+    assert index.refresh() == 1
+    assert index.count() == 3
+
+    travel.unlink()
+    assert len(index.lookup("a897fe39b1053632")) == 2
+    assert index.count() == 2
+    index.close()
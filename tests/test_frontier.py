@@ -0,0 +1,112 @@
+"""
+🧪 Frontière d'URLs du mode crawl : baux, échecs répétés et regroupement des résultats
+"""
+import time
+from dataclasses import replace
+
+from bookstore_scraper import frontier as frontier_module
+from bookstore_scraper.config import ScraperConfig
+from bookstore_scraper.frontier import BOOK, LISTING, LOCAL_JOURNAL, SHARED_JOURNAL, UrlFrontier, run_worker
+from bookstore_scraper.models.book import Category
+
+POETRY = Category("Poetry", "http://books.toscrape.com/catalogue/category/books/poetry_23/index.html")
+HISTORY = Category("History", "http://books.toscrape.com/catalogue/category/books/history_32/index.html")
+
+
+def book_url(n: int) -> str:
+    return f"http://books.toscrape.com/catalogue/book_{n}/index.html"
+
+
+def test_expired_lease_is_leased_again(tmp_path):
+    frontier = UrlFrontier(tmp_path / "frontier.sqlite", lease_seconds=0.05)
+    frontier.add([(book_url(1), BOOK, POETRY, 1, 0)])
+
+    assert [task.url for task in frontier.lease("a")] == [book_url(1)]
+    # Bail en cours : la tâche n'est pas proposée à un autre worker
+    assert frontier.lease("b") == []
+    assert frontier.stats().leased == 1
+
+    time.sleep(0.1)
+    assert frontier.stats().pending == 1
+    assert [task.url for task in frontier.lease("b")] == [book_url(1)]
+    frontier.close()
+
+
+def test_task_abandoned_after_max_attempts(tmp_path):
+    frontier = UrlFrontier(tmp_path / "frontier.sqlite", max_attempts=2)
+    frontier.add([(book_url(1), BOOK, POETRY, 1, 0)])
+
+    frontier.lease("a")
+    frontier.fail(book_url(1), "timeout")
+    assert frontier.stats().pending == 1
+
+    frontier.lease("a")
+    frontier.fail(book_url(1), "timeout")
+    stats = frontier.stats()
+    assert (stats.pending, stats.failed, stats.finished) == (0, 1, True)
+    assert frontier.lease("a") == []
+    assert frontier.failures() == [(book_url(1), "timeout")]
+    frontier.close()
+
+
+def test_results_grouped_by_category_in_listing_order(tmp_path, make_book):
+    frontier = UrlFrontier(tmp_path / "frontier.sqlite")
+    tasks = [
+        (book_url(1), BOOK, POETRY, 2, 0),
+        (book_url(2), BOOK, POETRY, 1, 1),
+        (book_url(3), BOOK, HISTORY, 1, 0),
+        (book_url(4), BOOK, POETRY, 1, 0),
+        (POETRY.url, LISTING, POETRY, 1, 0),
+    ]
+    frontier.add(tasks)
+    # Acquittées dans le désordre, comme avec plusieurs workers
+    for url, kind, category, page, position in reversed(tasks):
+        if kind == BOOK:
+            book = replace(make_book("In stock (22 available)", "Three"),
+                           product_page_url=url, category=category.nom)
+            frontier.ack(url, book.to_record())
+        else:
+            frontier.ack(url)
+
+    grouped = [(category.nom, [book.product_page_url for book in books])
+               for category, books in frontier.results()]
+    assert grouped == [
+        ("History", [book_url(3)]),
+        ("Poetry", [book_url(4), book_url(2), book_url(1)]),
+    ]
+    frontier.close()
+
+
+def test_workers_keep_the_coordinator_journal_mode(tmp_path):
+    path = tmp_path / "frontier.sqlite"
+    UrlFrontier(path, journal_mode=LOCAL_JOURNAL).close()
+    frontier = UrlFrontier.for_path(path, journal_mode=SHARED_JOURNAL)
+    assert (frontier.journal_mode, frontier.shared) == (SHARED_JOURNAL, True)
+
+    # Un worker n'impose pas de mode : le WAL n'est pas réactivé sur un partage
+    worker = UrlFrontier(path)
+    assert worker.shared
+    worker.close()
+    frontier.close()
+    assert not (tmp_path / "frontier.sqlite-wal").exists()
+
+
+def test_worker_survives_unexpected_errors(tmp_path, monkeypatch):
+    path = tmp_path / "frontier.sqlite"
+    frontier = UrlFrontier(path)
+    frontier.add([(book_url(1), BOOK, POETRY, 1, 0)])
+    frontier.close()
+
+    def crash(frontier, scraper, task):
+        raise ValueError("page empoisonnée")
+
+    monkeypatch.setattr(frontier_module, "_process_book", crash)
+    # La tâche est comptée en échec à chaque essai puis abandonnée
+    assert run_worker(str(path), ScraperConfig(), owner="a", idle_delay=0) == 3
+
+    frontier = UrlFrontier(path)
+    assert frontier.stats().failed == 1
+    assert frontier.failures() == [(book_url(1), "ValueError: page empoisonnée")]
+    # Bilan du worker laissé au coordinateur
+    assert [data["csv"]["rows"] for data in frontier.worker_metrics()] == [0]
+    frontier.close()
@@ -0,0 +1,44 @@
+"""
+🧪 Manifeste incrémental : revérification périodique des pages détail (stock)
+"""
+from datetime import datetime, timedelta, timezone
+
+from bookstore_scraper.utils.manifest import CrawlManifest
+
+DAY = 86400
+
+
+def test_detail_pages_are_rechecked_when_stale(tmp_path, make_book):
+    book = make_book("In stock (22 available)", "Three")
+    url = book.product_page_url
+    manifest = CrawlManifest(tmp_path / "poetry.manifest.json")
+    assert manifest.update(book, "£51.77|In stock") == "new"
+
+    # Téléchargée à l'instant : le listing inchangé suffit
+    assert manifest.listing_unchanged(url, "£51.77|In stock")
+    assert not manifest.detail_stale(url, 7 * DAY)
+    assert not manifest.detail_stale(url, None)
+    assert manifest.detail_stale(url, 0)
+
+    entry = manifest.books[book.universal_product_code]
+    entry["fetched"] = (datetime.now(timezone.utc) - timedelta(days=3)).isoformat()
+    assert not manifest.detail_stale(url, 7 * DAY)
+    entry["fetched"] = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+    assert manifest.detail_stale(url, 7 * DAY)
+
+    # mark_seen (listing inchangé) ne repousse pas l'échéance
+    manifest.mark_seen(url)
+    assert manifest.detail_stale(url, 7 * DAY)
+
+    # Manifeste écrit avant le suivi des téléchargements
+    del entry["fetched"]
+    assert manifest.detail_stale(url, 7 * DAY)
+
+
+def test_stock_change_found_on_recheck(tmp_path, make_book):
+    manifest = CrawlManifest(tmp_path / "poetry.manifest.json")
+    manifest.update(make_book("In stock (22 available)", "Three"), "£51.77|In stock")
+    book = make_book("In stock (21 available)", "Three")
+    assert manifest.update(book) == "changed"
+    # Signature du listing conservée pour les runs suivants
+    assert manifest.listing_unchanged(book.product_page_url, "£51.77|In stock")
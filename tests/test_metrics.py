@@ -0,0 +1,40 @@
+"""
+🧪 Métriques du run : fusion des bilans des workers du mode crawl
+"""
+import json
+
+import pytest
+
+from bookstore_scraper.metrics import ERROR_STATUS, RunMetrics
+
+
+def worker_metrics() -> RunMetrics:
+    metrics = RunMetrics()
+    for seconds in (0.003, 0.02, 0.2, 30.0):
+        metrics.record_request("http://books.toscrape.com/index.html", 200, seconds, 1000)
+    metrics.record_request("http://books.toscrape.com/index.html", ERROR_STATUS, 10.0)
+    metrics.record_parse("book", 0.004)
+    metrics.record_image(2048)
+    return metrics
+
+
+def test_merge_adds_worker_metrics():
+    coordinator = RunMetrics()
+    coordinator.record_request("http://books.toscrape.com/index.html", 200, 0.02, 500)
+    coordinator.record_write(0.5, rows=20)
+
+    # Comme par la frontière : le bilan passe par JSON
+    for _ in range(2):
+        coordinator.merge(json.loads(worker_metrics().to_json()))
+
+    assert coordinator.request_count == 11
+    assert coordinator.bytes_received == 8500
+    stats = dict(((host, status), stats) for host, status, stats in coordinator.hosts())
+    ok = stats[("books.toscrape.com", "200")].latency
+    assert ok.count == 9
+    assert ok.counts[-1] == 2  # Au-delà de la dernière borne
+    assert ok.sum == pytest.approx(0.02 + 2 * (0.003 + 0.02 + 0.2 + 30.0))
+    assert stats[("books.toscrape.com", ERROR_STATUS)].latency.count == 2
+    assert coordinator.parse["book"].count == 2
+    assert (coordinator.rows_written, coordinator.write_seconds) == (20, 0.5)
+    assert (coordinator.images, coordinator.image_bytes) == (2, 4096)
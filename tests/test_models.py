@@ -0,0 +1,28 @@
+"""
+🧪 Conversions sans perte entre Book et ses variantes compactes
+"""
+import pytest
+
+from bookstore_scraper.models.batch import BookBatch
+
+AVAILABILITIES = ["In stock (22 available)", "In stock", "Out of stock"]
+RATINGS = ["Three", "Unknown", ""]
+
+
+@pytest.mark.parametrize("availability", AVAILABILITIES)
+@pytest.mark.parametrize("rating", RATINGS)
+def test_compact_book_round_trip(make_book, availability, rating):
+    book = make_book(availability, rating)
+    compact = book.compact()
+    assert compact.to_dict() == book.to_dict()
+    assert compact.to_record() == book.to_record()
+    assert compact.to_book() == book
+
+
+def test_book_batch_round_trip(make_book):
+    books = [make_book(availability, rating) for availability in AVAILABILITIES for rating in RATINGS]
+    books.append(make_book("In stock", "Two", price_excluding_tax=""))
+    batch = BookBatch.from_books(books)
+    assert list(batch.records()) == [book.to_record() for book in books]
+    assert [compact.to_book() for compact in batch] == books
+    assert list(batch[2:4].records()) == [book.to_record() for book in books[2:4]]
@@ -0,0 +1,61 @@
+"""
+🧪 Parité des backends de parsing sur les pages figées des benchmarks
+"""
+from pathlib import Path
+
+import pytest
+
+from bookstore_scraper.parsers import PARSER_BACKENDS, get_parser
+
+FIXTURES = Path(__file__).parent.parent / "benchmarks" / "fixtures"
+BASE_URL = "http://books.toscrape.com/"
+BOOK_URL = BASE_URL + "catalogue/a-light-in-the-attic_1000/index.html"
+LISTING_URL = BASE_URL + "catalogue/category/books/poetry_23/index.html"
+REFERENCE = "html.parser"
+
+
+def load_parser(name: str):
+    """Instancie un backend, ou saute le test si sa dépendance n'est pas installée."""
+    try:
+        return get_parser(name)
+    except ValueError as e:
+        pytest.skip(str(e))
+
+
+def parse_fixtures(name: str):
+    parser = load_parser(name)
+    listing = parser.parse_listing((FIXTURES / "category_listing.html").read_bytes(), LISTING_URL)
+    return {
+        "book": parser.parse_book((FIXTURES / "book_detail.html").read_bytes(), BOOK_URL, BASE_URL),
+        "listing": (listing.items, listing.has_next, listing.page_count),
+        "categories": parser.parse_categories((FIXTURES / "home.html").read_bytes()),
+    }
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return parse_fixtures(REFERENCE)
+
+
+def test_reference_extracts_fields(reference):
+    book = reference["book"]
+    assert book is not None
+    assert book.universal_product_code
+    assert book.title
+    assert book.price_including_tax is not None
+    assert book.category
+
+    items, has_next, page_count = reference["listing"]
+    assert items
+    assert all(item.url and item.title and item.price for item in items)
+    assert page_count >= 1
+
+    assert reference["categories"]
+
+
+@pytest.mark.parametrize("name", [name for name in PARSER_BACKENDS if name != REFERENCE])
+def test_backend_parity(name, reference):
+    output = parse_fixtures(name)
+    assert output["book"].to_record() == reference["book"].to_record()
+    assert output["listing"] == reference["listing"]
+    assert output["categories"] == reference["categories"]
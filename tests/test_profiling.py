@@ -0,0 +1,63 @@
+"""
+🧪 Attribution du temps de --profile aux étapes
+"""
+from types import SimpleNamespace
+
+from bookstore_scraper.profiling import OTHER, StageProfiler, stage_of
+
+PARSE = ("/src/bookstore_scraper/parsers.py", 10, "extract_book")
+ANALYZE = ("/src/bookstore_scraper/analytics.py", 20, "load_columns")
+
+
+def profiler_with(calls):
+    """Profileur dont les statistiques sont ``{fonction: {appelant: temps}}``."""
+    stats = {}
+    for func, callers in calls.items():
+        edges = {caller: (1, 1, seconds, seconds) for caller, seconds in callers.items()}
+        total = sum(callers.values())
+        stats[func] = (1, 1, total, total, edges)
+    profiler = StageProfiler("unused")
+    profiler.stats = SimpleNamespace(stats=stats)
+    return profiler
+
+
+def test_shared_libraries_follow_their_caller():
+    assert stage_of("/site-packages/pyarrow/csv.py") is None
+    assert stage_of("<built-in method _sqlite3.connect>") is None
+    read_csv = ("/site-packages/pyarrow/csv.py", 1, "read_csv")
+    profiler = profiler_with({read_csv: {ANALYZE: 1.0}, ANALYZE: {}})
+    assert profiler.main_stage(read_csv) == OTHER
+
+
+def test_caller_shares_are_weighted():
+    helper = ("/lib/python3.11/re/__init__.py", 1, "sub")
+    write = ("/src/bookstore_scraper/utils/file_handler.py", 5, "save_books_to_csv")
+    profiler = profiler_with({helper: {PARSE: 3.0, write: 1.0}, PARSE: {}, write: {}})
+    assert profiler._shares(helper) == {"parse": 0.75, "write": 0.25}
+
+
+def test_recursion_does_not_leak_into_other():
+    recursive = ("/lib/python3.11/copy.py", 1, "deepcopy")
+    profiler = profiler_with({recursive: {recursive: 5.0, PARSE: 1.0}, PARSE: {}})
+    assert profiler._shares(recursive) == {"parse": 1.0}
+
+
+def test_long_call_chains_reach_their_stage():
+    chain = [("/lib/python3.11/helper.py", i, f"f{i}") for i in range(2000)]
+    calls = {chain[0]: {PARSE: 1.0}, PARSE: {}}
+    for caller, func in zip(chain, chain[1:]):
+        calls[func] = {caller: 1.0}
+    profiler = profiler_with(calls)
+    assert profiler._shares(chain[-1]) == {"parse": 1.0}
+    assert profiler._shares(chain[1000]) == {"parse": 1.0}
+
+
+def test_call_cycles_follow_outside_callers():
+    # a et b s'appellent mutuellement ; a est appelée par parse, b par le code d'écriture
+    a = ("/lib/python3.11/a.py", 1, "a")
+    b = ("/lib/python3.11/b.py", 1, "b")
+    write = ("/src/bookstore_scraper/utils/file_handler.py", 5, "save_books_to_csv")
+    profiler = profiler_with({a: {b: 5.0, PARSE: 3.0}, b: {a: 5.0, write: 1.0}, PARSE: {}, write: {}})
+    # Le résultat ne dépend pas de la fonction interrogée en premier
+    assert profiler._shares(b) == {"parse": 0.75, "write": 0.25}
+    assert profiler._shares(a) == profiler._shares(b)
@@ -0,0 +1,50 @@
+"""
+🧪 Base SQLite des livres : prix exacts en centimes et conversion des anciennes bases
+"""
+import sqlite3
+from decimal import Decimal
+
+from bookstore_scraper.utils.sqlite_store import SQLiteBookStore
+
+
+def test_prices_round_trip_as_decimal(tmp_path, make_book):
+    store = SQLiteBookStore(tmp_path / "books.db")
+    partial = make_book("In stock", "Two", price_excluding_tax="")
+    partial.universal_product_code = "partial"
+    store.upsert([make_book("In stock (22 available)", "Three"), partial])
+
+    row = store.get("a897fe39b1053632")
+    assert row["price_including_tax"] == Decimal("51.77")
+    assert str(row["price_excluding_tax"]) == "43.00"
+    assert (row["number_available"], row["review_rating"]) == (22, 3)
+    assert store.get("partial")["price_excluding_tax"] is None
+    assert store.get("missing") is None
+    # Entiers en base : comparaisons et tris exacts en SQL
+    assert store._conn.execute("SELECT typeof(price_including_tax_pence), price_including_tax_pence "
+                               "FROM books WHERE review_rating = 3").fetchone() == ("integer", 5177)
+    store.close()
+
+
+def test_real_prices_are_migrated(tmp_path):
+    path = tmp_path / "books.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE books (
+            universal_product_code TEXT PRIMARY KEY, product_page_url TEXT NOT NULL,
+            title TEXT NOT NULL, price_including_tax REAL NOT NULL, price_excluding_tax REAL,
+            number_available INTEGER, product_description TEXT, category TEXT NOT NULL,
+            review_rating INTEGER, image_url TEXT,
+            updated_at TEXT NOT NULL DEFAULT (datetime('now')));
+        CREATE INDEX books_price ON books (price_including_tax);
+        INSERT INTO books (universal_product_code, product_page_url, title, price_including_tax,
+                           price_excluding_tax, category)
+        VALUES ('a', 'http://x/a', 'A', 51.77, NULL, 'Poetry'), ('b', 'http://x/b', 'B', 0.29, 0.1, 'Poetry');
+    """)
+    conn.close()
+
+    store = SQLiteBookStore(path)
+    assert store.count() == 2
+    assert store.get("a")["price_including_tax"] == Decimal("51.77")
+    assert store.get("a")["price_excluding_tax"] is None
+    assert store.get("b")["price_excluding_tax"] == Decimal("0.10")
+    store.close()
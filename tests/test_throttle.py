@@ -0,0 +1,28 @@
+"""
+🧪 Parallélisme adaptatif : une seule diminution par épisode de saturation
+"""
+import time
+
+from bookstore_scraper.throttle import AdaptiveLimiter
+
+
+def test_one_back_off_per_throttling_episode():
+    limiter = AdaptiveLimiter(32, maximum=64)
+
+    # 32 requêtes en vol, parties il y a 0,5 s, reviennent toutes en 429
+    for _ in range(32):
+        limiter.record(0.5, 429)
+    assert (limiter.current_limit, limiter.backoffs) == (16, 1)
+
+    # Une requête partie après la diminution signale un nouvel épisode
+    time.sleep(0.01)
+    limiter.record(0.001, 503)
+    assert (limiter.current_limit, limiter.backoffs) == (8, 2)
+
+
+def test_retry_after_applies_to_ignored_responses():
+    limiter = AdaptiveLimiter(8)
+    limiter.record(0.5, 429)
+    limiter.record(0.5, 429, retry_after=30)
+    assert limiter.backoffs == 1
+    assert limiter._blocked_until > time.monotonic() + 20